@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from routes.accounts_routes import accounts_bp
 from routes.leads_routes import leads_bp  # Asegúrate de que este sea el archivo correcto
@@ -7,10 +7,20 @@ from routes.types_routes import types_bp
 from routes.project_routes import project_bp
 from routes.project_boards_routes import project_boards_bp
 from routes.project_tasks_routes import project_tasks_bp
+from routes.events_routes import events_bp
+from routes.search_routes import search_bp
+from services.cache import cache_stats
+from services.pocketbase_client import client
+from services import json_response, metrics
+from services.realtime import hub
+from services.search_index import search_index
+from services.write_behind import write_behind
 
 app = Flask(__name__)
 
 CORS(app)
+json_response.init_app(app)
+metrics.init_app(app)
 
 app.register_blueprint(accounts_bp)
 app.register_blueprint(leads_bp)
@@ -19,10 +29,45 @@ app.register_blueprint(types_bp)
 app.register_blueprint(project_bp)
 app.register_blueprint(project_boards_bp)
 app.register_blueprint(project_tasks_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(search_bp)
 
 @app.route('/')
 def home():
     return 'Bienvenido al backend funcionable de Unosquare con Flask y PocketBase'
 
+@app.route('/cache/stats')
+def get_cache_stats():
+    return jsonify(cache_stats())
+
+@app.route('/pocketbase/stats')
+def get_pocketbase_stats():
+    return jsonify(client.single_flight_stats())
+
+@app.route('/write-behind/stats')
+def get_write_behind_stats():
+    return jsonify(write_behind.stats())
+
+@app.route('/metrics')
+def get_metrics():
+    single_flight = client.single_flight_stats()
+    caches = cache_stats()
+    collected = [
+        ("pocketbase_single_flight_reads_total", "counter", "Lecturas a PocketBase y lecturas unidas a otra en curso", ("kind",),
+         {("upstream",): single_flight["upstream_reads"], ("coalesced",): single_flight["coalesced_reads"]}),
+        ("cache_lookups_total", "counter", "Consultas a la caché de respuestas", ("cache", "result"),
+         {**{(name, "hit"): stats["hits"] for name, stats in caches.items()},
+          **{(name, "miss"): stats["misses"] for name, stats in caches.items()}}),
+        ("cache_entries", "gauge", "Entradas en la caché de respuestas", ("cache",),
+         {(name,): stats["entries"] for name, stats in caches.items()}),
+        ("realtime_subscribers", "gauge", "Clientes conectados a /events", (), {(): hub.stats()["subscribers"]}),
+        ("write_behind_pending", "gauge", "Registros con ediciones diferidas sin escribir en PocketBase", (),
+         {(): write_behind.stats()["pending"]}),
+    ]
+    return Response(metrics.render(collected), mimetype="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
+    # El índice de búsqueda se carga en segundo plano al arrancar el servidor (no al importar app,
+    # p. ej. en pruebas o comandos de flask); hasta que esté listo /search responde 503
+    search_index.warm()
     app.run(debug=True)
\ No newline at end of file
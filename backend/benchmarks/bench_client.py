@@ -0,0 +1,39 @@
+# Compara peticiones por llamada (requests.get) contra el cliente con pool keep-alive.
+# Uso (desde backend/): python -m benchmarks.bench_client [n_peticiones] [hilos]
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from services.pocketbase_client import PocketBaseClient
+
+
+def run(label, call, total, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda _: call(), range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {total / elapsed:10.1f} req/s  ({elapsed:.2f}s)")
+    return total / elapsed
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    server, base_url = start_fake_pocketbase()
+    url = f"{base_url}/api/collections/accounts/records"
+    pooled = PocketBaseClient(base_url=base_url, pool_size=workers)
+
+    try:
+        per_call = run("requests.get por llamada", lambda: requests.get(url).json(), total, workers)
+        shared = run("PocketBaseClient (pool)", lambda: pooled.get("accounts").json(), total, workers)
+        print(f"Mejora: x{shared / per_call:.2f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
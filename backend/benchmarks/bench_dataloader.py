@@ -0,0 +1,82 @@
+# Relaciones resueltas con expand de PocketBase contra el loader por lotes (RecordLoader):
+#   expand     -> PocketBase incrusta la cuenta, el tipo o el lead completos en cada fila (el camino anterior)
+#   loader     -> las filas sin expand y cada registro relacionado una vez (id = 'a' || id = 'b' ...),
+#                 vuelto a poner en expand: la respuesta al cliente tiene la misma forma
+#   normalized -> igual, pero los relacionados van una sola vez en "included" (?normalize=true)
+# Se mide la respuesta completa: consultas a PocketBase, decodificar y codificar el JSON final.
+# Uso (desde backend/): python -m benchmarks.bench_dataloader [repeticiones] [latencia_ms]
+import statistics
+import sys
+import time
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from benchmarks.seed import seed
+from services.json_response import encode
+from services.pocketbase_client import RecordLoader, client, inflate, quote
+
+CASES = [
+    ("account_leads", "account_id,lead_id", None, 50),
+    ("account_leads", "account_id,lead_id", None, 200),
+    ("account_leads", "account_id.type_id,lead_id", None, 500),
+    ("project_tasks", "assignee_id", "board", 200),
+    ("project_tasks", "assignee_id", None, 500),
+]
+
+
+def with_expand(collection_name, params, paths):
+    page = client.get(collection_name, params={**params, "expand": paths}).json()
+    return encode(page), 1
+
+
+def with_loader(collection_name, params, paths, normalized=False):
+    loader = RecordLoader()
+    page = client.get(collection_name, params=params).json()
+    included = loader.resolve(collection_name, page["items"], paths)
+    if normalized:
+        page["included"] = included
+    else:
+        page["items"] = inflate(collection_name, page["items"], paths, included)
+    return encode(page), 1 + loader.queries
+
+
+def measure(build, repetitions):
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        body, queries = build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(body), queries, statistics.median(timings)
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    server, base_url = start_fake_pocketbase(latency=latency_ms / 1000)
+    client.base_url = base_url
+    ids, _ = seed(server.store, "small")
+    # Las tareas de un tablero (unas 50 en el perfil small) o de todos: ahí se repiten más los asignados
+    board_id = ids["project_boards"][0]
+
+    print(f"latencia simulada de PocketBase: {latency_ms:.0f} ms")
+    print(f"{'colección':<15} {'expand':<28} {'filas':>6} {'modo':<11} {'KB':>8} {'consultas':>10} {'ms':>8}")
+    try:
+        for collection_name, paths, scope, per_page in CASES:
+            params = {"perPage": per_page, "skipTotal": 1}
+            if scope == "board":
+                params["filter"] = f"board_id = {quote(board_id)}"
+            modes = [
+                ("expand", lambda: with_expand(collection_name, params, paths)),
+                ("loader", lambda: with_loader(collection_name, params, paths)),
+                ("normalized", lambda: with_loader(collection_name, params, paths, normalized=True)),
+            ]
+            for label, build in modes:
+                size, queries, ms = measure(build, repetitions)
+                print(f"{collection_name:<15} {paths:<28} {per_page:>6} {label:<11} "
+                      f"{size / 1024:>8.1f} {queries:>10} {ms:>8.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Latencia de POST /account-leads (comprobación de duplicados) según crece account_leads.
+# Compara PocketBase con y sin idx_account_leads_open_assignment.
+# Uso (desde backend/): python -m benchmarks.bench_duplicate_check [tamaño_max] [peticiones]
+import statistics
+import sys
+import time
+
+from benchmarks.fake_pocketbase import new_id, start_fake_pocketbase
+from services.pocketbase_client import client
+
+
+def seed_relations(store, count):
+    batch = []
+    for i in range(count):
+        batch.append({
+            "account_id": new_id(),
+            "lead_id": new_id(),
+            "start_date": "2025-01-01 00:00:00.000Z",
+            "end_date": "" if i % 2 else "2025-06-01 00:00:00.000Z"
+        })
+        if len(batch) == 10000:
+            store.insert_many("account_leads", batch)
+            batch = []
+    if batch:
+        store.insert_many("account_leads", batch)
+
+
+def measure(test_client, requests_count):
+    timings = []
+    for _ in range(requests_count):
+        payload = {"account_id": new_id(), "lead_id": new_id(), "start_date": "2025-01-01"}
+        start = time.perf_counter()
+        response = test_client.post("/account-leads", json=payload)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 201, response.get_json()
+
+        # Repetir la misma asignación debe detectarse como duplicado
+        duplicate = test_client.post("/account-leads", json=payload)
+        assert duplicate.status_code == 409, duplicate.get_json()
+    return statistics.median(timings)
+
+
+def main():
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    requests_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sizes = [size for size in (1000, 10000, 100000, 1000000) if size <= max_size]
+
+    from app import app
+    test_client = app.test_client()
+
+    servers = {label: start_fake_pocketbase(indexes=indexed) for label, indexed in (("con índice", True), ("sin índice", False))}
+    seeded = {label: 0 for label in servers}
+
+    print(f"{'filas':>10} " + " ".join(f"{label + ' p50 (ms)':>22}" for label in servers))
+    try:
+        for size in sizes:
+            results = []
+            for label, (server, base_url) in servers.items():
+                seed_relations(server.store, size - seeded[label])
+                seeded[label] = size
+                client.base_url = base_url
+                results.append(measure(test_client, requests_count))
+            print(f"{size:>10} " + " ".join(f"{value:>22.2f}" for value in results))
+    finally:
+        for server, _ in servers.values():
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Importación masiva (LeadImporter) de un CSV sintético contra el PocketBase falso con datos del perfil small.
+# Las filas repiten correos (leads existentes y repetidos en el archivo), usan nombres de empresa del seed
+# e incluyen algunas filas inválidas. El PocketBase falso corre en otro proceso para que la memoria
+# medida sea solo la del backend.
+# Uso (desde backend/): python -m benchmarks.bench_import [filas] [latencia_ms]
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from benchmarks.seed import PROFILES, seed
+from services.bulk_import import LeadImporter
+from services.pocketbase_client import client
+
+
+def serve(connection, latency):
+    server, base_url = start_fake_pocketbase(latency=latency)
+    seed(server.store, "small")
+    connection.send(base_url)
+    connection.recv()
+    server.shutdown()
+
+
+def write_csv(path, rows):
+    rng = random.Random(7)
+    counts = PROFILES["small"]
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        target.write("name,last_name,work_email,phone,account,start_date,end_date\n")
+        for i in range(rows):
+            if i % 50 == 0:
+                target.write(f"Fila {i},,correo-invalido,,,,\n")
+                continue
+            # ~5% de leads que ya existen en el seed y ~10% repetidos dentro del archivo
+            if i % 20 == 1:
+                email = f"lead{rng.randrange(counts['leads'])}@corp.example.com"
+            elif i % 10 == 2:
+                email = f"nuevo{rng.randrange(i)}@import.example.com"
+            else:
+                email = f"nuevo{i}@import.example.com"
+            account = f"Cuenta {rng.randrange(counts['accounts'])}" if i % 4 else ""
+            start = f"2025-{rng.randrange(1, 13):02d}-01" if account else ""
+            target.write(f"Lead {i},Importado,{email},55{rng.randrange(10 ** 8):08d},{account},{start},\n")
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(child, latency_ms / 1000), daemon=True)
+    process.start()
+    client.base_url = parent.recv()
+
+    descriptor, path = tempfile.mkstemp(suffix=".csv")
+    os.close(descriptor)
+    try:
+        write_csv(path, rows)
+        print(f"{rows} filas, {os.path.getsize(path) / 1024 / 1024:.1f} MB, latencia simulada {latency_ms:.0f} ms")
+
+        importer = LeadImporter()
+        rss_before = max_rss_mb()
+        with open(path, "rb") as source:
+            job_id = importer.submit(source, "csv")["id"]
+        while True:
+            job = importer.get(job_id)
+            if job["status"] in ("done", "failed"):
+                break
+            print(f"  {job['progress'] * 100:5.1f}%  {job['rows']:>7} filas  {job['rows_per_second']:>7.0f} filas/s")
+            time.sleep(5)
+
+        print(f"estado: {job['status']} {job['error'] or ''}")
+        for name in ("rows", "rejected", "leads_created", "leads_matched", "assignments_created", "assignments_skipped"):
+            print(f"  {name:<20} {job[name]:>8}")
+        print(f"  {'segundos':<20} {job['elapsed_seconds']:>8}")
+        print(f"  {'filas/s':<20} {job['rows_per_second']:>8}")
+        print(f"  memoria máxima: {rss_before:.0f} MB antes, {max_rss_mb():.0f} MB después")
+    finally:
+        os.remove(path)
+        parent.send("stop")
+        process.join(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Coste de serializar respuestas grandes de PocketBase (account_leads con expand de cuenta y lead):
+#   std         -> response.json() + jsonify con el proveedor JSON por defecto de Flask (el camino anterior)
+#   orjson      -> response.json() + jsonify con FastJSONProvider (rutas que transforman los datos)
+#   passthrough -> los bytes de PocketBase se reenvían tal cual (rutas que no los modifican)
+# Se mide solo el trabajo de Flask sobre una respuesta ya descargada, sin la red.
+# Uso (desde backend/): python -m benchmarks.bench_json [repeticiones]
+import statistics
+import sys
+import time
+
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from benchmarks.seed import seed
+from services import json_response
+from services.json_response import FastJSONProvider, passthrough
+from services.pocketbase_client import client
+
+PAGE_SIZES = (50, 200, 500)
+
+
+def median_ms(build, repetitions):
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        build().get_data()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    if json_response.orjson is None:
+        raise SystemExit("orjson no está instalado (o JSON_ENCODER=std): no hay nada que comparar")
+
+    server, base_url = start_fake_pocketbase()
+    client.base_url = base_url
+    seed(server.store, "small")
+
+    from app import app
+    std_provider, fast_provider = DefaultJSONProvider(app), FastJSONProvider(app)
+
+    print(f"{'perPage':>8} {'KB':>8} {'std ms':>9} {'orjson ms':>10} {'passthrough ms':>15}")
+    try:
+        with app.app_context():
+            for per_page in PAGE_SIZES:
+                upstream = client.get("account_leads", params={"expand": "account_id,lead_id", "perPage": per_page})
+
+                app.json = std_provider
+                std = median_ms(lambda: jsonify(upstream.json()), repetitions)
+                app.json = fast_provider
+                fast = median_ms(lambda: jsonify(upstream.json()), repetitions)
+                raw = median_ms(lambda: passthrough(upstream), repetitions)
+                print(f"{per_page:>8} {len(upstream.content) / 1024:>8.0f} {std:>9.2f} {fast:>10.2f} {raw:>15.3f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
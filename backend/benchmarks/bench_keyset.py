@@ -0,0 +1,70 @@
+# Latencia de GET /leads a distintas profundidades: paginación por página (offset + totalItems)
+# frente a paginación por cursor (keyset sobre created,id con skipTotal).
+# Uso (desde backend/): python -m benchmarks.bench_keyset [filas] [peticiones]
+import statistics
+import sys
+import time
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from services.pocketbase_client import client, encode_keyset_cursor
+
+PER_PAGE = 50
+
+
+def seed_leads(store, count):
+    batch = []
+    for i in range(count):
+        batch.append({
+            "name": f"Lead {i}",
+            "last_name": "Benchmark",
+            "created": f"2025-01-01 00:00:{i % 60:02d}.{i % 1000:03d}Z"
+        })
+        if len(batch) == 10000:
+            store.insert_many("leads", batch)
+            batch = []
+    if batch:
+        store.insert_many("leads", batch)
+
+
+def timed(test_client, url, requests_count):
+    timings = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        response = test_client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_json()
+    return statistics.median(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    requests_count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    server, base_url = start_fake_pocketbase()
+    client.base_url = base_url
+    seed_leads(server.store, rows)
+
+    from app import app
+    test_client = app.test_client()
+
+    last_page = rows // PER_PAGE
+    pages = [page for page in (1, 10, 100, 1000, 4000) if page <= last_page]
+
+    print(f"{'página':>8} {'page p50 (ms)':>15} {'cursor p50 (ms)':>16}")
+    try:
+        for page in pages:
+            by_page = timed(test_client, f"/leads?page={page}&perPage={PER_PAGE}&sort=created,id", requests_count)
+
+            # Cursor equivalente: el último registro de la página anterior
+            cursor = ""
+            if page > 1:
+                previous = server.store.list("leads", sort="created,id", page=page - 1, per_page=PER_PAGE, skip_total=True)
+                cursor = encode_keyset_cursor(previous["items"][-1])
+            by_cursor = timed(test_client, f"/leads?perPage={PER_PAGE}&cursor={cursor}", requests_count)
+            print(f"{page:>8} {by_page:>15.2f} {by_cursor:>16.2f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
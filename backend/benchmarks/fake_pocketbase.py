@@ -0,0 +1,497 @@
+# Sustituto local de PocketBase para benchmarks: misma API REST de registros,
+# respaldada por SQLite en memoria con los mismos índices que las migraciones.
+import json
+import queue
+import random
+import re
+import sqlite3
+import string
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SCHEMA = {
+    "types": ["name", "description"],
+    "accounts": ["name", "website", "address", "phone", "tax_id", "type_id"],
+    "leads": ["name", "last_name", "phone", "personal_email", "work_email", "cargo"],
+    "account_leads": ["account_id", "lead_id", "start_date", "end_date", "notes"],
+    "projects": ["name", "status", "account_id"],
+    "project_boards": ["title", "order", "project_id", "columns", "version"],
+    "project_tasks": ["title", "description", "board_id", "order", "assignee_id", "column_id"],
+    "users": ["name", "email"],
+}
+
+RELATIONS = {
+    "accounts": {"type_id": "types"},
+    "account_leads": {"account_id": "accounts", "lead_id": "leads"},
+    "projects": {"account_id": "accounts"},
+    "project_boards": {"project_id": "projects"},
+    "project_tasks": {"board_id": "project_boards", "assignee_id": "leads"},
+}
+
+NUMBER_FIELDS = {"order", "version"}
+JSON_FIELDS = {"columns"}
+
+# Copia de los índices declarados en pocketbase/pb_migrations
+INDEXES = {
+    "leads": [
+        "CREATE INDEX `idx_leads_created_id` ON `leads` (`created`, `id`)",
+    ],
+    "accounts": [
+        "CREATE INDEX `idx_accounts_type_id` ON `accounts` (`type_id`)",
+        "CREATE INDEX `idx_accounts_created_id` ON `accounts` (`created`, `id`)",
+    ],
+    "account_leads": [
+        "CREATE INDEX `idx_account_leads_open_assignment` ON `account_leads` (`account_id`, `lead_id`, `end_date`)",
+        "CREATE INDEX `idx_account_leads_start_date` ON `account_leads` (`start_date`)",
+        "CREATE INDEX `idx_account_leads_created_id` ON `account_leads` (`created`, `id`)",
+    ],
+    "project_tasks": [
+        "CREATE INDEX `idx_project_tasks_board_column_order` ON `project_tasks` (`board_id`, `column_id`, `order`)",
+    ],
+}
+
+# Reglas de actualización (updateRule) que el backend usa para escrituras condicionales
+UPDATE_RULES = {
+    "project_boards": lambda record, body: "base_version" not in body or body["base_version"] == record["version"],
+}
+
+SYSTEM_FIELDS = ["id", "created", "updated"]
+MAX_PER_PAGE = 1000
+
+TOKEN = re.compile(r"\(|\)|&&|\|\||!=|>=|<=|!~|=|>|<|~|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|[A-Za-z0-9_.@:\-]+")
+OPERATORS = {"=": "=", "!=": "!=", ">": ">", ">=": ">=", "<": "<", "<=": "<=", "~": "LIKE", "!~": "NOT LIKE"}
+
+
+class FilterError(ValueError):
+    pass
+
+
+def now_str():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+
+
+def new_id():
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=15))
+
+
+def columns(collection_name):
+    return SYSTEM_FIELDS + SCHEMA[collection_name]
+
+
+class FilterTranslator:
+    # Traduce el subconjunto de la sintaxis de filtros de PocketBase que usa el backend a SQL
+    def __init__(self, collection_name, expr):
+        self.fields = set(columns(collection_name))
+        self.tokens = []
+        pos = 0
+        expr = expr.strip()
+        while pos < len(expr):
+            if expr[pos].isspace():
+                pos += 1
+                continue
+            match = TOKEN.match(expr, pos)
+            if not match:
+                raise FilterError(f"Filtro inválido cerca de: {expr[pos:]}")
+            self.tokens.append(match.group(0))
+            pos = match.end()
+        self.pos = 0
+        self.params = []
+
+    def translate(self):
+        sql = self._or()
+        if self.pos != len(self.tokens):
+            raise FilterError("Filtro inválido")
+        return sql, self.params
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self):
+        if self.pos >= len(self.tokens):
+            raise FilterError("Filtro incompleto")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek() == "||":
+            self._take()
+            parts.append(self._and())
+        return parts[0] if len(parts) == 1 else "(" + " OR ".join(parts) + ")"
+
+    def _and(self):
+        parts = [self._atom()]
+        while self._peek() == "&&":
+            self._take()
+            parts.append(self._atom())
+        return parts[0] if len(parts) == 1 else "(" + " AND ".join(parts) + ")"
+
+    def _atom(self):
+        if self._peek() == "(":
+            self._take()
+            sql = self._or()
+            if self._take() != ")":
+                raise FilterError("Falta ')' en el filtro")
+            return sql
+        left = self._operand()
+        op = self._take()
+        if op not in OPERATORS:
+            raise FilterError(f"Operador no soportado: {op}")
+        right = self._operand(like=op in ("~", "!~"))
+        return f"{left} {OPERATORS[op]} {right}"
+
+    def _operand(self, like=False):
+        token = self._take()
+        if token[0] in "'\"":
+            value = token[1:-1].replace("\\'", "'").replace('\\"', '"').replace("\\\\", "\\")
+            if like and "%" not in value:
+                value = f"%{value}%"
+            self.params.append(value)
+            return "?"
+        if token == "@now":
+            self.params.append(now_str())
+            return "?"
+        if token == "null":
+            return "''"
+        if token in ("true", "false"):
+            return "1" if token == "true" else "0"
+        if re.fullmatch(r"-?\d+(\.\d+)?", token):
+            return token
+        if token not in self.fields:
+            raise FilterError(f"Campo desconocido en el filtro: {token}")
+        return f'"{token}"'
+
+
+class FakeStore:
+    def __init__(self, indexes=True):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.request_count = 0
+
+        for name in SCHEMA:
+            defs = ['"id" TEXT PRIMARY KEY', '"created" TEXT NOT NULL', '"updated" TEXT NOT NULL']
+            for field in SCHEMA[name]:
+                default = "0" if field in NUMBER_FIELDS else "''"
+                defs.append(f'"{field}" {"NUMERIC" if field in NUMBER_FIELDS else "TEXT"} DEFAULT {default} NOT NULL')
+            self.conn.execute(f'CREATE TABLE "{name}" ({", ".join(defs)})')
+            self.conn.execute(f'CREATE INDEX "idx_{name}_created" ON "{name}" ("created")')
+            if indexes:
+                for ddl in INDEXES.get(name, []):
+                    self.conn.execute(ddl)
+
+    def _to_row(self, collection_name, data, existing=None):
+        row = dict(existing or {})
+        for field in SCHEMA[collection_name]:
+            if field not in data:
+                row.setdefault(field, 0 if field in NUMBER_FIELDS else "")
+                continue
+            value = data[field]
+            if field in JSON_FIELDS:
+                value = json.dumps(value)
+            elif value is None:
+                value = 0 if field in NUMBER_FIELDS else ""
+            row[field] = value
+        return row
+
+    def _to_record(self, collection_name, row):
+        record = {"collectionName": collection_name}
+        for key in row.keys():
+            value = row[key]
+            if key in JSON_FIELDS:
+                value = json.loads(value) if value else None
+            record[key] = value
+        return record
+
+    def insert_many(self, collection_name, records):
+        # Carga masiva para sembrar datos sin pasar por HTTP
+        ts = now_str()
+        cols = columns(collection_name)
+        rows = []
+        for data in records:
+            row = self._to_row(collection_name, data)
+            row["id"] = data.get("id") or new_id()
+            row["created"] = data.get("created") or ts
+            row["updated"] = data.get("updated") or row["created"]
+            rows.append(tuple(row[c] for c in cols))
+        placeholders = ", ".join("?" for _ in cols)
+        quoted = ", ".join(f'"{c}"' for c in cols)
+        with self.lock:
+            self.conn.executemany(f'INSERT INTO "{collection_name}" ({quoted}) VALUES ({placeholders})', rows)
+            self.conn.commit()
+        return [row[0] for row in rows]
+
+    def count(self, collection_name):
+        with self.lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM "{collection_name}"').fetchone()[0]
+
+    def get(self, collection_name, record_id):
+        with self.lock:
+            row = self.conn.execute(f'SELECT * FROM "{collection_name}" WHERE id = ?', (record_id,)).fetchone()
+        return self._to_record(collection_name, row) if row else None
+
+    def create(self, collection_name, data):
+        record_id = self.insert_many(collection_name, [data])[0]
+        return self.get(collection_name, record_id)
+
+    def update(self, collection_name, record_id, data):
+        with self.lock:
+            current = self.get(collection_name, record_id)
+            if current is None:
+                return None
+            rule = UPDATE_RULES.get(collection_name)
+            if rule and not rule(current, data):
+                # PocketBase responde 404 cuando la regla no se cumple
+                return None
+            fields = {k: v for k, v in data.items() if k in SCHEMA[collection_name]}
+            row = self._to_row(collection_name, fields, {})
+            row = {k: row[k] for k in fields}
+            row["updated"] = now_str()
+            assignments = ", ".join(f'"{k}" = ?' for k in row)
+            self.conn.execute(f'UPDATE "{collection_name}" SET {assignments} WHERE id = ?', (*row.values(), record_id))
+            self.conn.commit()
+            return self.get(collection_name, record_id)
+
+    def delete(self, collection_name, record_id):
+        with self.lock:
+            cursor = self.conn.execute(f'DELETE FROM "{collection_name}" WHERE id = ?', (record_id,))
+            self.conn.commit()
+        return cursor.rowcount > 0
+
+    def list(self, collection_name, filter_str=None, sort=None, page=1, per_page=30, skip_total=False):
+        where, params = "", []
+        if filter_str:
+            sql, params = FilterTranslator(collection_name, filter_str).translate()
+            where = f" WHERE {sql}"
+
+        order = ""
+        if sort:
+            terms = []
+            for term in sort.split(","):
+                term = term.strip()
+                field = term.lstrip("+-")
+                if field not in columns(collection_name):
+                    raise FilterError(f"Campo de orden desconocido: {field}")
+                terms.append(f'"{field}" {"DESC" if term.startswith("-") else "ASC"}')
+            order = " ORDER BY " + ", ".join(terms)
+
+        offset = (page - 1) * per_page
+        with self.lock:
+            rows = self.conn.execute(
+                f'SELECT * FROM "{collection_name}"{where}{order} LIMIT ? OFFSET ?',
+                (*params, per_page, offset)
+            ).fetchall()
+            total = -1
+            if not skip_total:
+                total = self.conn.execute(f'SELECT COUNT(*) FROM "{collection_name}"{where}', params).fetchone()[0]
+
+        items = [self._to_record(collection_name, row) for row in rows]
+        total_pages = -1 if skip_total else (-(-total // per_page) if total else 0)
+        return {"page": page, "perPage": per_page, "totalItems": total, "totalPages": total_pages, "items": items}
+
+    def expand(self, collection_name, record, expand):
+        if not expand:
+            return record
+        expanded = dict(record.get("expand") or {})
+        for path in expand.split(","):
+            field, _, rest = path.strip().partition(".")
+            target = RELATIONS.get(collection_name, {}).get(field)
+            if not target or not record.get(field):
+                continue
+            child = expanded.get(field) or self.get(target, record[field])
+            if child is None:
+                continue
+            expanded[field] = self.expand(target, child, rest)
+        if expanded:
+            record = {**record, "expand": expanded}
+        return record
+
+
+def project_fields(record, fields):
+    if not fields:
+        return record
+    keep = {f.strip() for f in fields.split(",")}
+    if "*" in keep:
+        return record
+    projected = {k: v for k, v in record.items() if k in keep}
+    if "expand" in record and any(f == "expand" or f.startswith("expand.") for f in keep):
+        projected["expand"] = record["expand"]
+    return projected
+
+
+class FakePocketBaseHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para que el cliente pueda reutilizar la conexión (keep-alive)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _parse(self):
+        self.store.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        return parts, query
+
+    def _broadcast(self, collection_name, action, record):
+        # Emula /api/realtime: los clientes suscritos a "<coleccion>/*" reciben el evento
+        topic = f"{collection_name}/*"
+        with self.server.realtime_lock:
+            targets = [c for c in self.server.realtime_clients.values() if topic in c["subscriptions"]]
+        for realtime_client in targets:
+            realtime_client["queue"].put((topic, {"action": action, "record": record}))
+
+    def _serve_realtime(self):
+        client_id = new_id()
+        realtime_client = {"queue": queue.Queue(), "subscriptions": set()}
+        with self.server.realtime_lock:
+            self.server.realtime_clients[client_id] = realtime_client
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            realtime_client["queue"].put(("PB_CONNECT", {"clientId": client_id}))
+            while True:
+                try:
+                    event_name, data = realtime_client["queue"].get(timeout=1)
+                except queue.Empty:
+                    if self.server.stopping:
+                        break
+                    continue
+                # Como PocketBase, cada evento va en su propio fragmento chunked
+                chunk = f"id:{client_id}\nevent:{event_name}\ndata:{json.dumps(data)}\n\n".encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            with self.server.realtime_lock:
+                self.server.realtime_clients.pop(client_id, None)
+
+    def _record_route(self, parts):
+        # /api/collections/<coleccion>/records[/<id>]
+        if len(parts) in (4, 5) and parts[:2] == ["api", "collections"] and parts[3] == "records":
+            if parts[2] in SCHEMA:
+                return parts[2], parts[4] if len(parts) == 5 else None
+        return None, None
+
+    def do_GET(self):
+        parts, query = self._parse()
+        if parts == ["api", "realtime"]:
+            return self._serve_realtime()
+
+        collection_name, record_id = self._record_route(parts)
+        if collection_name is None:
+            return self._send_json(404, {"message": "Not found."})
+
+        try:
+            if record_id:
+                record = self.store.get(collection_name, record_id)
+                if record is None:
+                    return self._send_json(404, {"message": "The requested resource wasn't found."})
+                record = self.store.expand(collection_name, record, query.get("expand"))
+                return self._send_json(200, project_fields(record, query.get("fields")))
+
+            page = max(int(query.get("page", 1)), 1)
+            per_page = min(max(int(query.get("perPage", 30)), 1), MAX_PER_PAGE)
+            result = self.store.list(
+                collection_name,
+                filter_str=query.get("filter"),
+                sort=query.get("sort"),
+                page=page,
+                per_page=per_page,
+                skip_total=query.get("skipTotal") in ("1", "true")
+            )
+        except (FilterError, ValueError) as e:
+            return self._send_json(400, {"message": str(e)})
+
+        result["items"] = [
+            project_fields(self.store.expand(collection_name, item, query.get("expand")), query.get("fields"))
+            for item in result["items"]
+        ]
+        self._send_json(200, result)
+
+    def do_POST(self):
+        parts, query = self._parse()
+        if parts == ["api", "realtime"]:
+            body = self._read_json()
+            with self.server.realtime_lock:
+                realtime_client = self.server.realtime_clients.get(body.get("clientId"))
+                if realtime_client is None:
+                    return self._send_json(404, {"message": "Missing or invalid client id."})
+                realtime_client["subscriptions"] = set(body.get("subscriptions") or [])
+            return self._send_empty()
+
+        collection_name, record_id = self._record_route(parts)
+        if collection_name is None or record_id:
+            return self._send_json(404, {"message": "Not found."})
+        record = self.store.create(collection_name, self._read_json())
+        self._broadcast(collection_name, "create", record)
+        self._send_json(200, self.store.expand(collection_name, record, query.get("expand")))
+
+    def do_PATCH(self):
+        parts, query = self._parse()
+        collection_name, record_id = self._record_route(parts)
+        if collection_name is None or not record_id:
+            return self._send_json(404, {"message": "Not found."})
+        record = self.store.update(collection_name, record_id, self._read_json())
+        if record is None:
+            return self._send_json(404, {"message": "The requested resource wasn't found."})
+        self._broadcast(collection_name, "update", record)
+        self._send_json(200, self.store.expand(collection_name, record, query.get("expand")))
+
+    def do_DELETE(self):
+        parts, query = self._parse()
+        collection_name, record_id = self._record_route(parts)
+        if collection_name is None or not record_id:
+            return self._send_json(404, {"message": "Not found."})
+        record = self.store.get(collection_name, record_id)
+        if record is None or not self.store.delete(collection_name, record_id):
+            return self._send_json(404, {"message": "The requested resource wasn't found."})
+        self._broadcast(collection_name, "delete", record)
+        self._send_empty()
+
+
+def start_fake_pocketbase(host="127.0.0.1", port=0, latency=0.0, indexes=True):
+    server = ThreadingHTTPServer((host, port), FakePocketBaseHandler)
+    server.daemon_threads = True
+    server.store = FakeStore(indexes=indexes)
+    server.latency = latency
+    server.realtime_clients = {}
+    server.realtime_lock = threading.Lock()
+    server.stopping = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
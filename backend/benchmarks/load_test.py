@@ -0,0 +1,226 @@
+# Prueba de carga de los endpoints más usados contra el FakePocketBase sembrado.
+# Levanta el backend real (Flask, servidor con hilos) y lo ataca con N clientes concurrentes.
+# Reporta p50/p99, req/s y memoria, y compara con baselines.json para detectar regresiones.
+# Clientes, backend y PocketBase simulado comparten proceso (y GIL): las cifras sirven para comparar
+# versiones en la misma máquina, no como capacidad absoluta. Las baselines dependen de la máquina.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.load_test --profile small --latency 2 --duration 10 --concurrency 16
+#   python -m benchmarks.load_test --scenarios board_load,recent_leads --save-baseline
+import argparse
+import json
+import os
+import random
+import resource
+import threading
+import time
+from pathlib import Path
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from benchmarks.seed import DEFAULT_COLUMNS, PROFILES, seed
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # Sin una línea de log por petición: distorsiona las mediciones
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def accounts_list(rng, data):
+    return "GET", f"/accounts?page={rng.randint(1, 20)}&perPage=50", None, {200}
+
+
+def recent_leads(rng, data):
+    return "GET", "/account-leads/recent", None, {200}
+
+
+def duplicate_check(rng, data):
+    account_id, lead_id = rng.choice(data["open_assignments"])
+    payload = {"account_id": account_id, "lead_id": lead_id, "start_date": "2025-01-01"}
+    return "POST", "/account-leads", payload, {409}
+
+
+def column_reorder(rng, data):
+    order = list(DEFAULT_COLUMNS)
+    rng.shuffle(order)
+    return "PUT", f"/boards/{rng.choice(data['ids']['project_boards'])}/columns/reorder", {"order": order}, {200}
+
+
+def board_load(rng, data):
+    return "GET", f"/boards/{rng.choice(data['ids']['project_boards'])}/snapshot", None, {200}
+
+
+SCENARIOS = {
+    "accounts_list": accounts_list,
+    "recent_leads": recent_leads,
+    "duplicate_check": duplicate_check,
+    "column_reorder": column_reorder,
+    "board_load": board_load,
+}
+
+
+def rss_mb():
+    # Memoria residente actual (Linux); fuera de Linux se usa el pico
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(base_url, scenario, data, duration, concurrency, warmup):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = [0.0]
+
+    def worker(worker_id):
+        rng = random.Random(worker_id)
+        session = requests.Session()
+        local_latencies, local_errors = [], []
+        for _ in range(warmup):
+            method, path, payload, _ = scenario(rng, data)
+            session.request(method, base_url + path, json=payload)
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            method, path, payload, expected = scenario(rng, data)
+            start = time.perf_counter()
+            response = session.request(method, base_url + path, json=payload)
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code not in expected:
+                local_errors.append(response.status_code)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+
+    start_barrier = threading.Barrier(concurrency + 1)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    rss_before = rss_mb()
+    # El plazo se fija antes de liberar a los clientes para que todos lo vean
+    deadline[0] = time.perf_counter() + duration
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "rss_mb": round(rss_mb(), 1),
+        "rss_delta_mb": round(rss_mb() - rss_before, 1)
+    }
+
+
+def compare(results, baselines, tolerance):
+    # Regresión: p99 por encima de la baseline + tolerancia, o req/s por debajo de baseline - tolerancia
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+        if result["p99_ms"] > baseline["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {result['p99_ms']}ms > baseline {baseline['p99_ms']}ms")
+        if result["rps"] < baseline["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} req/s < baseline {baseline['rps']} req/s")
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} respuestas con estado inesperado")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del backend contra un PocketBase simulado")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="lista separada por comas")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia añadida por llamada a PocketBase (ms)")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por escenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5, help="peticiones de calentamiento por cliente")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", action="store_true", help="imprime los resultados en JSON")
+    args = parser.parse_args()
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(unknown)}")
+
+    server, pocketbase_url = start_fake_pocketbase(latency=args.latency / 1000)
+    started = time.perf_counter()
+    ids, open_assignments = seed(server.store, args.profile)
+    print(f"Sembrado '{args.profile}' en {time.perf_counter() - started:.1f}s, memoria {rss_mb():.0f} MB")
+
+    # La URL se fija antes de importar la app: el cliente y los servicios la leen al importarse
+    os.environ["POCKETBASE_URL"] = pocketbase_url
+    from app import app
+    from services.pocketbase_client import client
+    client.base_url = pocketbase_url
+
+    http_server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{http_server.server_port}"
+
+    data = {"ids": ids, "open_assignments": open_assignments}
+    results = {}
+    try:
+        print(f"{'escenario':<16} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8} {'RSS MB':>8}")
+        for name in names:
+            result = run_scenario(base_url, SCENARIOS[name], data, args.duration, args.concurrency, args.warmup)
+            results[name] = result
+            print(f"{name:<16} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['errors']:>8} {result['rss_mb']:>8.1f}")
+    finally:
+        http_server.shutdown()
+        server.shutdown()
+    print(f"Pico de memoria: {peak_rss_mb():.0f} MB")
+
+    key = f"{args.profile}/latency={args.latency:g}ms/concurrency={args.concurrency}"
+    stored = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    if args.json:
+        print(json.dumps({key: results}, indent=2))
+
+    if args.save_baseline:
+        stored[key] = {**stored.get(key, {}), **results}
+        BASELINES_PATH.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline guardada en {BASELINES_PATH.name} ({key})")
+        return
+
+    regressions = compare(results, stored.get(key, {}), args.tolerance)
+    if regressions:
+        print("REGRESIONES:")
+        for line in regressions:
+            print(f"  - {line}")
+        raise SystemExit(1)
+    if key in stored:
+        print(f"Sin regresiones respecto a la baseline ({key}, tolerancia {args.tolerance:.0%})")
+    else:
+        print(f"No hay baseline para {key}; usa --save-baseline para guardarla")
+
+
+if __name__ == "__main__":
+    main()
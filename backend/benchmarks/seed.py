@@ -0,0 +1,94 @@
+# Datos sintéticos y deterministas para los benchmarks, cargados directamente en el FakeStore.
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.fake_pocketbase import new_id
+
+# Cantidad de registros por colección para cada escala
+PROFILES = {
+    "small": {"types": 20, "accounts": 10000, "leads": 10000, "account_leads": 20000,
+              "projects": 200, "project_boards": 400, "project_tasks": 20000, "users": 100},
+    "medium": {"types": 50, "accounts": 100000, "leads": 100000, "account_leads": 200000,
+               "projects": 2000, "project_boards": 4000, "project_tasks": 200000, "users": 500},
+    "large": {"types": 100, "accounts": 1000000, "leads": 1000000, "account_leads": 1000000,
+              "projects": 10000, "project_boards": 20000, "project_tasks": 1000000, "users": 2000},
+}
+BATCH_SIZE = 10000
+DEFAULT_COLUMNS = ["todo", "doing", "review", "done"]
+
+
+def _insert(store, collection_name, count, build):
+    ids, batch = [], []
+    for i in range(count):
+        record = build(i)
+        record["id"] = new_id()
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            ids.extend(store.insert_many(collection_name, batch))
+            batch = []
+    if batch:
+        ids.extend(store.insert_many(collection_name, batch))
+    return ids
+
+
+def seed(store, profile="small", seed_value=42):
+    # Devuelve los ids creados por colección y las asignaciones abiertas (para el duplicado de POST /account-leads)
+    counts = PROFILES[profile]
+    rng = random.Random(seed_value)
+    today = datetime.utcnow()
+    ids = {}
+
+    ids["types"] = _insert(store, "types", counts["types"], lambda i: {"name": f"Tipo {i}", "description": ""})
+    ids["users"] = _insert(store, "users", counts["users"], lambda i: {"name": f"Usuario {i}", "email": f"user{i}@example.com"})
+    ids["accounts"] = _insert(store, "accounts", counts["accounts"], lambda i: {
+        "name": f"Cuenta {i}",
+        "website": f"https://cuenta{i}.example.com",
+        "phone": f"55{rng.randrange(10 ** 8):08d}",
+        "tax_id": f"RFC{i:08d}",
+        "type_id": rng.choice(ids["types"])
+    })
+    ids["leads"] = _insert(store, "leads", counts["leads"], lambda i: {
+        "name": f"Lead {i}",
+        "last_name": rng.choice(["García", "López", "Martínez", "Hernández", "Pérez"]),
+        "phone": f"55{rng.randrange(10 ** 8):08d}",
+        "personal_email": f"lead{i}@mail.example.com",
+        "work_email": f"lead{i}@corp.example.com"
+    })
+
+    open_assignments = []
+
+    def account_lead(i):
+        account_id, lead_id = rng.choice(ids["accounts"]), rng.choice(ids["leads"])
+        # Una parte cae en el mes actual para que /account-leads/recent devuelva datos
+        start = today - timedelta(days=rng.randrange(3 if i % 10 == 0 else 720))
+        ended = i % 3 == 0
+        if not ended:
+            open_assignments.append((account_id, lead_id))
+        return {
+            "account_id": account_id,
+            "lead_id": lead_id,
+            "start_date": start.strftime("%Y-%m-%d 00:00:00.000Z"),
+            "end_date": (start + timedelta(days=30)).strftime("%Y-%m-%d 00:00:00.000Z") if ended else ""
+        }
+    ids["account_leads"] = _insert(store, "account_leads", counts["account_leads"], account_lead)
+
+    ids["projects"] = _insert(store, "projects", counts["projects"], lambda i: {
+        "name": f"Proyecto {i}", "status": "active", "account_id": rng.choice(ids["accounts"])
+    })
+    ids["project_boards"] = _insert(store, "project_boards", counts["project_boards"], lambda i: {
+        "title": f"Tablero {i}",
+        "order": i,
+        "project_id": rng.choice(ids["projects"]),
+        "columns": [{"id": c, "name": c.capitalize(), "order": n} for n, c in enumerate(DEFAULT_COLUMNS, start=1)],
+        "version": 0
+    })
+    # Como en las migraciones, assignee_id apunta a leads; los asignados salen de un grupo reducido (el equipo)
+    assignees = ids["leads"][:counts["users"]]
+    ids["project_tasks"] = _insert(store, "project_tasks", counts["project_tasks"], lambda i: {
+        "title": f"Tarea {i}",
+        "board_id": ids["project_boards"][i % len(ids["project_boards"])],
+        "order": i,
+        "assignee_id": rng.choice(assignees),
+        "column_id": rng.choice(DEFAULT_COLUMNS)
+    })
+    return ids, open_assignments
@@ -1,19 +1,64 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime
-import requests
+from services.pocketbase_client import (
+    ZERO_DATE, client, empty_date, expand_items, get_all, get_collection, keyset_list, list_params, quote, wants_normalized
+)
+from services.json_response import passthrough
+from services.recent_leads import EXPAND as SUMMARY_EXPAND, current_month, monthly_leads, parse_month
 
 account_leads_bp = Blueprint('account_leads', __name__)
 
+# Una relación sigue activa si no tiene fecha de fin (vacía o la fecha cero heredada) o si ésta aún no llega
+OPEN_FILTER = empty_date("end_date")
+ACTIVE_FILTER = f"({OPEN_FILTER} || end_date > @now)"
+INACTIVE_FILTER = f"(end_date != '' && end_date != '{ZERO_DATE}' && end_date <= @now)"
+
+
+def build_relations_filter(args):
+    # Traduce account_id, lead_id y active=true|false a un filtro de PocketBase
+    conditions = []
+    if args.get("account_id"):
+        conditions.append(f"account_id = {quote(args['account_id'])}")
+    if args.get("lead_id"):
+        conditions.append(f"lead_id = {quote(args['lead_id'])}")
+
+    active = args.get("active")
+    if active is not None:
+        if active.lower() not in ("true", "false"):
+            raise ValueError("El parámetro active debe ser true o false")
+        conditions.append(ACTIVE_FILTER if active.lower() == "true" else INACTIVE_FILTER)
+
+    return " && ".join(conditions)
+
+
+def find_open_assignment(account_id, lead_id):
+    # Consulta puntual respaldada por idx_account_leads_open_assignment (account_id, lead_id, end_date)
+    response = client.get("account_leads", params={
+        "filter": f"account_id = {quote(account_id)} && lead_id = {quote(lead_id)} && {OPEN_FILTER}",
+        "perPage": 1,
+        "skipTotal": 1
+    })
+    items = response.json().get("items", [])
+    return items[0] if items else None
+
+
 @account_leads_bp.route('/account-leads/all', methods=['GET'])
 def get_all_account_leads():
     try:
-        print("Iniciando obtención de relaciones desde PocketBase...")
-        response = requests.get(
-            "http://127.0.0.1:8090/api/collections/account_leads/records?expand=account_id,lead_id&perPage=200"
-        )
-        response.raise_for_status()
-        data = response.json()
-        return jsonify(data.get("items", [])), 200
+        # Solo filter y expand: expand se valida como en list_params y todo se recorre sin paginar
+        params = list_params({"expand": request.args.get("expand")}, base_filter=build_relations_filter(request.args) or None,
+                             default_expand="account_id,lead_id")
+        expand = params.pop("expand")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        if wants_normalized(request.args):
+            # Cada cuenta y lead se pide y se devuelve una sola vez, en "included"
+            return jsonify(expand_items("account_leads", get_all("account_leads", params), expand, normalized=True)), 200
+        return jsonify(get_all("account_leads", {**params, "expand": expand})), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print("ERROR REAL EN BACKEND:", str(e))
         return jsonify({'error': str(e)}), 500
@@ -22,11 +67,29 @@ def get_all_account_leads():
 @account_leads_bp.route('/account-leads', methods=['GET'])
 def get_account_leads():
     try:
-        response = requests.get(
-            "http://127.0.0.1:8090/api/collections/account_leads/records?expand=account_id,lead_id&perPage=200"
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        # page, perPage, sort, expand, fields y filter se validan como en /accounts; el filtro de
+        # account_id, lead_id y active siempre se aplica
+        params = list_params(request.args, base_filter=build_relations_filter(request.args) or None,
+                             default_expand="account_id,lead_id")
+        params.setdefault("perPage", 200)
+        # ?normalize=true: en lugar de repetirse en cada fila, cada cuenta y lead va una sola vez en "included"
+        normalized = wants_normalized(request.args)
+        expand = params.pop("expand") if normalized else None
+        # ?cursor= (vacío para la primera página) activa la paginación por keyset. Un 400 de PocketBase
+        # (filtro u orden no válido) responde 400, como en /accounts
+        if "cursor" in request.args:
+            data = keyset_list("account_leads", params, request.args["cursor"])
+        else:
+            data = get_collection("account_leads", params=params, raw=not normalized)
+            if data is None:
+                return jsonify({'error': 'No se pudieron obtener los datos'}), 500
+            if not normalized:
+                return passthrough(data)
+        if normalized:
+            data.update(expand_items("account_leads", data.get("items", []), expand, normalized=True))
+        return jsonify(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -40,15 +103,8 @@ def create_account_lead():
 
         start_date = data.get("start_date", datetime.utcnow().strftime('%Y-%m-%d'))
 
-        existing = requests.get("http://127.0.0.1:8090/api/collections/account_leads/records?perPage=200")
-        existing.raise_for_status()
-        items = existing.json().get("items", [])
-
-        for r in items:
-            if r.get("account_id") == account_id and r.get("lead_id") == lead_id:
-                end_date = r.get("end_date")
-                if end_date in [None, "", "null", "0001-01-01 00:00:00Z"]:
-                    return jsonify({"error": "Este lead ya está asignado a esta cuenta."}), 409
+        if find_open_assignment(account_id, lead_id):
+            return jsonify({"error": "Este lead ya está asignado a esta cuenta."}), 409
 
         payload = {
             "account_id": account_id,
@@ -60,12 +116,9 @@ def create_account_lead():
         if data.get("end_date") not in [None, "", "null"]:
             payload["end_date"] = data.get("end_date")
 
-        response = requests.post(
-            "http://127.0.0.1:8090/api/collections/account_leads/records",
-            json=payload
-        )
-        response.raise_for_status()
-        return jsonify(response.json()), 201
+        relation = client.post("account_leads", json=payload, params={"expand": SUMMARY_EXPAND}).json()
+        monthly_leads.apply(relation)
+        return jsonify(relation), 201
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -74,10 +127,8 @@ def create_account_lead():
 @account_leads_bp.route('/account-leads/<string:relation_id>', methods=['GET'])
 def get_account_lead_by_id(relation_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/account_leads/records/{relation_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get("account_leads", relation_id)
+        return passthrough(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -93,10 +144,9 @@ def update_account_lead(relation_id):
             "end_date": data.get("end_date"),
             "notes": data.get("notes")
         }
-        url = f"http://127.0.0.1:8090/api/collections/account_leads/records/{relation_id}"
-        response = requests.patch(url, json=payload)
-        response.raise_for_status()
-        return jsonify(response.json())
+        relation = client.patch("account_leads", relation_id, json=payload, params={"expand": SUMMARY_EXPAND}).json()
+        monthly_leads.apply(relation)
+        return jsonify(relation)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -104,9 +154,8 @@ def update_account_lead(relation_id):
 @account_leads_bp.route('/account-leads/<string:relation_id>', methods=['DELETE'])
 def delete_account_lead(relation_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/account_leads/records/{relation_id}"
-        response = requests.delete(url)
-        response.raise_for_status()
+        client.delete("account_leads", relation_id)
+        monthly_leads.discard(relation_id)
         return jsonify({"message": "Relación eliminada correctamente"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -116,51 +165,23 @@ def delete_account_lead(relation_id):
 def patch_account_lead(relation_id):
     try:
         data = request.get_json()
-        url = f"http://127.0.0.1:8090/api/collections/account_leads/records/{relation_id}"
-        response = requests.patch(url, json=data)
-        response.raise_for_status()
-        return jsonify(response.json())
+        relation = client.patch("account_leads", relation_id, json=data, params={"expand": SUMMARY_EXPAND}).json()
+        monthly_leads.apply(relation)
+        return jsonify(relation)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
 @account_leads_bp.route('/account-leads/recent', methods=['GET'])
 def get_recent_account_leads():
+    # Asignaciones cuyo start_date cae en el mes indicado (?month=YYYY-MM, por defecto el actual)
     try:
-        response = requests.get(
-            "http://127.0.0.1:8090/api/collections/account_leads/records?expand=account_id.type_id,lead_id&perPage=200"
-        )
-        response.raise_for_status()
-        data = response.json().get("items", [])
-
-        now = datetime.utcnow()
-        current_month = now.month
-        current_year = now.year
-
-        recent_leads = []
-        for item in data:
-            start_date_str = item.get("start_date")
-            if not start_date_str:
-                continue
-
-            try:
-                start_date = datetime.strptime(start_date_str[:10], "%Y-%m-%d")
-                if start_date.month == current_month and start_date.year == current_year:
-                    lead_name = item.get("expand", {}).get("lead_id", {}).get("name", "Sin nombre")
-                    account = item.get("expand", {}).get("account_id", {})
-                    account_name = account.get("name", "Sin empresa")
-                    type_name = account.get("expand", {}).get("type_id", {}).get("name", "Sin tipo")
-
-                    recent_leads.append({
-                        "id": item.get("id"),
-                        "start_date": start_date_str,
-                        "lead_name": lead_name,
-                        "account_name": account_name,
-                        "account_type": type_name
-                    })
-            except Exception:
-                continue
-
-        return jsonify(recent_leads), 200
+        month = parse_month(request.args["month"]) if request.args.get("month") else current_month()
+    except ValueError:
+        return jsonify({'error': 'El parámetro month debe tener el formato YYYY-MM'}), 400
 
+    try:
+        return jsonify(monthly_leads.rows(month)), 200
     except Exception as e:
         print("❌ Error en get_recent_account_leads:", str(e))
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': str(e)}), 500
\ No newline at end of file
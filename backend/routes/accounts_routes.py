@@ -1,18 +1,42 @@
 from flask import Blueprint, jsonify, request
-from services.pocketbase_client import get_collection
 import requests
+from routes.account_leads_routes import ACTIVE_FILTER, INACTIVE_FILTER
+from services.pocketbase_client import client, gather, get_all, get_collection, iter_records, keyset_list, list_params, quote
+from services.streaming import STREAM_FORMATS, stream_records
+from services.json_response import passthrough
+from services.cache import cached, invalidates
+from services.search_index import search_index
+from services.type_counts import account_type_counts
 
 accounts_bp = Blueprint('accounts', __name__)
 
 @accounts_bp.route('/accounts', methods=['GET'])
+@cached('accounts')
 def get_accounts():
-    data = get_collection('accounts')
-    if data:
-        return jsonify(data)
+    # ?type_id=... se filtra en PocketBase en lugar de devolver todas las cuentas
+    type_id = request.args.get("type_id")
+    try:
+        params = list_params(request.args, base_filter=f"type_id = {quote(type_id)}" if type_id else None)
+        # ?cursor= (vacío para la primera página) activa la paginación por keyset
+        if "cursor" in request.args:
+            return jsonify(keyset_list('accounts', params, request.args["cursor"]))
+        data = get_collection('accounts', params=params, raw=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if data is not None:
+        return passthrough(data)
     else:
         return jsonify({'error': 'No se pudieron obtener los datos'}), 500
 
+@accounts_bp.route('/accounts/export', methods=['GET'])
+def export_accounts():
+    fmt = request.args.get("format", "json")
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": "Formato no soportado, usa json o ndjson"}), 400
+    return stream_records(iter_records("accounts"), fmt)
+
 @accounts_bp.route('/accounts', methods=['POST'])
+@invalidates('accounts')
 def create_account():
     try:
         # Recibe los datos enviados en la solicitud
@@ -26,24 +50,68 @@ def create_account():
             "type_id": data.get("industry_type")  # Aquí estamos agregando el tipo de industria (type_id)
         }
         # Realiza la solicitud POST para crear la cuenta con el tipo de industria
-        response = requests.post("http://127.0.0.1:8090/api/collections/accounts/records", json=payload)
-        response.raise_for_status()  # Verifica si la solicitud fue exitosa
-        return jsonify(response.json()), 201  # Devuelve la respuesta de la creación de la cuenta
+        account = client.post("accounts", json=payload).json()
+        account_type_counts.set_type(account["id"], account.get("type_id"))
+        search_index.index_record("accounts", account)
+        return jsonify(account), 201  # Devuelve la respuesta de la creación de la cuenta
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @accounts_bp.route('/accounts/<string:account_id>', methods=['GET'])
+@cached('accounts')
 def get_account_by_id(account_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/accounts/records/{account_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get("accounts", account_id)
+        return passthrough(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
+@accounts_bp.route('/accounts/<string:account_id>/overview', methods=['GET'])
+def get_account_overview(account_id):
+    # Lo que muestra el detalle de la cuenta en una sola respuesta: cuenta con su tipo, leads actuales
+    # y anteriores, y proyectos. Las lecturas a PocketBase se hacen en paralelo
+    relations_filter = f"account_id = {quote(account_id)}"
+    try:
+        account, current, previous, projects = gather(
+            lambda: client.get("accounts", account_id, params={"expand": "type_id"}).json(),
+            lambda: get_all("account_leads", {
+                "filter": f"{relations_filter} && {ACTIVE_FILTER}", "expand": "lead_id", "sort": "-start_date"
+            }),
+            lambda: get_all("account_leads", {
+                "filter": f"{relations_filter} && {INACTIVE_FILTER}", "expand": "lead_id", "sort": "-end_date"
+            }),
+            lambda: get_all("projects", {"filter": relations_filter, "sort": "-created"})
+        )
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return jsonify({"error": "Cuenta no encontrada"}), 404
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def with_lead(relations):
+        # El lead expandido va en "lead"; las relaciones con el lead ya borrado no se muestran
+        shaped = []
+        for relation in relations:
+            lead = (relation.pop("expand", None) or {}).get("lead_id")
+            if lead:
+                shaped.append({**relation, "lead": lead})
+        return shaped
+
+    current, previous = with_lead(current), with_lead(previous)
+    account_type = (account.pop("expand", None) or {}).get("type_id")
+    return jsonify({
+        "account": account,
+        "type": account_type,
+        "current_leads": current,
+        "previous_leads": previous,
+        "projects": projects,
+        "counts": {"current_leads": len(current), "previous_leads": len(previous), "projects": len(projects)}
+    })
+
 @accounts_bp.route('/accounts/<string:account_id>', methods=['PATCH', 'PUT'])  # Permite tanto PATCH como PUT
+@invalidates('accounts')
 def update_account(account_id):
     try:
         data = request.get_json()
@@ -55,19 +123,20 @@ def update_account(account_id):
             "tax_id": data.get("tax_id"),
             "type_id": data.get("type_id")  # Asegúrate de incluir type_id en el payload
         }
-        url = f"http://127.0.0.1:8090/api/collections/accounts/records/{account_id}"
-        response = requests.patch(url, json=payload)  # Usa PATCH para actualizar parcialmente
-        response.raise_for_status()
-        return jsonify(response.json())
+        account = client.patch("accounts", account_id, json=payload).json()  # Usa PATCH para actualizar parcialmente
+        account_type_counts.set_type(account_id, account.get("type_id"))
+        search_index.index_record("accounts", account)
+        return jsonify(account)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @accounts_bp.route('/accounts/<string:account_id>', methods=['DELETE'])
+@invalidates('accounts')
 def delete_account(account_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/accounts/records/{account_id}"
-        response = requests.delete(url)
-        response.raise_for_status()
+        client.delete("accounts", account_id)
+        account_type_counts.remove(account_id)
+        search_index.remove_record("accounts", account_id)
         return jsonify({"message": "Cuenta eliminada correctamente"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,65 @@
+from flask import Blueprint, Response, jsonify, request
+import json
+import queue
+from services.realtime import hub
+
+events_bp = Blueprint('events', __name__)
+
+KEEPALIVE_SECONDS = 15
+
+
+def sse_response(subscriber):
+    # Con serve.py (gevent) cada conexión abierta es una greenlet, no un hilo
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if subscriber.overflowed and subscriber.queue.empty():
+                    # Se perdieron eventos: el cliente debe recargar y volver a conectarse
+                    yield "event: reset\ndata: {}\n\n"
+                    break
+                try:
+                    event = subscriber.queue.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['collection']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    response = Response(stream(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@events_bp.route('/events/boards/<string:board_id>', methods=['GET'])
+def board_events(board_id):
+    def match(event):
+        record = event["record"]
+        if event["collection"] == "project_boards":
+            return record.get("id") == board_id
+        return record.get("board_id") == board_id
+
+    return sse_response(hub.subscribe(["project_tasks", "project_boards"], match))
+
+
+@events_bp.route('/events/account-leads', methods=['GET'])
+def account_lead_events():
+    account_id = request.args.get("account_id")
+    lead_id = request.args.get("lead_id")
+
+    def match(event):
+        record = event["record"]
+        if account_id and record.get("account_id") != account_id:
+            return False
+        if lead_id and record.get("lead_id") != lead_id:
+            return False
+        return True
+
+    return sse_response(hub.subscribe(["account_leads"], match))
+
+
+@events_bp.route('/events/stats', methods=['GET'])
+def events_stats():
+    return jsonify(hub.stats())
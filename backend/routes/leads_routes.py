@@ -1,19 +1,76 @@
 from flask import Blueprint, jsonify, request
-from services.pocketbase_client import get_collection
+from services.pocketbase_client import client, get_collection, iter_records, keyset_list, list_params
+from services.recent_leads import monthly_leads
+from services.search_index import search_index
+from services.streaming import STREAM_FORMATS, stream_records
+from services.json_response import passthrough
+from services.bulk_import import IMPORT_FORMATS, import_format, lead_importer
 from datetime import datetime, timezone
-import requests
 
 leads_bp = Blueprint('leads', __name__)
 
 
 @leads_bp.route('/leads', methods=['GET'])
 def get_leads():
-    data = get_collection('leads')
-    if data:
-        return jsonify(data)
+    try:
+        params = list_params(request.args)
+        # ?cursor= (vacío para la primera página) activa la paginación por keyset
+        if "cursor" in request.args:
+            return jsonify(keyset_list('leads', params, request.args["cursor"]))
+        data = get_collection('leads', params=params, raw=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if data is not None:
+        return passthrough(data)
     else:
         return jsonify({'error': 'No se pudieron obtener los datos'}), 500
 
+@leads_bp.route('/leads/export', methods=['GET'])
+def export_leads():
+    fmt = request.args.get("format", "json")
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": "Formato no soportado, usa json o ndjson"}), 400
+    return stream_records(iter_records("leads"), fmt)
+
+@leads_bp.route('/leads/import', methods=['POST'])
+def import_leads():
+    # Archivo CSV o NDJSON en el campo "file" (multipart) o como cuerpo de la petición.
+    # Responde 202 con la importación en curso; el avance se consulta en /leads/imports/<id>
+    upload = request.files.get("file")
+    fmt = request.args.get("format") or (import_format(upload.filename, upload.mimetype) if upload else import_format(mimetype=request.mimetype))
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": "Formato no soportado, usa csv o ndjson"}), 400
+    create_accounts = (request.args.get("create_accounts") or "").lower() in ("1", "true")
+    try:
+        job = lead_importer.submit(upload.stream if upload else request.stream, fmt, create_accounts)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    response = jsonify(job)
+    response.headers["Location"] = f"/leads/imports/{job['id']}"
+    return response, 202
+
+@leads_bp.route('/leads/imports', methods=['GET'])
+def get_lead_imports():
+    return jsonify(lead_importer.recent())
+
+@leads_bp.route('/leads/imports/<string:job_id>', methods=['GET'])
+def get_lead_import(job_id):
+    job = lead_importer.get(job_id)
+    if job is None:
+        return jsonify({"error": "Importación no encontrada"}), 404
+    return jsonify(job)
+
+@leads_bp.route('/leads/imports/<string:job_id>/errors', methods=['GET'])
+def get_lead_import_errors(job_id):
+    # Filas rechazadas con su número de línea y el motivo
+    fmt = request.args.get("format", "json")
+    if fmt not in STREAM_FORMATS:
+        return jsonify({"error": "Formato no soportado, usa json o ndjson"}), 400
+    errors = lead_importer.errors(job_id)
+    if errors is None:
+        return jsonify({"error": "Importación no encontrada"}), 404
+    return stream_records(errors, fmt)
+
 @leads_bp.route('/leads', methods=['POST'])
 def create_lead():
     try:
@@ -25,19 +82,17 @@ def create_lead():
             "personal_email": data.get("personal_email"),
             "work_email": data.get("work_email")
         }
-        response = requests.post("http://127.0.0.1:8090/api/collections/leads/records", json=payload)
-        response.raise_for_status()
-        return jsonify(response.json()), 201
+        lead = client.post("leads", json=payload).json()
+        search_index.index_record("leads", lead)
+        return jsonify(lead), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @leads_bp.route('/leads/<string:lead_id>', methods=['GET'])
 def get_lead_by_id(lead_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/leads/records/{lead_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get("leads", lead_id)
+        return passthrough(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -52,19 +107,19 @@ def update_lead(lead_id):
             "personal_email": data.get("personal_email"),
             "work_email": data.get("work_email")
         }
-        url = f"http://127.0.0.1:8090/api/collections/leads/records/{lead_id}"
-        response = requests.patch(url, json=payload)
-        response.raise_for_status()
-        return jsonify(response.json())
+        lead = client.patch("leads", lead_id, json=payload).json()
+        monthly_leads.clear()
+        search_index.index_record("leads", lead)
+        return jsonify(lead)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @leads_bp.route('/leads/<string:lead_id>', methods=['DELETE'])
 def delete_lead(lead_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/leads/records/{lead_id}"
-        response = requests.delete(url)
-        response.raise_for_status()
+        client.delete("leads", lead_id)
+        monthly_leads.clear()
+        search_index.remove_record("leads", lead_id)
         return jsonify({"message": "Lead eliminado correctamente"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
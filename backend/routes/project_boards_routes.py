@@ -1,10 +1,20 @@
 from flask import Blueprint, jsonify, request
-import requests
-import time
+import hashlib
+import json
+from services.pocketbase_client import (
+    client, expand_items, gather, get_all, get_collection, list_params, quote, wants_normalized
+)
+from services.change_log import records_cursor, task_removals
+from services.board_columns import (
+    COLUMN_OPS, ColumnNotFound, ConcurrentUpdate, VersionMismatch,
+    board_etag, fetch_board, mutate_columns, parse_if_match, remember
+)
+from services.json_response import passthrough
+from services.write_behind import write_behind
 
 project_boards_bp = Blueprint('project_boards', __name__)
 
-BASE_URL = "http://127.0.0.1:8090/api/collections/project_boards/records"
+COLLECTION = "project_boards"
 
 @project_boards_bp.route('/boards', methods=['POST'])
 def create_board():
@@ -20,8 +30,7 @@ def create_board():
                 {"id": "done", "name": "Hecho", "order": 3}
             ]
         }
-        response = requests.post(BASE_URL, json=payload)
-        response.raise_for_status()
+        response = client.post(COLLECTION, json=payload)
         return jsonify(response.json()), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -30,12 +39,12 @@ def create_board():
 @project_boards_bp.route('/projects/<string:project_id>/boards', methods=['GET'])
 def get_boards_for_project(project_id):
     try:
-        url = f"{BASE_URL}?project_id={project_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        data = get_collection(COLLECTION, params=list_params(request.args, base_filter=f"project_id = {quote(project_id)}"), raw=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data is None:
+        return jsonify({"error": "No se pudieron obtener los datos"}), 500
+    return passthrough(data)
 
 
 @project_boards_bp.route('/boards/<string:board_id>', methods=['PUT'])
@@ -47,9 +56,7 @@ def update_board(board_id):
             "project_id": data.get("project_id"),
             "order": data.get("order")
         }
-        url = f"{BASE_URL}/{board_id}"
-        response = requests.patch(url, json=payload)
-        response.raise_for_status()
+        response = client.patch(COLLECTION, board_id, json=payload)
         return jsonify(response.json())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -58,9 +65,8 @@ def update_board(board_id):
 @project_boards_bp.route('/boards/<string:board_id>', methods=['DELETE'])
 def delete_board(board_id):
     try:
-        url = f"{BASE_URL}/{board_id}"
-        response = requests.delete(url)
-        response.raise_for_status()
+        client.delete(COLLECTION, board_id)
+        write_behind.discard(COLLECTION, board_id)
         return jsonify({"message": "Board eliminado correctamente"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -70,118 +76,143 @@ def delete_board(board_id):
 # NUEVOS ENDPOINTS DE COLUMNAS
 # =========================
 
+def column_ops_response(board_id, ops, build_body, status=200):
+    # Ejecuta las operaciones con escritura condicional y traduce los errores a HTTP
+    queued = False
+    try:
+        expected_version = parse_if_match(request.headers.get("If-Match"))
+        if write_behind.enabled and expected_version is None:
+            # Escritura diferida: las operaciones se validan y se encolan; se escriben juntas después
+            board, results = write_behind.column_ops(board_id, ops)
+            queued = True
+        else:
+            write_behind.flush(COLLECTION, board_id)
+            board, results = mutate_columns(board_id, ops, expected_version)
+    except ColumnNotFound:
+        return jsonify({"error": "Columna no encontrada"}), 404
+    except VersionMismatch as e:
+        response = jsonify({"error": str(e), "version": e.current_version})
+        response.headers["ETag"] = board_etag(e.current_version)
+        return response, 412
+    except ConcurrentUpdate as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    response = jsonify(build_body(board, results))
+    if queued:
+        # La versión definitiva se conoce al escribir en PocketBase: sin ETag
+        return response, 202
+    response.headers["ETag"] = board_etag(board.get("version"))
+    return response, status
+
+
 @project_boards_bp.route('/boards/<string:board_id>/columns', methods=['GET'])
 def get_board_columns(board_id):
     try:
-        r = requests.get(f"{BASE_URL}/{board_id}")
-        r.raise_for_status()
-        board = r.json()
-        return jsonify(board.get('columns') or []), 200
+        board = write_behind.overlay(COLLECTION, fetch_board(board_id))
+        response = jsonify(board.get('columns') or [])
+        response.headers["ETag"] = board_etag(board.get("version"))
+        return response, 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @project_boards_bp.route('/boards/<string:board_id>/columns', methods=['POST'])
 def add_board_column(board_id):
-    try:
-        data = request.get_json()
-        col_id = data.get("id") or f"col_{int(time.time() * 1000)}"
-
-        new_col = {
-            "id": col_id,
-            "name": data.get("name", "Nueva columna"),
-            "order": data.get("order", 9999)
-        }
-
-        # Obtener columnas actuales
-        r = requests.get(f"{BASE_URL}/{board_id}")
-        r.raise_for_status()
-        board = r.json()
-        cols = board.get('columns') or []
-        cols.append(new_col)
-
-        pr = requests.patch(f"{BASE_URL}/{board_id}", json={"columns": cols})
-        pr.raise_for_status()
-
-        return jsonify(new_col), 201
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    data = request.get_json() or {}
+    op = {"op": "add", "id": data.get("id"), "name": data.get("name", "Nueva columna"), "order": data.get("order", 9999)}
+    return column_ops_response(board_id, [op], lambda board, results: results[0], 201)
 
 @project_boards_bp.route('/boards/<string:board_id>/columns/<string:col_id>', methods=['PUT'])
 def update_board_column(board_id, col_id):
-    try:
-        data = request.get_json()
-        new_name = data.get("name")
-        new_order = data.get("order")  # opcional
-
-        r = requests.get(f"{BASE_URL}/{board_id}")
-        r.raise_for_status()
-        board = r.json()
-        cols = board.get('columns') or []
-
-        found = False
-        updated_cols = []
-        for c in cols:
-            if c.get("id") == col_id:
-                found = True
-                updated = {**c}
-                if new_name is not None:
-                    updated["name"] = new_name
-                if new_order is not None:
-                    updated["order"] = new_order
-                updated_cols.append(updated)
-            else:
-                updated_cols.append(c)
-
-        if not found:
-            return jsonify({"error": "Columna no encontrada"}), 404
-
-        pr = requests.patch(f"{BASE_URL}/{board_id}", json={"columns": updated_cols})
-        pr.raise_for_status()
-
-        return jsonify({"id": col_id, "name": new_name, "order": new_order}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    data = request.get_json() or {}
+    op = {"op": "update", "id": col_id, "name": data.get("name"), "order": data.get("order")}
+    return column_ops_response(board_id, [op], lambda board, results: results[0])
 
 @project_boards_bp.route('/boards/<string:board_id>/columns/reorder', methods=['PUT'])
 def reorder_board_columns(board_id):
-    try:
-        data = request.get_json()
-        order_ids = data.get("order", [])  # ["col_a", "col_b", "col_c"]
-
-        r = requests.get(f"{BASE_URL}/{board_id}")
-        r.raise_for_status()
-        board = r.json()
-        cols = board.get('columns') or []
-
-        id_to_col = {c['id']: c for c in cols}
-        new_cols = []
-        for idx, col_id in enumerate(order_ids, start=1):
-            col = id_to_col.get(col_id)
-            if col:
-                col = {**col, "order": idx}
-                new_cols.append(col)
-
-        remaining = [c for cid, c in id_to_col.items() if cid not in set(order_ids)]
-        next_idx = len(new_cols) + 1
-        for c in remaining:
-            c = {**c, "order": next_idx}
-            new_cols.append(c)
-            next_idx += 1
-
-        pr = requests.patch(f"{BASE_URL}/{board_id}", json={"columns": new_cols})
-        pr.raise_for_status()
-
-        return jsonify({"ok": True}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    data = request.get_json() or {}
+    op = {"op": "reorder", "order": data.get("order", [])}  # ["col_a", "col_b", "col_c"]
+    return column_ops_response(board_id, [op], lambda board, results: results[0])
+
+@project_boards_bp.route('/boards/<string:board_id>/columns/batch', methods=['POST'])
+def batch_board_columns(board_id):
+    # Varias operaciones (add, update, delete, reorder) en una sola escritura atómica
+    ops = (request.get_json() or {}).get("ops")
+    if not isinstance(ops, list) or not ops:
+        return jsonify({"error": "Se requiere una lista de operaciones en ops"}), 400
+    # Se valida todo antes de tomar el lock: una operación mal formada no llega a aplicarse
+    for op in ops:
+        if not isinstance(op, dict) or op.get("op") not in COLUMN_OPS:
+            return jsonify({"error": f"Cada operación debe ser un objeto con op en {', '.join(COLUMN_OPS)}"}), 400
+        if op["op"] == "reorder" and not (isinstance(op.get("order", []), list)
+                                          and all(isinstance(i, str) for i in op.get("order", []))):
+            return jsonify({"error": "reorder requiere una lista de ids en order"}), 400
+    return column_ops_response(board_id, ops, lambda board, results: {
+        "columns": board.get("columns") or [],
+        "version": board.get("version") or 0,
+        "results": results
+    })
     
 @project_boards_bp.route('/boards/<string:board_id>', methods=['GET'])
 def get_board(board_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/project_boards/records/{board_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get(COLLECTION, board_id)
+        # Se registra la versión de las columnas y se reenvía el cuerpo original sin recodificarlo
+        board = remember(response.json())
+        if write_behind.has_pending(COLLECTION, scope=board_id):
+            return jsonify(write_behind.overlay(COLLECTION, board))
+        return passthrough(response)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@project_boards_bp.route('/boards/<string:board_id>/snapshot', methods=['GET'])
+def get_board_snapshot(board_id):
+    try:
+        # El seq de bajas se toma antes de leer: lo que se borre después aparecerá en /changes
+        removals_seq = task_removals.latest_seq()
+
+        # Tablero y tareas se piden a la vez; las tareas se recorren todas, no solo la primera página.
+        # Con ?normalize=true los asignados no se expanden: van una sola vez en "included"
+        normalized = wants_normalized(request.args)
+        task_params = {"filter": f"board_id = {quote(board_id)}", "sort": "order,created"}
+        if not normalized:
+            task_params["expand"] = "assignee_id"
+        board, tasks = gather(
+            lambda: fetch_board(board_id),
+            lambda: get_all("project_tasks", task_params)
+        )
+
+        # Ediciones diferidas aún no escritas en PocketBase (WRITE_BEHIND=1)
+        board = write_behind.overlay(COLLECTION, board)
+        if write_behind.has_pending("project_tasks", scope=board_id):
+            tasks = write_behind.overlay_items("project_tasks", tasks)
+            tasks.sort(key=lambda task: (task.get("order") or 0, task.get("created") or ""))
+
+        columns = sorted(board.pop("columns", None) or [], key=lambda c: c.get("order") or 0)
+        tasks_by_column = {c["id"]: [] for c in columns}
+        for task in tasks:
+            tasks_by_column.setdefault(task.get("column_id") or "", []).append(task)
+
+        snapshot = {
+            "board": board,
+            "version": board.get("version") or 0,
+            "columns": columns,
+            "tasks_by_column": tasks_by_column
+        }
+        if normalized:
+            snapshot["included"] = expand_items("project_tasks", tasks, "assignee_id", normalized=True)["included"]
+        # ETag sobre el contenido (sin el cursor): un tablero sin cambios responde 304 sin cuerpo
+        etag = hashlib.sha1(json.dumps(snapshot, sort_keys=True).encode("utf-8")).hexdigest()
+        snapshot["cursor"] = records_cursor(tasks, removals_seq)
+
+        response = jsonify(snapshot)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
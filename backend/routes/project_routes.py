@@ -1,29 +1,33 @@
 from flask import Blueprint, jsonify, request
-import requests
+from services.pocketbase_client import client, get_collection, list_params, quote
+from services.cache import cached, invalidates
+from services.json_response import passthrough
 
 project_bp = Blueprint('projects', __name__)
 
 @project_bp.route('/projects', methods=['GET'])
+@cached('projects')
 def get_projects():
     try:
-        url = "http://127.0.0.1:8090/api/collections/projects/records"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        data = get_collection("projects", params=list_params(request.args), raw=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data is None:
+        return jsonify({"error": "No se pudieron obtener los datos"}), 500
+    return passthrough(data)
 
 @project_bp.route('/projects/<string:project_id>/boards', methods=['GET'])
 def get_boards_for_project(project_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/project_boards/records?filter=project_id='{project_id}'"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json()), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        data = get_collection("project_boards", params=list_params(request.args, base_filter=f"project_id = {quote(project_id)}"), raw=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data is None:
+        return jsonify({"error": "No se pudieron obtener los datos"}), 500
+    return passthrough(data)
 
 @project_bp.route('/projects', methods=['POST'])
+@invalidates('projects')
 def create_project():
     try:
         data = request.get_json()
@@ -33,24 +37,22 @@ def create_project():
             "status": data.get("status"),
             "account_id": data.get("account_id")
         }
-        url = "http://127.0.0.1:8090/api/collections/projects/records"
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
+        response = client.post("projects", json=payload)
         return jsonify(response.json()), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @project_bp.route('/projects/<string:project_id>', methods=['GET'])
+@cached('projects')
 def get_project_by_id(project_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/projects/records/{project_id}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get("projects", project_id)
+        return passthrough(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @project_bp.route('/projects/<string:project_id>', methods=['PUT'])
+@invalidates('projects')
 def update_project(project_id):
     try:
         data = request.get_json()
@@ -60,19 +62,16 @@ def update_project(project_id):
             "status": data.get("status"),
             "account_id": data.get("account_id")
         }
-        url = f"http://127.0.0.1:8090/api/collections/projects/records/{project_id}"
-        response = requests.patch(url, json=payload)
-        response.raise_for_status()
+        response = client.patch("projects", project_id, json=payload)
         return jsonify(response.json())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @project_bp.route('/projects/<string:project_id>', methods=['DELETE'])
+@invalidates('projects')
 def delete_project(project_id):
     try:
-        url = f"http://127.0.0.1:8090/api/collections/projects/records/{project_id}"
-        response = requests.delete(url)
-        response.raise_for_status()
+        client.delete("projects", project_id)
         return jsonify({"message": "Proyecto eliminado correctamente"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,8 +1,16 @@
 from flask import Blueprint, jsonify, request
-import requests
+from services.pocketbase_client import client, expand_items, get_collection, list_params, quote, wants_normalized
+from services.change_log import EPOCH, decode_cursor, records_cursor, task_removals
+from services.realtime import hub
+from services.json_response import passthrough
+from services.board_columns import board_lock
+from services.task_ranks import MoveConflict, TaskNotFound, last_rank, move_task, position_for
+from services.write_behind import write_behind
 
 project_tasks_bp = Blueprint('project_tasks', __name__)
-BASE_URL = "http://127.0.0.1:8090/api/collections/project_tasks/records"
+COLLECTION = "project_tasks"
+CHANGES_LIMIT = 500
+MAX_MOVES = 200
 
 @project_tasks_bp.route('/tasks', methods=['POST'])
 def create_task():
@@ -15,19 +23,45 @@ def create_task():
             "assignee_id": data.get("assignee_id"),
             "column_id": data.get("column_id", "todo")
         }
-        response = requests.post(BASE_URL, json=payload)
-        response.raise_for_status()
+        # Sin posición explícita, la tarea nueva queda al final de su columna
+        if data.get("order") is not None:
+            payload["order"] = data["order"]
+        elif payload["board_id"]:
+            payload["order"] = last_rank(payload["board_id"], payload["column_id"])
+        response = client.post(COLLECTION, json=payload)
         return jsonify(response.json()), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @project_tasks_bp.route('/boards/<string:board_id>/tasks', methods=['GET'])
 def get_tasks_for_board(board_id):
+    normalized = wants_normalized(request.args)
     try:
-        url = f"{BASE_URL}?filter=board_id='{board_id}'&expand=assignee_id"
-        response = requests.get(url)
-        response.raise_for_status()
-        return jsonify(response.json()), 200
+        params = list_params(
+            request.args, base_filter=f"board_id = {quote(board_id)}",
+            default_sort="order,created", default_expand="assignee_id"
+        )
+        # ?normalize=true: cada asignado se pide una vez y va en "included", no dentro de cada tarea
+        expand = params.pop("expand") if normalized else None
+        data = get_collection(COLLECTION, params=params, raw=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data is None:
+        return jsonify({"error": "No se pudieron obtener los datos"}), 500
+    pending = write_behind.has_pending(COLLECTION, scope=board_id)
+    if not normalized and not pending:
+        return passthrough(data)
+
+    try:
+        page = data.json()
+        if pending:
+            # Hay ediciones diferidas de este tablero: se aplican sobre lo que devuelve PocketBase
+            page["items"] = write_behind.overlay_items(COLLECTION, page.get("items", []))
+            if not request.args.get("sort"):
+                page["items"].sort(key=lambda task: (task.get("order") or 0, task.get("created") or ""))
+        if normalized:
+            page.update(expand_items(COLLECTION, page.get("items", []), expand, normalized=True))
+        return jsonify(page)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -37,21 +71,140 @@ def update_task(task_id):
         data = request.get_json()
         payload = {}
 
-        for field in ["title", "description", "board_id", "column_id", "assignee_id"]:
+        for field in ["title", "description", "board_id", "column_id", "assignee_id", "order"]:
             if data.get(field) is not None:
                 payload[field] = data.get(field)
 
-        response = requests.patch(f"{BASE_URL}/{task_id}", json=payload)
-        response.raise_for_status()
-        return jsonify(response.json())
+        # after_id / before_id: la tarea queda justo debajo / encima de esas tareas de la columna destino
+        after_id, before_id = data.get("after_id"), data.get("before_id")
+        positioned = after_id is not None or before_id is not None
+
+        # Con escritura diferida (WRITE_BEHIND=1) la edición se encola; cambiar de tablero sigue siendo directo
+        queued = write_behind.enabled and "board_id" not in payload
+
+        previous = {}
+        previous_board_id = None
+        if "board_id" in payload or "column_id" in payload or positioned or queued:
+            previous = client.get(COLLECTION, task_id, params={"fields": "id,board_id,column_id"}).json()
+            previous = write_behind.overlay(COLLECTION, previous)
+            previous_board_id = previous.get("board_id") if "board_id" in payload else None
+        # Al pasar a otra columna sin vecinas (p. ej. una columna vacía) ni order explícito, la tarea va
+        # al final: el rango de la columna anterior no sirve en la nueva
+        moved = payload.get("board_id", previous.get("board_id")) != previous.get("board_id") \
+            or payload.get("column_id", previous.get("column_id") or "") != (previous.get("column_id") or "")
+        append = moved and not positioned and "order" not in payload
+        if not queued:
+            # Una escritura directa no puede adelantarse a ediciones diferidas del mismo registro
+            write_behind.flush(COLLECTION, task_id)
+
+        def save():
+            if queued:
+                write_behind.patch(COLLECTION, task_id, payload, scope=previous.get("board_id"))
+                return {**previous, **payload}
+            return client.patch(COLLECTION, task_id, json=payload).json()
+
+        if positioned or append:
+            board_id = payload.get("board_id", previous.get("board_id"))
+            column_id = payload.get("column_id", previous.get("column_id") or "")
+            with board_lock(board_id):
+                if positioned:
+                    payload["order"] = position_for(board_id, column_id, task_id, after_id, before_id)
+                else:
+                    payload["order"] = last_rank(board_id, column_id)
+                task = save()
+        else:
+            task = save()
+        if queued:
+            return jsonify(task), 202
+        if previous_board_id and previous_board_id != payload["board_id"]:
+            # Para el tablero de origen la tarea cuenta como eliminada
+            task_removals.record(previous_board_id, task_id)
+            hub.publish(COLLECTION, "remove", {"id": task_id, "board_id": previous_board_id})
+        return jsonify(task)
+    except TaskNotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except MoveConflict as e:
+        return jsonify({"error": str(e)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@project_tasks_bp.route('/boards/<string:board_id>/tasks/moves', methods=['POST'])
+def move_tasks(board_id):
+    # Varios movimientos en una petición: [{"task_id", "column_id", "after_id"?, "before_id"?}, ...].
+    # Se aplican en orden (uno puede referirse a una tarea movida antes) y cada uno escribe un solo registro
+    moves = (request.get_json() or {}).get("moves")
+    if not isinstance(moves, list) or not moves:
+        return jsonify({"error": "Se requiere una lista de movimientos en moves"}), 400
+    if len(moves) > MAX_MOVES:
+        return jsonify({"error": f"Máximo {MAX_MOVES} movimientos por petición"}), 400
+    for move in moves:
+        if not isinstance(move, dict) or not move.get("task_id") or move.get("column_id") is None:
+            return jsonify({"error": "Cada movimiento requiere task_id y column_id"}), 400
+
+    moved = []
+    try:
+        for move in moves:
+            moved.append(move_task(board_id, move["task_id"], move["column_id"],
+                                   move.get("after_id"), move.get("before_id")))
+    except TaskNotFound as e:
+        return jsonify({"error": str(e), "applied": len(moved), "tasks": moved}), 404
+    except MoveConflict as e:
+        return jsonify({"error": str(e), "applied": len(moved), "tasks": moved}), 409
+    except Exception as e:
+        return jsonify({"error": str(e), "applied": len(moved), "tasks": moved}), 500
+    return jsonify({"applied": len(moved), "tasks": moved}), 200
+
 @project_tasks_bp.route('/tasks/<string:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     try:
-        response = requests.delete(f"{BASE_URL}/{task_id}")
-        response.raise_for_status()
+        task = client.get(COLLECTION, task_id, params={"fields": "id,board_id"}).json()
+        client.delete(COLLECTION, task_id)
+        write_behind.discard(COLLECTION, task_id)
+        if task.get("board_id"):
+            task_removals.record(task["board_id"], task_id)
         return jsonify({"message": "Tarea eliminada correctamente"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@project_tasks_bp.route('/boards/<string:board_id>/changes', methods=['GET'])
+def get_board_changes(board_id):
+    try:
+        cursor = decode_cursor(request.args["since"]) if request.args.get("since") else {}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    since_ts = cursor.get("t", "")
+    seen_ids = set(cursor.get("ids", []))
+    since_seq = cursor.get("d", 0)
+
+    try:
+        deleted, latest_seq, complete = task_removals.since(board_id, since_seq)
+        if cursor and (cursor.get("e") != EPOCH or not complete):
+            # El registro de bajas ya no cubre este cursor: el cliente debe recargar el tablero
+            return jsonify({"reset": True, "changed": [], "deleted": [], "cursor": None, "has_more": False}), 200
+        if not cursor:
+            deleted = []
+
+        filter_str = f"board_id = {quote(board_id)}"
+        if since_ts:
+            filter_str += f" && updated >= {quote(since_ts)}"
+        limit = CHANGES_LIMIT + len(seen_ids)
+        items = client.get(COLLECTION, params={
+            "filter": filter_str,
+            "sort": "updated,id",
+            "expand": "assignee_id",
+            "perPage": limit,
+            "skipTotal": 1
+        }).json().get("items", [])
+
+        changed = [t for t in items if not (t.get("updated") == since_ts and t["id"] in seen_ids)]
+        changed = write_behind.overlay_items(COLLECTION, changed)
+        return jsonify({
+            "reset": False,
+            "changed": changed,
+            "deleted": deleted,
+            "cursor": records_cursor(changed, latest_seq, since_ts, seen_ids),
+            "has_more": len(items) == limit
+        }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,37 @@
+from flask import Blueprint, jsonify, request
+import time
+from services.search_index import SEARCH_FIELDS, IndexWarming, search_index
+
+search_bp = Blueprint('search', __name__)
+
+
+@search_bp.route('/search', methods=['GET'])
+def search():
+    # /search?q=ana per&type=leads,accounts&limit=20 (cada palabra se busca como prefijo)
+    query = request.args.get("q", "").strip()
+    collections = [c for c in request.args.get("type", "").split(",") if c]
+    if any(c not in SEARCH_FIELDS for c in collections):
+        return jsonify({"error": "type debe ser leads y/o accounts"}), 400
+    limit = request.args.get("limit", 20, type=int)
+    if limit < 1:
+        return jsonify({"error": "limit debe ser mayor que 0"}), 400
+
+    try:
+        start = time.perf_counter()
+        items = search_index.search(query, collections, limit)
+        return jsonify({
+            "q": query,
+            "items": items,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3)
+        }), 200
+    except IndexWarming as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "2"
+        return response, 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@search_bp.route('/search/stats', methods=['GET'])
+def search_stats():
+    return jsonify(search_index.stats())
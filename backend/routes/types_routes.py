@@ -1,29 +1,37 @@
 from flask import Blueprint, jsonify, request
-import requests
+from services.pocketbase_client import client, gather, get_all
+from services.json_response import passthrough
+from services.cache import cached, invalidates
+from services.type_counts import account_type_counts
 
 types_bp = Blueprint('types', __name__)
 
-POCKETBASE_URL = "http://127.0.0.1:8090"
-
 @types_bp.route('/types', methods=['GET'])
+@cached('types')
 def get_types():
     try:
-        all_types = []
-        page = 1
-        while True:
-            response = requests.get(f"{POCKETBASE_URL}/api/collections/types/records?perPage=200&page={page}")
-            response.raise_for_status()
-            data = response.json()
-            all_types.extend(data['items'])
-            if len(data['items']) < 200:
-                break
-            page += 1
+        all_types = get_all("types")
 
         return jsonify({'items': all_types})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@types_bp.route('/types/counts', methods=['GET'])
+def get_type_counts():
+    # Cuentas por tipo desde el contador mantenido, sin descargar la tabla de cuentas
+    try:
+        counts = account_type_counts.snapshot()
+        unassigned = counts.pop("", 0)
+        return jsonify({
+            "counts": counts,
+            "unassigned": unassigned,
+            "total": sum(counts.values()) + unassigned
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @types_bp.route('/types', methods=['POST'])
+@invalidates('types')
 def create_type():
     try:
         data = request.get_json()
@@ -31,22 +39,22 @@ def create_type():
             "name": data.get("name"),
             "description": data.get("description", "")
         }
-        response = requests.post(f"{POCKETBASE_URL}/api/collections/types/records", json=payload)
-        response.raise_for_status()
+        response = client.post("types", json=payload)
         return jsonify(response.json()), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @types_bp.route('/types/<string:type_id>', methods=['GET'])
+@cached('types')
 def get_type_by_id(type_id):
     try:
-        response = requests.get(f"{POCKETBASE_URL}/api/collections/types/records/{type_id}")
-        response.raise_for_status()
-        return jsonify(response.json())
+        response = client.get("types", type_id)
+        return passthrough(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @types_bp.route('/types/<string:type_id>', methods=['PUT'])
+@invalidates('types')
 def update_type(type_id):
     try:
         data = request.get_json()
@@ -54,18 +62,61 @@ def update_type(type_id):
             "name": data.get("name"),
             "description": data.get("description")
         }
-        response = requests.patch(f"{POCKETBASE_URL}/api/collections/types/records/{type_id}", json=payload)
-        response.raise_for_status()
+        response = client.patch("types", type_id, json=payload)
         return jsonify(response.json())
     except Exception as e:
         print(f"Error actualizando tipo: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @types_bp.route('/types/<string:type_id>', methods=['DELETE'])
+@invalidates('types', 'accounts')
 def delete_type(type_id):
     try:
-        response = requests.delete(f"{POCKETBASE_URL}/api/collections/types/records/{type_id}")
-        response.raise_for_status()
+        client.delete("types", type_id)
+        # PocketBase vacía la relación en las cuentas que lo usaban: se recuenta y se vacía su caché
+        account_type_counts.clear()
         return jsonify({"message": "Tipo eliminado correctamente"}), 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+def set_account_type(account_id, type_id, action, expected_type_id=None):
+    # Solo se toca type_id; el resto de campos de la cuenta queda igual. Con expected_type_id solo se
+    # cambia si la cuenta aún tiene ese tipo (otro usuario pudo asignarle uno distinto entretanto)
+    try:
+        if expected_type_id is not None:
+            current = client.get("accounts", account_id, params={"fields": "id,type_id"}).json().get("type_id") or ""
+            if current != expected_type_id:
+                return {"id": account_id, "action": action, "ok": False, "conflict": True,
+                        "error": "La cuenta ya no tiene este tipo", "type_id": current}
+        client.patch("accounts", account_id, json={"type_id": type_id})
+        account_type_counts.set_type(account_id, type_id)
+        return {"id": account_id, "action": action, "ok": True}
+    except Exception as e:
+        return {"id": account_id, "action": action, "ok": False, "error": str(e)}
+
+@types_bp.route('/types/<string:type_id>/accounts', methods=['POST'])
+@invalidates('accounts')
+def bulk_update_type_accounts(type_id):
+    data = request.get_json() or {}
+    add_ids = data.get("add") or []
+    remove_ids = data.get("remove") or []
+
+    if not isinstance(add_ids, list) or not isinstance(remove_ids, list) \
+            or not all(isinstance(i, str) and i.strip() for i in add_ids + remove_ids):
+        return jsonify({"error": "add y remove deben ser listas de ids de cuentas"}), 400
+    if set(add_ids) & set(remove_ids):
+        return jsonify({"error": "Una cuenta no puede estar en add y remove a la vez"}), 400
+
+    # gather limita la concurrencia hacia PocketBase al tamaño de su pool
+    results = gather(
+        *[(lambda account_id=account_id: set_account_type(account_id, type_id, "add")) for account_id in dict.fromkeys(add_ids)],
+        *[(lambda account_id=account_id: set_account_type(account_id, "", "remove", expected_type_id=type_id)) for account_id in dict.fromkeys(remove_ids)]
+    )
+
+    failed = sum(1 for r in results if not r["ok"])
+    return jsonify({
+        "type_id": type_id,
+        "updated": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }), 200
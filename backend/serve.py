@@ -0,0 +1,26 @@
+# Modo de servicio concurrente: con gevent cada petición y cada llamada a PocketBase
+# se ejecuta en una greenlet, así un solo proceso mantiene cientos de peticiones en vuelo.
+# Uso (desde backend/): python serve.py
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+# Más conexiones hacia PocketBase que en el modo por hilos, ya que hay más peticiones simultáneas
+os.environ.setdefault("POCKETBASE_POOL_SIZE", "200")
+os.environ.setdefault("POCKETBASE_FANOUT", "100")
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from app import app
+from services.search_index import search_index
+
+if __name__ == '__main__':
+    host = os.environ.get("HOST", "127.0.0.1")
+    port = int(os.environ.get("PORT", "5000"))
+    max_connections = int(os.environ.get("MAX_CONNECTIONS", "1000"))
+
+    # El índice de búsqueda se carga en segundo plano; hasta que esté listo /search responde 503
+    search_index.warm()
+    print(f"Sirviendo en http://{host}:{port} con gevent (máx. {max_connections} conexiones)")
+    WSGIServer((host, port), app, spawn=Pool(max_connections)).serve_forever()
@@ -0,0 +1,162 @@
+import contextlib
+import copy
+import random
+import threading
+import time
+import requests
+from services.cache import TTLCache
+from services.pocketbase_client import client
+
+COLLECTION = "project_boards"
+MAX_ATTEMPTS = 8
+COLUMN_OPS = ("add", "update", "delete", "reorder")
+
+# Último estado conocido de cada tablero (versión y columnas) para escribir sin GET previo;
+# si está desactualizado, la regla de PocketBase rechaza el PATCH y se vuelve a leer
+known_boards = TTLCache(ttl=300, max_entries=2048)
+
+# Dentro del proceso las ediciones de un mismo tablero se serializan (locks repartidos por hash);
+# entre procesos la protección es la escritura condicional de PocketBase
+_board_locks = [threading.Lock() for _ in range(64)]
+
+
+def board_lock(board_id):
+    return _board_locks[hash(board_id) % len(_board_locks)]
+
+
+class ColumnNotFound(Exception):
+    pass
+
+
+class VersionMismatch(Exception):
+    def __init__(self, current_version):
+        super().__init__("El tablero fue modificado por otra persona")
+        self.current_version = current_version
+
+
+class ConcurrentUpdate(Exception):
+    pass
+
+
+def board_etag(version):
+    return f'"{version or 0}"'
+
+
+def parse_if_match(header):
+    # If-Match: "3"  ->  3
+    if not header:
+        return None
+    try:
+        return int(header.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        return None
+
+
+def remember(board):
+    known_boards.set(board["id"], (board.get("version") or 0, board.get("columns") or []))
+    return board
+
+
+def fetch_board(board_id):
+    return remember(client.get(COLLECTION, board_id).json())
+
+
+def default_column_id():
+    return f"col_{int(time.time() * 1000)}"
+
+
+def apply_op(cols, op):
+    kind = op.get("op")
+    if kind == "add":
+        # Con un id que ya existe no se duplica: reaplicar una operación ya escrita no cambia nada
+        existing = next((c for c in cols if op.get("id") and c.get("id") == op["id"]), None)
+        if existing is not None:
+            return existing
+        col = {
+            "id": op.get("id") or default_column_id(),
+            "name": op.get("name", "Nueva columna"),
+            "order": op.get("order", 9999)
+        }
+        cols.append(col)
+        return col
+
+    if kind == "update":
+        for c in cols:
+            if c.get("id") == op.get("id"):
+                if op.get("name") is not None:
+                    c["name"] = op["name"]
+                if op.get("order") is not None:
+                    c["order"] = op["order"]
+                return {"id": op["id"], "name": op.get("name"), "order": op.get("order")}
+        raise ColumnNotFound(op.get("id"))
+
+    if kind == "delete":
+        remaining = [c for c in cols if c.get("id") != op.get("id")]
+        if len(remaining) == len(cols):
+            raise ColumnNotFound(op.get("id"))
+        cols[:] = remaining
+        return {"id": op["id"], "deleted": True}
+
+    if kind == "reorder":
+        order_ids = op.get("order", [])
+        id_to_col = {c['id']: c for c in cols}
+        new_cols = []
+        for idx, col_id in enumerate(order_ids, start=1):
+            col = id_to_col.get(col_id)
+            if col:
+                new_cols.append({**col, "order": idx})
+
+        listed = set(order_ids)
+        next_idx = len(new_cols) + 1
+        for cid, c in id_to_col.items():
+            if cid not in listed:
+                new_cols.append({**c, "order": next_idx})
+                next_idx += 1
+        cols[:] = new_cols
+        return {"ok": True}
+
+    raise ValueError(f"Operación de columna desconocida: {kind}")
+
+
+def mutate_columns(board_id, ops, expected_version=None, lock=True):
+    # Aplica las operaciones sobre la última versión conocida y escribe de forma condicional
+    # (base_version). Sin If-Match, un conflicto se resuelve releyendo y reintentando.
+    # lock=False (escrituras diferidas) no toma el lock del tablero y depende solo de base_version
+    with board_lock(board_id) if lock else contextlib.nullcontext():
+        state = known_boards.get(board_id)
+
+        for attempt in range(MAX_ATTEMPTS):
+            from_cache = state is not None
+            if state is None:
+                board = fetch_board(board_id)
+                state = (board.get("version") or 0, board.get("columns") or [])
+
+            version, current_cols = state
+            if expected_version is not None and version != expected_version:
+                if from_cache:
+                    # La copia local puede estar atrasada respecto a lo que vio el cliente
+                    state = None
+                    continue
+                raise VersionMismatch(version)
+
+            cols = copy.deepcopy(current_cols)
+            results = [apply_op(cols, op) for op in ops]
+
+            try:
+                board = client.patch(COLLECTION, board_id, json={
+                    "columns": cols,
+                    "version": version + 1,
+                    "base_version": version
+                }).json()
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
+                # 404 en el PATCH: otra escritura cambió la versión (o el tablero ya no existe)
+                state = None
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+                continue
+
+            remember(board)
+            return board, results
+
+    raise ConcurrentUpdate("No se pudo aplicar el cambio por ediciones concurrentes")
@@ -0,0 +1,460 @@
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from services.cache import invalidate
+from services.pocketbase_client import client, empty_date, gather, iter_records
+from services.recent_leads import monthly_leads
+from services.search_index import normalize, search_index
+from services.type_counts import account_type_counts
+
+# Filas por bloque: cada bloque se valida junto y sus escrituras van en paralelo
+IMPORT_BATCH = int(os.environ.get("IMPORT_BATCH", "500"))
+IMPORT_CONCURRENCY = int(os.environ.get("IMPORT_CONCURRENCY", "8"))
+IMPORT_DIR = os.environ.get("IMPORT_DIR") or tempfile.gettempdir()
+IMPORT_FORMATS = ("csv", "ndjson")
+# Importaciones terminadas que se conservan (con su reporte de errores) para consultarlas
+MAX_JOBS = 20
+ERROR_PREVIEW = 20
+
+LEAD_FIELDS = ["name", "last_name", "phone", "personal_email", "work_email"]
+# Columna del archivo -> campo de la cuenta, para las cuentas que crea la importación (create_accounts)
+ACCOUNT_COLUMNS = {"account_website": "website", "account_address": "address",
+                   "account_phone": "phone", "account_tax_id": "tax_id"}
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Columnas del archivo (CSV con cabecera u objetos NDJSON):
+#   name, last_name, phone, personal_email, work_email -> el lead
+#   account (o account_name) o account_id -> la cuenta; con create_accounts, las que no existen se crean
+#     con account_website, account_address, account_phone, account_tax_id y account_type (nombre o id
+#     del tipo). Las cuentas que ya existen no se modifican
+#   start_date, end_date, notes -> la asignación del lead a la cuenta
+# Una fila sin columnas de lead y con cuenta solo da de alta la cuenta.
+
+
+def import_format(filename=None, mimetype=None):
+    name = (filename or "").lower()
+    if name.endswith(".csv") or mimetype == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or mimetype in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def account_key(name):
+    # "  Acme  México " y "acme mexico" son la misma cuenta
+    return " ".join(normalize(name).split())
+
+
+def _date(value, name):
+    if not value:
+        return ""
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"{name} debe tener el formato YYYY-MM-DD")
+
+
+def clean_row(row):
+    # (lead o None, cuenta y asignación o None); lanza ValueError con el motivo si la fila no es válida
+    if not isinstance(row, dict):
+        raise ValueError("La fila no es un objeto JSON válido")
+
+    def value(key):
+        return str(row.get(key) or "").strip()
+
+    lead = {field: value(field) for field in LEAD_FIELDS}
+    account_id, account_name = value("account_id"), value("account") or value("account_name")
+    if not any(lead.values()):
+        if not (account_id or account_name):
+            raise ValueError("La fila no tiene datos de lead ni de cuenta")
+        lead = None
+    elif not lead["name"]:
+        raise ValueError("Falta el nombre del lead")
+    else:
+        for field in ("personal_email", "work_email"):
+            if lead[field] and not _EMAIL.match(lead[field]):
+                raise ValueError(f"{field} no es un correo válido: {lead[field]}")
+        lead["work_email"] = lead["work_email"].lower()
+
+    start_date, end_date = _date(value("start_date"), "start_date"), _date(value("end_date"), "end_date")
+    if start_date and end_date and end_date < start_date:
+        raise ValueError("end_date es anterior a start_date")
+    if not (account_id or account_name):
+        return lead, None
+    return lead, {
+        "account_id": account_id,
+        "account_name": account_name,
+        "details": {field: value(column) for column, field in ACCOUNT_COLUMNS.items() if value(column)},
+        "type": value("account_type"),
+        "start_date": start_date or datetime.utcnow().strftime("%Y-%m-%d"),
+        "end_date": end_date,
+        "notes": value("notes")
+    }
+
+
+def read_rows(source, fmt):
+    # Generador de (línea, fila, bytes leídos): el archivo se recorre de a poco, nunca entero en memoria
+    if fmt == "csv":
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+        for row in reader:
+            yield reader.line_num, row, source.tell()
+        return
+
+    for number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row, source.tell()
+
+
+def _upstream_error(error):
+    # Mensaje de validación de PocketBase ({"data": {"work_email": {"message": ...}}}) o el de la excepción
+    try:
+        body = error.response.json()
+    except (AttributeError, ValueError):
+        return str(error)
+    details = "; ".join(
+        f"{field}: {detail.get('message')}" for field, detail in (body.get("data") or {}).items() if isinstance(detail, dict)
+    )
+    return details or body.get("message") or str(error)
+
+
+class ImportJob:
+    def __init__(self, path, fmt, size, create_accounts):
+        self.id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.errors_path = path + ".errors.ndjson"
+        self.format = fmt
+        self.size = size
+        self.create_accounts = create_accounts
+        self.status = "queued"
+        self.error = None
+        self.bytes_read = 0
+        self.counters = {
+            "rows": 0, "rejected": 0, "leads_created": 0, "leads_matched": 0,
+            "accounts_created": 0, "assignments_created": 0, "assignments_skipped": 0
+        }
+        self.first_errors = []
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def count(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                self.counters[name] += amount
+
+    def reject(self, errors_file, line, message, row):
+        entry = {"line": line, "error": message, "row": row}
+        errors_file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        with self.lock:
+            self.counters["rejected"] += 1
+            if len(self.first_errors) < ERROR_PREVIEW:
+                self.first_errors.append(entry)
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = ((self.finished or time.monotonic()) - self.started) if self.started else 0
+            return {
+                "id": self.id,
+                "status": self.status,
+                "format": self.format,
+                "error": self.error,
+                "progress": round(self.bytes_read / self.size, 3) if self.size else 1.0,
+                "bytes": self.size,
+                **self.counters,
+                "elapsed_seconds": round(elapsed, 1),
+                "rows_per_second": round(self.counters["rows"] / elapsed, 1) if elapsed else 0,
+                "errors": list(self.first_errors)
+            }
+
+
+class LeadImporter:
+    # Importaciones masivas de leads, cuentas y asignaciones en segundo plano, una a la vez.
+    # El archivo subido se copia a disco y se lee por bloques de IMPORT_BATCH filas; las cuentas,
+    # los correos de leads y las asignaciones abiertas que ya existen se cargan una vez en memoria
+    # para resolver nombres y descartar duplicados sin consultar PocketBase por cada fila.
+    def __init__(self, batch_size=IMPORT_BATCH, concurrency=IMPORT_CONCURRENCY, directory=IMPORT_DIR, max_jobs=MAX_JOBS):
+        self.batch_size = batch_size
+        self.directory = directory
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lead-import")
+        self.writers = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="lead-import-write")
+
+    def submit(self, stream, fmt, create_accounts=False):
+        # Copia el cuerpo de la petición a un archivo temporal (por trozos) y encola la importación
+        descriptor, path = tempfile.mkstemp(prefix="lead-import-", suffix=f".{fmt}", dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "wb") as target:
+                shutil.copyfileobj(stream, target, 1024 * 1024)
+                size = target.tell()
+        except Exception:
+            # Subida cortada o disco lleno: no queda el archivo a medias
+            os.remove(path)
+            raise
+
+        job = ImportJob(path, fmt, size, create_accounts)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._drop_old_jobs()
+        self.runner.submit(self._run, job)
+        return job.snapshot()
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def recent(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return [job.snapshot() for job in reversed(jobs)]
+
+    def errors(self, job_id):
+        # Generador con el reporte de filas rechazadas (None si la importación no existe)
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        def read():
+            if not os.path.exists(job.errors_path):
+                return
+            with open(job.errors_path, encoding="utf-8") as errors_file:
+                for line in errors_file:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+        return read()
+
+    def _drop_old_jobs(self):
+        finished = [job for job in self.jobs.values() if job.status in ("done", "failed")]
+        for job in finished[:max(len(self.jobs) - self.max_jobs, 0)]:
+            del self.jobs[job.id]
+            if os.path.exists(job.errors_path):
+                os.remove(job.errors_path)
+
+    # ---- importación ----
+
+    def _run(self, job):
+        with job.lock:
+            job.status = "running"
+            job.started = time.monotonic()
+        try:
+            lookups = self._load_lookups()
+            with open(job.path, "rb") as source, open(job.errors_path, "w", encoding="utf-8") as errors_file:
+                chunk = []
+                for line, row, position in read_rows(source, job.format):
+                    chunk.append((line, row))
+                    if len(chunk) >= self.batch_size:
+                        self._import_chunk(job, chunk, lookups, errors_file)
+                        chunk = []
+                    job.bytes_read = position
+                if chunk:
+                    self._import_chunk(job, chunk, lookups, errors_file)
+            status, error = "done", None
+        except UnicodeDecodeError:
+            status, error = "failed", "El archivo debe estar en UTF-8"
+        except Exception as e:
+            print(f"Error en la importación {job.id}: {e}")
+            status, error = "failed", str(e)
+        finally:
+            os.remove(job.path)
+
+        if job.counters["assignments_created"]:
+            # El resumen mensual copia nombres de leads y cuentas: se recalcula en la siguiente lectura
+            monthly_leads.clear()
+        with job.lock:
+            job.status, job.error = status, error
+            job.bytes_read = job.size if status == "done" else job.bytes_read
+            job.finished = time.monotonic()
+
+    def _load_lookups(self):
+        # Solo id y el campo de búsqueda: la memoria depende del tamaño de las colecciones, no del archivo
+        types, accounts, leads, assignments = gather(
+            lambda: list(iter_records("types", {"fields": "id,name"})),
+            lambda: list(iter_records("accounts", {"fields": "id,name"})),
+            lambda: list(iter_records("leads", {"fields": "id,work_email"})),
+            lambda: list(iter_records("account_leads", {"fields": "account_id,lead_id", "filter": empty_date("end_date")}))
+        )
+        lookups = {
+            "types": {account_key(item.get("name") or ""): item["id"] for item in types},
+            "type_ids": {item["id"] for item in types},
+            "account_ids": {account["id"] for account in accounts},
+            "account_errors": {},
+            "accounts": {},
+            "leads": {},
+            "open_assignments": {(item.get("account_id"), item.get("lead_id")) for item in assignments}
+        }
+        for account in accounts:
+            lookups["accounts"].setdefault(account_key(account.get("name") or ""), account["id"])
+        for lead in leads:
+            if lead.get("work_email"):
+                lookups["leads"].setdefault(lead["work_email"].lower(), lead["id"])
+        return lookups
+
+    def _write_many(self, call, items):
+        # Escrituras de un bloque en paralelo; devuelve (registro, error) por elemento, en orden.
+        # No se reintentan: un POST repetido podría crear el registro dos veces
+        def write(item):
+            try:
+                return call(item), None
+            except requests.exceptions.RequestException as e:
+                return None, _upstream_error(e)
+        return list(self.writers.map(write, items))
+
+    def _import_chunk(self, job, chunk, lookups, errors_file):
+        job.count(rows=len(chunk))
+        rows = []
+        for line, row in chunk:
+            try:
+                lead, assignment = clean_row(row)
+            except ValueError as e:
+                job.reject(errors_file, line, str(e), row)
+                continue
+            rows.append((line, row, lead, assignment))
+
+        if job.create_accounts:
+            self._create_accounts(job, rows, lookups)
+        rows = self._resolve_accounts(job, rows, lookups, errors_file)
+        lead_ids = self._create_leads(job, rows, lookups, errors_file)
+        self._create_assignments(job, rows, lead_ids, lookups, errors_file)
+
+    def _create_accounts(self, job, rows, lookups):
+        # Las empresas que no existen se crean una vez por nombre, con los datos de la primera fila que la
+        # nombra. Si no se puede crear, el motivo queda en account_errors y sus filas se rechazan al resolverla
+        payloads = {}
+        for _, _, _, assignment in rows:
+            if not assignment or assignment["account_id"]:
+                continue
+            key = account_key(assignment["account_name"])
+            if key in lookups["accounts"] or key in payloads or key in lookups["account_errors"]:
+                continue
+            type_id = ""
+            if assignment["type"]:
+                type_id = assignment["type"] if assignment["type"] in lookups["type_ids"] \
+                    else lookups["types"].get(account_key(assignment["type"]))
+                if not type_id:
+                    lookups["account_errors"][key] = f"El tipo '{assignment['type']}' no existe"
+                    continue
+            payloads[key] = {"name": assignment["account_name"], **assignment["details"], "type_id": type_id}
+        if not payloads:
+            return
+
+        results = self._write_many(lambda payload: client.post("accounts", json=payload).json(), list(payloads.values()))
+        created = 0
+        for key, (account, error) in zip(payloads, results):
+            if error:
+                lookups["account_errors"][key] = f"No se pudo crear la empresa: {error}"
+                continue
+            lookups["accounts"][key] = account["id"]
+            lookups["account_ids"].add(account["id"])
+            account_type_counts.set_type(account["id"], account.get("type_id"))
+            search_index.index_record("accounts", account)
+            created += 1
+        if created:
+            job.count(accounts_created=created)
+            invalidate("accounts")
+
+    def _resolve_accounts(self, job, rows, lookups, errors_file):
+        # La cuenta se resuelve antes de crear el lead: una fila con una empresa desconocida no deja nada a medias
+        resolved = []
+        for line, row, lead, assignment in rows:
+            if assignment:
+                if assignment["account_id"]:
+                    account_id = assignment["account_id"] if assignment["account_id"] in lookups["account_ids"] else None
+                    missing = f"La cuenta {assignment['account_id']} no existe"
+                else:
+                    key = account_key(assignment["account_name"])
+                    account_id = lookups["accounts"].get(key)
+                    missing = lookups["account_errors"].get(key) or f"La empresa '{assignment['account_name']}' no existe"
+                if account_id is None:
+                    job.reject(errors_file, line, missing, row)
+                    continue
+                assignment["account_id"] = account_id
+            resolved.append((line, row, lead, assignment))
+        return resolved
+
+    def _create_leads(self, job, rows, lookups, errors_file):
+        # Un lead por correo de trabajo: si ya existe (en PocketBase o antes en el archivo) se reutiliza.
+        # Devuelve {línea: id del lead}
+        lead_ids, pending, by_email = {}, [], {}
+        for line, row, lead, _ in rows:
+            if lead is None:
+                continue
+            email = lead["work_email"]
+            if email and email in lookups["leads"]:
+                lead_ids[line] = lookups["leads"][email]
+                job.count(leads_matched=1)
+            elif email and email in by_email:
+                # Se cuenta como existente solo si el lead que comparte llega a crearse
+                by_email[email]["rows"].append((line, row))
+            else:
+                entry = {"lead": lead, "rows": [(line, row)]}
+                pending.append(entry)
+                if email:
+                    by_email[email] = entry
+
+        results = self._write_many(lambda entry: client.post("leads", json=entry["lead"]).json(), pending)
+        created = repeated = 0
+        for entry, (record, error) in zip(pending, results):
+            if error:
+                for line, row in entry["rows"]:
+                    job.reject(errors_file, line, error, row)
+                continue
+            if entry["lead"]["work_email"]:
+                lookups["leads"][entry["lead"]["work_email"]] = record["id"]
+            for line, _ in entry["rows"]:
+                lead_ids[line] = record["id"]
+            search_index.index_record("leads", record)
+            created += 1
+            repeated += len(entry["rows"]) - 1
+        job.count(leads_created=created, leads_matched=repeated)
+        return lead_ids
+
+    def _create_assignments(self, job, rows, lead_ids, lookups, errors_file):
+        # Como en POST /account-leads, no se crea una segunda asignación abierta del mismo lead en la misma cuenta
+        pending = []
+        for line, row, _, assignment in rows:
+            if not assignment or line not in lead_ids:
+                continue
+            pair = (assignment["account_id"], lead_ids[line])
+            if not assignment["end_date"]:
+                if pair in lookups["open_assignments"]:
+                    job.count(assignments_skipped=1)
+                    continue
+                lookups["open_assignments"].add(pair)
+            payload = {"account_id": pair[0], "lead_id": pair[1], "start_date": assignment["start_date"], "notes": assignment["notes"]}
+            if assignment["end_date"]:
+                payload["end_date"] = assignment["end_date"]
+            pending.append((line, row, pair, payload))
+
+        results = self._write_many(lambda item: client.post("account_leads", json=item[3]).json(), pending)
+        created = 0
+        for (line, row, pair, payload), (_, error) in zip(pending, results):
+            if error:
+                if "end_date" not in payload:
+                    lookups["open_assignments"].discard(pair)
+                job.reject(errors_file, line, f"El lead se importó, pero no la asignación: {error}", row)
+                continue
+            created += 1
+        job.count(assignments_created=created)
+
+
+lead_importer = LeadImporter()
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+
+# TTL (segundos) y tamaño máximo por colección; el TTL se puede ajustar con CACHE_TTL_<COLECCION>
+CACHE_SETTINGS = {
+    "types": {"ttl": 300, "max_entries": 256},
+    "accounts": {"ttl": 60, "max_entries": 1024},
+    "projects": {"ttl": 60, "max_entries": 512},
+}
+
+
+class TTLCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Cambia con cada clear(): un relleno que empezó antes de una invalidación no se guarda
+        self.generation = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            # LRU: se descartan primero las entradas usadas hace más tiempo
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "ttl": self.ttl,
+                "max_entries": self.max_entries,
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+
+caches = {
+    name: TTLCache(
+        ttl=float(os.environ.get(f"CACHE_TTL_{name.upper()}", settings["ttl"])),
+        max_entries=settings["max_entries"]
+    )
+    for name, settings in CACHE_SETTINGS.items()
+}
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+# Otros datos derivados (p. ej. resúmenes materializados) que deben vaciarse junto con una caché
+_invalidation_listeners = {}
+
+
+def on_invalidate(collection_name, callback):
+    _invalidation_listeners.setdefault(collection_name, []).append(callback)
+
+
+def invalidate(*collection_names):
+    for name in collection_names:
+        caches[name].clear()
+        for callback in _invalidation_listeners.get(name, []):
+            callback()
+
+
+def cached(collection_name):
+    # Cachea respuestas 200 de un GET, con la ruta completa (incluida la query) como clave
+    cache = caches[collection_name]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if cache.ttl <= 0:
+                return view(*args, **kwargs)
+
+            key = request.full_path
+            entry = cache.get(key)
+            if entry is not None:
+                body, status, mimetype = entry
+                response = current_app.response_class(body, status=status, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            # Si se invalida mientras la vista consulta PocketBase, su respuesta puede ser anterior a la escritura
+            generation = cache.generation
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, (response.get_data(), response.status_code, response.mimetype), generation)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidates(*collection_names):
+    # Vacía la caché de las colecciones indicadas cuando la escritura termina bien (2xx)
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = current_app.make_response(view(*args, **kwargs))
+            if 200 <= response.status_code < 300:
+                invalidate(*collection_names)
+            return response
+        return wrapper
+    return decorator
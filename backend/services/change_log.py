@@ -0,0 +1,88 @@
+import base64
+import json
+import threading
+import uuid
+from collections import OrderedDict, deque
+
+# Identifica esta ejecución del proceso: un cursor de otra ejecución obliga al cliente a resincronizar
+EPOCH = uuid.uuid4().hex[:8]
+
+
+class ChangeLog:
+    # Registro acotado, en memoria, de eliminaciones por clave (p. ej. por tablero).
+    # PocketBase no guarda lápidas de registros borrados, así que se anotan aquí.
+    def __init__(self, max_per_key=1000, max_keys=4096):
+        self.max_per_key = max_per_key
+        self.max_keys = max_keys
+        self.entries = OrderedDict()
+        self.floors = {}
+        self.global_floor = 0
+        self.seq = 0
+        self.lock = threading.Lock()
+
+    def record(self, key, record_id):
+        with self.lock:
+            self.seq += 1
+            log = self.entries.get(key)
+            if log is None:
+                log = self.entries[key] = deque()
+            self.entries.move_to_end(key)
+
+            log.append((self.seq, record_id))
+            if len(log) > self.max_per_key:
+                dropped_seq, _ = log.popleft()
+                self.floors[key] = dropped_seq
+
+            while len(self.entries) > self.max_keys:
+                old_key, old_log = self.entries.popitem(last=False)
+                self.floors.pop(old_key, None)
+                if old_log:
+                    self.global_floor = max(self.global_floor, old_log[-1][0])
+            return self.seq
+
+    def since(self, key, seq):
+        # Devuelve (ids, último seq, completo); completo=False si ya se descartaron entradas posteriores a seq
+        with self.lock:
+            floor = max(self.floors.get(key, 0), self.global_floor)
+            complete = seq >= floor
+            ids = [record_id for entry_seq, record_id in self.entries.get(key, ()) if entry_seq > seq]
+            return ids, self.seq, complete
+
+    def latest_seq(self):
+        with self.lock:
+            return self.seq
+
+
+def encode_cursor(data):
+    raw = json.dumps({**data, "e": EPOCH}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    # Lanza ValueError si el cursor no es válido
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(data, dict):
+        raise ValueError("Cursor inválido")
+    return data
+
+
+def records_cursor(records, seq, since_ts="", seen_ids=()):
+    # Cursor = último "updated" visto + ids ya entregados con ese mismo instante + seq del registro de bajas
+    last_ts = since_ts
+    ids = set(seen_ids)
+    for record in records:
+        updated = record.get("updated") or ""
+        if updated > last_ts:
+            last_ts = updated
+            ids = set()
+        if updated == last_ts:
+            ids.add(record["id"])
+    return encode_cursor({"t": last_ts, "ids": sorted(ids), "d": seq})
+
+
+# Tareas que salieron de un tablero (borradas o movidas a otro), por board_id
+task_removals = ChangeLog()
@@ -0,0 +1,53 @@
+import json
+import os
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+# orjson es opcional: sin él (o con JSON_ENCODER=std) se usa el json estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+if os.environ.get("JSON_ENCODER", "orjson") == "std":
+    orjson = None
+
+JSON_MIMETYPE = "application/json"
+
+
+def encode(obj):
+    # JSON compacto en bytes; fechas, Decimal, etc. se convierten igual que en jsonify
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, default=DefaultJSONProvider.default, separators=(",", ":")).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    # jsonify y request.get_json con orjson. Las llamadas con opciones (indent, sort_keys...) y el
+    # modo debug (salida con sangría) siguen usando el codificador estándar
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if self._app.debug or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode(obj) + b"\n", mimetype=self.mimetype)
+
+
+def passthrough(upstream, status=200):
+    # Reenvía el cuerpo de PocketBase tal cual, sin decodificarlo ni volver a codificarlo.
+    # Solo para respuestas que la ruta no modifica
+    return current_app.response_class(upstream.content, status=status, mimetype=JSON_MIMETYPE)
+
+
+def init_app(app):
+    if orjson is not None:
+        app.json = FastJSONProvider(app)
@@ -0,0 +1,169 @@
+import contextvars
+import os
+import threading
+import time
+
+# Límites (en segundos) de los histogramas de latencia y (en bytes) de los de tamaño
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# Si es > 0, las peticiones más lentas que esto (ms) se registran con su traza de llamadas a PocketBase
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "0"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        # Labels como texto: un mismo label puede traer 404 o "error" y se ordenan juntos al exponer
+        labels = tuple(map(str, labels))
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        labels = tuple(map(str, labels))
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, ('le', bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, ('le', '+Inf'))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {series['count']}")
+        return lines
+
+
+http_requests = Counter("http_requests_total", "Peticiones atendidas por ruta", ("route", "method", "status"))
+http_duration = Histogram("http_request_duration_seconds", "Tiempo total de la petición en Flask", ("route", "method"))
+http_upstream_duration = Histogram("http_request_upstream_seconds", "Tiempo acumulado esperando a PocketBase por petición", ("route", "method"))
+http_upstream_calls = Histogram("http_request_upstream_calls", "Llamadas a PocketBase por petición", ("route", "method"), COUNT_BUCKETS)
+http_response_bytes = Histogram("http_response_bytes", "Tamaño de la respuesta", ("route", "method"), SIZE_BUCKETS)
+
+upstream_requests = Counter("pocketbase_requests_total", "Llamadas a PocketBase", ("collection", "method", "status"))
+upstream_errors = Counter("pocketbase_errors_total", "Llamadas a PocketBase fallidas (5xx o error de red)", ("collection", "method"))
+upstream_duration = Histogram("pocketbase_request_duration_seconds", "Latencia de PocketBase", ("collection", "method"))
+upstream_response_bytes = Histogram("pocketbase_response_bytes", "Tamaño de las respuestas de PocketBase", ("collection", "method"), SIZE_BUCKETS)
+
+REGISTRY = [
+    http_requests, http_duration, http_upstream_duration, http_upstream_calls, http_response_bytes,
+    upstream_requests, upstream_errors, upstream_duration, upstream_response_bytes,
+]
+
+# Traza de llamadas a PocketBase de la petición en curso (gather propaga el contexto a sus hilos)
+current_trace = contextvars.ContextVar("pocketbase_trace", default=None)
+
+
+def record_upstream(collection_name, method, status, seconds, size):
+    upstream_requests.inc(collection_name, method, status)
+    upstream_duration.observe(seconds, collection_name, method)
+    if size is not None:
+        upstream_response_bytes.observe(size, collection_name, method)
+    if status == "error" or (isinstance(status, int) and status >= 500):
+        upstream_errors.inc(collection_name, method)
+
+    trace = current_trace.get()
+    if trace is not None:
+        trace.append((method, collection_name, status, round(seconds * 1000, 2)))
+
+
+def render(extra=()):
+    # Formato de texto de Prometheus. extra: valores tomados de otros módulos al momento de exponer,
+    # como (nombre, tipo, ayuda, nombres de labels, {labels: valor})
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for name, metric_type, help_text, label_names, values in extra:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in sorted(values.items(), key=lambda item: tuple(map(str, item[0]))):
+            lines.append(f"{name}{_format_labels(label_names, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    # Middleware: mide cada petición y las llamadas a PocketBase que hizo
+    from flask import g, request
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_trace = []
+        g.metrics_token = current_trace.set(g.metrics_trace)
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        trace = g.pop("metrics_trace", [])
+        route = request.url_rule.rule if request.url_rule else "<sin ruta>"
+        upstream_seconds = sum(entry[3] for entry in trace) / 1000
+
+        http_requests.inc(route, request.method, response.status_code)
+        http_duration.observe(elapsed, route, request.method)
+        http_upstream_duration.observe(upstream_seconds, route, request.method)
+        http_upstream_calls.observe(len(trace), route, request.method)
+        if not response.is_streamed and response.content_length is not None:
+            http_response_bytes.observe(response.content_length, route, request.method)
+
+        if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+            calls = "; ".join(f"{method} {collection} {status} {ms}ms" for method, collection, status, ms in trace)
+            print(f"🐢 Petición lenta: {request.method} {request.full_path.rstrip('?')} -> {response.status_code} "
+                  f"en {elapsed * 1000:.1f}ms (PocketBase {upstream_seconds * 1000:.1f}ms, "
+                  f"{len(trace)} llamadas) [{calls}]")
+        return response
+
+    @app.teardown_request
+    def reset_request_trace(exc):
+        token = g.pop("metrics_token", None)
+        if token is not None:
+            current_trace.reset(token)
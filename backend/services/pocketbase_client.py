@@ -1,20 +1,538 @@
+import base64
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pocketbase import PocketBase
+from services.metrics import record_upstream
+
+# Configuración tomada del entorno para poder apuntar a otra instancia sin tocar código
+POCKETBASE_URL = os.environ.get("POCKETBASE_URL", "http://127.0.0.1:8090").rstrip("/")
+POCKETBASE_TIMEOUT = float(os.environ.get("POCKETBASE_TIMEOUT", "10"))
+POCKETBASE_POOL_SIZE = int(os.environ.get("POCKETBASE_POOL_SIZE", "20"))
+POCKETBASE_RETRIES = int(os.environ.get("POCKETBASE_RETRIES", "3"))
+POCKETBASE_BACKOFF = float(os.environ.get("POCKETBASE_BACKOFF", "0.2"))
+POCKETBASE_FANOUT = int(os.environ.get("POCKETBASE_FANOUT", "8"))
+POCKETBASE_SINGLE_FLIGHT = os.environ.get("POCKETBASE_SINGLE_FLIGHT", "1") == "1"
 
-POCKETBASE_URL = "http://127.0.0.1:8090"
 pb = PocketBase(POCKETBASE_URL)
 
-def get_collection(collection_name, filter_str=None):
+
+class _Flight:
+    # Una lectura en curso a la que se unen las peticiones idénticas que llegan mientras tanto
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+class PocketBaseClient:
+    def __init__(self, base_url=POCKETBASE_URL, timeout=POCKETBASE_TIMEOUT,
+                 pool_size=POCKETBASE_POOL_SIZE, retries=POCKETBASE_RETRIES,
+                 backoff=POCKETBASE_BACKOFF, single_flight=POCKETBASE_SINGLE_FLIGHT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.single_flight = single_flight
+        self.flights = {}
+        self.flights_lock = threading.Lock()
+        self.upstream_reads = 0
+        self.coalesced_reads = 0
+        self.max_waiters = 0
+        # Escrituras terminadas por colección: un GET posterior no se une a una lectura iniciada antes
+        self.write_generations = {}
+
+        # Solo se reintentan métodos idempotentes para no duplicar escrituras
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def records_url(self, collection_name, record_id=None):
+        url = f"{self.base_url}/api/collections/{collection_name}/records"
+        if record_id:
+            url += f"/{record_id}"
+        return url
+
+    def request(self, method, collection_name, record_id=None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.records_url(collection_name, record_id), **kwargs)
+        except requests.exceptions.RequestException:
+            record_upstream(collection_name, method, "error", time.perf_counter() - start, None)
+            raise
+        finally:
+            if method != "GET":
+                # Aunque falle, la escritura pudo aplicarse: las lecturas en vuelo ya no sirven
+                with self.flights_lock:
+                    self.write_generations[collection_name] = self.write_generations.get(collection_name, 0) + 1
+        record_upstream(collection_name, method, response.status_code, time.perf_counter() - start,
+                        None if kwargs.get("stream") else len(response.content))
+        response.raise_for_status()
+        return response
+
+    def get(self, collection_name, record_id=None, params=None):
+        if not self.single_flight:
+            return self.request("GET", collection_name, record_id, params=params)
+
+        # Single-flight: GETs idénticos concurrentes comparten una sola llamada a PocketBase.
+        # Solo se comparte lo que está en vuelo, y la clave lleva el número de escrituras de la
+        # colección: un GET enviado después de una escritura confirmada no recibe una lectura anterior.
+        with self.flights_lock:
+            key = (self.records_url(collection_name, record_id),
+                   tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+                   self.write_generations.get(collection_name, 0))
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+                self.upstream_reads += 1
+            else:
+                flight.waiters += 1
+                self.coalesced_reads += 1
+                self.max_waiters = max(self.max_waiters, flight.waiters)
+
+        if leader:
+            try:
+                flight.response = self.request("GET", collection_name, record_id, params=params)
+                flight.response.content  # se lee el cuerpo antes de compartir la respuesta
+            except Exception as e:
+                flight.error = e
+            finally:
+                with self.flights_lock:
+                    del self.flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.response
+
+    def single_flight_stats(self):
+        with self.flights_lock:
+            return {
+                "enabled": self.single_flight,
+                "upstream_reads": self.upstream_reads,
+                "coalesced_reads": self.coalesced_reads,
+                "in_flight": len(self.flights),
+                "max_waiters": self.max_waiters
+            }
+
+    def post(self, collection_name, json=None, params=None):
+        return self.request("POST", collection_name, json=json, params=params)
+
+    def patch(self, collection_name, record_id, json=None, params=None):
+        return self.request("PATCH", collection_name, record_id, json=json, params=params)
+
+    def delete(self, collection_name, record_id):
+        return self.request("DELETE", collection_name, record_id)
+
+
+# Cliente compartido por todos los blueprints (una sola pool de conexiones keep-alive)
+client = PocketBaseClient()
+
+# Con serve.py (gevent) los hilos de este executor son greenlets cooperativas
+_fanout_executor = ThreadPoolExecutor(max_workers=POCKETBASE_FANOUT, thread_name_prefix="pb-fanout")
+_fanout_state = threading.local()
+
+
+def _run_fanout_call(call):
+    _fanout_state.active = True
     try:
-        url = f"{POCKETBASE_URL}/api/collections/{collection_name}/records"
+        return call()
+    finally:
+        _fanout_state.active = False
+
+
+def gather(*calls):
+    # Ejecuta llamadas independientes a PocketBase en paralelo y devuelve los resultados en orden.
+    # Un gather anidado (p. ej. get_all dentro de otro gather) corre en línea para no agotar el executor.
+    if len(calls) <= 1 or getattr(_fanout_state, "active", False):
+        return [call() for call in calls]
+    # Cada llamada corre con una copia del contexto (p. ej. la traza de métricas de la petición)
+    futures = [_fanout_executor.submit(contextvars.copy_context().run, _run_fanout_call, call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def quote(value):
+    # Escapa un valor para interpolarlo de forma segura en un filtro de PocketBase
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+# Fecha cero con la que versiones anteriores de PocketBase guardaban las fechas vacías
+ZERO_DATE = "0001-01-01 00:00:00Z"
+
+
+def empty_date(field):
+    # Filtro de PocketBase para una fecha sin valor, vacía o con la fecha cero heredada
+    return f"({field} = '' || {field} = '{ZERO_DATE}')"
+
+
+def get_all(collection_name, params=None, per_page=200):
+    # Recorre todas las páginas: la primera indica totalPages y el resto se piden en paralelo
+    params = {**(params or {}), "perPage": per_page}
+    first = client.get(collection_name, params={**params, "page": 1}).json()
+    items = list(first.get("items", []))
+
+    pages = gather(*[
+        (lambda page=page: client.get(collection_name, params={**params, "page": page}).json())
+        for page in range(2, first.get("totalPages", 1) + 1)
+    ])
+    for data in pages:
+        items.extend(data.get("items", []))
+    return items
+
+
+KEYSET_SORTS = {"created,id": False, "created": False, "-created,-id": True, "-created": True}
+
+
+def encode_keyset_cursor(record):
+    raw = json.dumps([record["created"], record["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_keyset_cursor(cursor):
+    # "" = primera página; lanza ValueError si el cursor no es válido
+    if not cursor:
+        return None
+    try:
+        created, record_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(created), str(record_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+
+def keyset_page(collection_name, params=None, cursor=None, descending=False):
+    # Página por keyset sobre (created, id) sin totalItems: pedir la página 5000 cuesta lo mismo
+    # que la primera. Devuelve (items, siguiente cursor o None si no hay más).
+    params = {k: v for k, v in (params or {}).items() if k not in ("page", "sort", "skipTotal")}
+    per_page = params.pop("perPage", 30)
+    if params.get("fields") and "*" not in params["fields"].split(","):
+        params["fields"] += ",created,id"
+
+    conditions = [f"({params['filter']})"] if params.get("filter") else []
+    if cursor:
+        op = "<" if descending else ">"
+        created, record_id = quote(cursor[0]), quote(cursor[1])
+        # La primera comparación va sola para que SQLite recorra el índice (created, id) por rango
+        conditions.append(f"created {op}= {created} && (created {op} {created} || id {op} {record_id})")
+    if conditions:
+        params["filter"] = " && ".join(conditions)
+
+    # Se pide un registro de más para saber si hay página siguiente
+    items = client.get(collection_name, params={
+        **params,
+        "sort": "-created,-id" if descending else "created,id",
+        "perPage": per_page + 1,
+        "skipTotal": 1
+    }).json().get("items", [])
+    if len(items) > per_page:
+        items = items[:per_page]
+        return items, encode_keyset_cursor(items[-1])
+    return items, None
+
+
+def keyset_list(collection_name, params, cursor):
+    # Respuesta de las rutas de listado en modo cursor (?cursor=); lanza ValueError
+    sort = params.get("sort", "created,id")
+    if sort not in KEYSET_SORTS:
+        raise ValueError("En modo cursor solo se admite sort=created o sort=-created")
+    try:
+        items, next_cursor = keyset_page(collection_name, params, decode_keyset_cursor(cursor), KEYSET_SORTS[sort])
+    except requests.exceptions.HTTPError as e:
+        query_error = bad_query(e)
+        if query_error is None:
+            raise
+        raise query_error from e
+    return {"items": items, "perPage": params.get("perPage", 30), "next_cursor": next_cursor}
+
 
+def iter_records(collection_name, params=None, per_page=500):
+    # Generador página a página: en memoria solo hay una página, sin importar el tamaño de la colección.
+    # Con el orden por defecto se avanza por keyset, así las últimas páginas no son más lentas.
+    params = {**(params or {}), "perPage": per_page}
+    sort = params.get("sort", "created,id")
+    if sort in KEYSET_SORTS:
+        cursor = None
+        while True:
+            items, next_cursor = keyset_page(collection_name, params, cursor, KEYSET_SORTS[sort])
+            yield from items
+            if next_cursor is None:
+                break
+            cursor = (items[-1]["created"], items[-1]["id"])
+        return
+
+    params["skipTotal"] = 1
+    page = 1
+    while True:
+        items = client.get(collection_name, params={**params, "page": page}).json().get("items", [])
+        yield from items
+        if len(items) < per_page:
+            break
+        page += 1
+
+
+MAX_PER_PAGE = 500
+MAX_FILTER_LENGTH = 2000
+# Nombres de campo (con rutas de relación para expand/fields): type_id, account_id.type_id, expand.lead_id.*
+_FIELD_PATH = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.([A-Za-z_][A-Za-z0-9_]*|\*))*$|^\*$")
+
+
+def _positive_int(args, name):
+    try:
+        value = int(args[name])
+    except (TypeError, ValueError):
+        raise ValueError(f"El parámetro {name} debe ser un entero")
+    if value < 1:
+        raise ValueError(f"El parámetro {name} debe ser mayor que 0")
+    return value
+
+
+def _field_list(value, name, allow_direction=False):
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    for item in items:
+        path = item.lstrip("+-") if allow_direction else item
+        if not (_FIELD_PATH.match(path) or (allow_direction and path == "@random")):
+            raise ValueError(f"Valor no válido en {name}: {item}")
+    return ",".join(items)
+
+
+def _check_parentheses(filter_str):
+    # Un paréntesis sin pareja permitiría salirse de la condición fija de la ruta
+    depth, quote_char, escaped = 0, None, False
+    for char in filter_str:
+        if quote_char:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote_char:
+                quote_char = None
+        elif char in "'\"":
+            quote_char = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                break
+    if depth != 0 or quote_char:
+        raise ValueError("El filtro tiene paréntesis o comillas sin cerrar")
+
+
+def list_params(args, base_filter=None, default_sort=None, default_expand=None, max_per_page=MAX_PER_PAGE):
+    # Traduce page, perPage, sort, fields, expand, filter y skipTotal de la query del cliente
+    # a parámetros de PocketBase. base_filter es la condición fija de la ruta y siempre se aplica.
+    # Lanza ValueError si algún parámetro no es válido.
+    params = {}
+    if args.get("page"):
+        params["page"] = _positive_int(args, "page")
+    if args.get("perPage"):
+        params["perPage"] = min(_positive_int(args, "perPage"), max_per_page)
+
+    sort = args.get("sort") or default_sort
+    if sort:
+        params["sort"] = _field_list(sort, "sort", allow_direction=True)
+    expand = args.get("expand") or default_expand
+    if expand:
+        params["expand"] = _field_list(expand, "expand")
+    if args.get("fields"):
+        params["fields"] = _field_list(args["fields"], "fields")
+
+    # El filtro del cliente lo interpreta PocketBase (no llega a SQL tal cual) y se combina con el de la ruta
+    client_filter = (args.get("filter") or "").strip()
+    if len(client_filter) > MAX_FILTER_LENGTH:
+        raise ValueError("El filtro es demasiado largo")
+    _check_parentheses(client_filter)
+    if base_filter and client_filter:
+        params["filter"] = f"({base_filter}) && ({client_filter})"
+    elif base_filter or client_filter:
+        params["filter"] = base_filter or client_filter
+
+    if (args.get("skipTotal") or "").lower() in ("1", "true"):
+        params["skipTotal"] = 1
+    return params
+
+
+def bad_query(error):
+    # Un 400 de PocketBase (filtro, orden o campos no válidos) como ValueError con su mensaje; si no, None
+    if error.response is None or error.response.status_code != 400:
+        return None
+    try:
+        message = error.response.json().get("message")
+    except ValueError:
+        message = None
+    return ValueError(message or "Consulta no válida")
+
+
+def get_collection(collection_name, filter_str=None, params=None, raw=False):
+    # Devuelve None si PocketBase no responde; un 400 (filtro, orden o campos no válidos) se
+    # propaga como ValueError para que la ruta responda 400. Con raw=True devuelve la respuesta
+    # sin decodificar, para reenviarla tal cual con passthrough()
+    try:
+        params = dict(params or {})
         if filter_str:
-            url += f"?filter={filter_str}"
+            params["filter"] = filter_str
 
-        response = requests.get(url)
-        response.raise_for_status()
+        response = client.get(collection_name, params=params)
 
-        return response.json()
+        return response if raw else response.json()
+    except requests.exceptions.HTTPError as e:
+        query_error = bad_query(e)
+        if query_error is not None:
+            raise query_error
+        print(f"Error al conectarse con PocketBase: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Error al conectarse con PocketBase: {e}")
         return None
+
+
+# Relaciones de cada colección (campo -> colección), como en pocketbase/pb_migrations
+RELATIONS = {
+    "accounts": {"type_id": "types"},
+    "account_leads": {"account_id": "accounts", "lead_id": "leads"},
+    "projects": {"account_id": "accounts"},
+    "project_boards": {"project_id": "projects"},
+    "project_tasks": {"board_id": "project_boards", "assignee_id": "leads"},
+}
+# Ids por consulta del loader (id = 'a' || id = 'b' || ...); los bloques se piden en paralelo
+LOADER_BATCH = int(os.environ.get("POCKETBASE_LOADER_BATCH", "100"))
+
+
+def _expand_tree(paths):
+    # "account_id.type_id,lead_id" -> {"account_id": {"type_id": {}}, "lead_id": {}}
+    tree = {}
+    for path in (_field_list(paths, "expand").split(",") if paths else []):
+        node = tree
+        for field in path.split("."):
+            node = node.setdefault(field, {})
+    return tree
+
+
+def _relation_ids(records, field):
+    ids = []
+    for record in records:
+        value = record.get(field)
+        ids.extend(value if isinstance(value, list) else [value])
+    return ids
+
+
+class RecordLoader:
+    # Sustituto de expand: junta los ids referenciados por las filas, pide cada registro distinto
+    # una sola vez y lo memoriza. Con expand, PocketBase repite la misma cuenta, tipo o lead en
+    # cada fila que lo referencia; así viaja una copia por registro.
+    def __init__(self, batch=LOADER_BATCH):
+        self.batch = batch
+        self.records = {}  # colección -> {id: registro, o None si no existe}
+        self.lock = threading.Lock()
+        self.queries = 0
+
+    def load_many(self, collection_name, ids):
+        ids = list(dict.fromkeys(record_id for record_id in ids if record_id))
+        with self.lock:
+            known = self.records.setdefault(collection_name, {})
+            missing = [record_id for record_id in ids if record_id not in known]
+            chunks = [missing[i:i + self.batch] for i in range(0, len(missing), self.batch)]
+            self.queries += len(chunks)
+
+        pages = gather(*[
+            (lambda chunk=chunk: client.get(collection_name, params={
+                "filter": " || ".join(f"id = {quote(record_id)}" for record_id in chunk),
+                "perPage": len(chunk),
+                "skipTotal": 1
+            }).json().get("items", []))
+            for chunk in chunks
+        ])
+
+        with self.lock:
+            for chunk, items in zip(chunks, pages):
+                found = {item["id"]: item for item in items}
+                for record_id in chunk:
+                    known[record_id] = found.get(record_id)
+            return {record_id: known[record_id] for record_id in ids if known.get(record_id) is not None}
+
+    def resolve(self, collection_name, records, paths):
+        # Registros relacionados según paths (misma sintaxis que expand): {colección: {id: registro}}.
+        # Los campos sin relación conocida se ignoran, como hace PocketBase con expand
+        included = {}
+        self._resolve(collection_name, records, _expand_tree(paths), included)
+        return included
+
+    def _resolve(self, collection_name, records, tree, included):
+        relations = RELATIONS.get(collection_name, {})
+        fields = [field for field in tree if field in relations]
+        # Los campos de un mismo nivel (account_id y lead_id) se piden a la vez; cada nivel es una ronda
+        loaded = gather(*[
+            (lambda field=field: self.load_many(relations[field], _relation_ids(records, field)))
+            for field in fields
+        ])
+        for field, found in zip(fields, loaded):
+            included.setdefault(relations[field], {}).update(found)
+            if tree[field]:
+                self._resolve(relations[field], list(found.values()), tree[field], included)
+
+
+def _inflate(collection_name, record, tree, included):
+    relations = RELATIONS.get(collection_name, {})
+    expand = dict(record.get("expand") or {})
+    for field, subtree in tree.items():
+        target = relations.get(field)
+        value = record.get(field)
+        if not target or not value:
+            continue
+        children = [included.get(target, {}).get(record_id) for record_id in (value if isinstance(value, list) else [value])]
+        children = [_inflate(target, child, subtree, included) for child in children if child]
+        if children:
+            expand[field] = children if isinstance(value, list) else children[0]
+    return {**record, "expand": expand} if expand else record
+
+
+def inflate(collection_name, records, paths, included):
+    # Vuelve a poner los registros relacionados en "expand", con la misma forma que PocketBase
+    tree = _expand_tree(paths)
+    return [_inflate(collection_name, record, tree, included) for record in records]
+
+
+def request_loader():
+    # Un loader por petición de Flask (memoriza entre consultas de la misma petición); fuera de una, uno nuevo
+    from flask import g, has_request_context
+    if not has_request_context():
+        return RecordLoader()
+    if "record_loader" not in g:
+        g.record_loader = RecordLoader()
+    return g.record_loader
+
+
+def wants_normalized(args):
+    return (args.get("normalize") or "").lower() in ("1", "true")
+
+
+def expand_items(collection_name, items, paths, normalized=False):
+    # Resuelve paths con el loader de la petición. Devuelve {"items": ...} con expand en cada fila,
+    # o con normalized=True las filas sin tocar y {"included": {colección: {id: registro}}} aparte
+    included = request_loader().resolve(collection_name, items, paths)
+    if normalized:
+        return {"items": items, "included": included}
+    return {"items": inflate(collection_name, items, paths, included)}
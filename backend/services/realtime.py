@@ -0,0 +1,141 @@
+import json
+import queue
+import random
+import threading
+import time
+import requests
+from services.pocketbase_client import client
+
+# Sin eventos de PocketBase durante este tiempo se asume la conexión caída y se reconecta
+REALTIME_READ_TIMEOUT = 330
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Subscriber:
+    def __init__(self, collections, match):
+        self.collections = set(collections)
+        self.match = match
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Cliente demasiado lento: se le avisa para que recargue en lugar de perder eventos en silencio
+            self.overflowed = True
+
+
+class CollectionFeed:
+    # Una única suscripción a /api/realtime de PocketBase por colección, compartida por todos los clientes
+    def __init__(self, hub, collection_name):
+        self.hub = hub
+        self.collection_name = collection_name
+        self.session = requests.Session()
+        self.thread = threading.Thread(target=self._run, name=f"pb-realtime-{collection_name}", daemon=True)
+        self.connected = threading.Event()
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        attempt = 0
+        while True:
+            try:
+                self._listen()
+                attempt = 0
+            except Exception as e:
+                print(f"Conexión realtime con PocketBase perdida ({self.collection_name}): {e}")
+                attempt += 1
+            self.connected.clear()
+            time.sleep(min(30, random.uniform(0.5, 1.5) * 2 ** min(attempt, 5)))
+
+    def _listen(self):
+        url = f"{client.base_url}/api/realtime"
+        with self.session.get(url, stream=True, timeout=(5, REALTIME_READ_TIMEOUT)) as response:
+            response.raise_for_status()
+            for event_name, data in iter_sse(response):
+                if event_name == "PB_CONNECT":
+                    self.session.post(url, json={
+                        "clientId": data["clientId"],
+                        "subscriptions": [f"{self.collection_name}/*"]
+                    }, timeout=5).raise_for_status()
+                    self.connected.set()
+                elif data.get("record") is not None:
+                    self.hub.publish(self.collection_name, data.get("action"), data["record"])
+
+
+def iter_sse(response):
+    # Interpreta un flujo text/event-stream y entrega (evento, datos JSON)
+    event_name, data_lines = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            field, _, value = line.partition(":")
+            value = value.removeprefix(" ")
+            if field == "event":
+                event_name = value
+            elif field == "data":
+                data_lines.append(value)
+            continue
+
+        if data_lines:
+            try:
+                yield event_name, json.loads("\n".join(data_lines))
+            except ValueError:
+                pass
+        event_name, data_lines = None, []
+
+
+class RealtimeHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.feeds = {}
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, collections, match):
+        subscriber = Subscriber(collections, match)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            for name in collections:
+                if name not in self.feeds:
+                    feed = self.feeds[name] = CollectionFeed(self, name)
+                    feed.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, collection_name, action, record):
+        event = {"collection": collection_name, "action": action, "record": record}
+        with self.lock:
+            targets = [s for s in self.subscribers if collection_name in s.collections]
+            self.published += 1
+        delivered = 0
+        for subscriber in targets:
+            try:
+                matches = subscriber.match(event)
+            except Exception:
+                matches = False
+            if matches:
+                subscriber.offer(event)
+                delivered += 1
+        # Varios hilos publican a la vez: el contador se actualiza con el lock, como published
+        with self.lock:
+            self.delivered += delivered
+
+    def stats(self):
+        with self.lock:
+            return {
+                "subscribers": len(self.subscribers),
+                "upstream_feeds": {name: feed.connected.is_set() for name, feed in self.feeds.items()},
+                "published": self.published,
+                "delivered": self.delivered
+            }
+
+
+hub = RealtimeHub()
@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import datetime
+from services.cache import on_invalidate
+from services.pocketbase_client import get_all, quote
+
+COLLECTION = "account_leads"
+EXPAND = "account_id.type_id,lead_id"
+# Los nombres de lead, cuenta y tipo se copian al resumen; se reconstruye cada tanto por si cambiaron
+REBUILD_SECONDS = 600
+MAX_MONTHS = 24
+
+
+def current_month():
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def parse_month(value):
+    # "2025-06" -> "2025-06"; lanza ValueError si no tiene ese formato
+    return datetime.strptime(value, "%Y-%m").strftime("%Y-%m")
+
+
+def month_of(start_date):
+    return start_date[:7] if start_date and len(start_date) >= 7 else None
+
+
+def month_filter(month):
+    year, month_number = int(month[:4]), int(month[5:7])
+    next_month = f"{year + month_number // 12:04d}-{month_number % 12 + 1:02d}"
+    return f"start_date >= {quote(month + '-01 00:00:00')} && start_date < {quote(next_month + '-01 00:00:00')}"
+
+
+def summarize(item):
+    expand = item.get("expand") or {}
+    account = expand.get("account_id") or {}
+    return {
+        "id": item.get("id"),
+        "start_date": item.get("start_date"),
+        "lead_name": (expand.get("lead_id") or {}).get("name", "Sin nombre"),
+        "account_name": account.get("name", "Sin empresa"),
+        "account_type": ((account.get("expand") or {}).get("type_id") or {}).get("name", "Sin tipo")
+    }
+
+
+class MonthlyLeadsSummary:
+    # Resumen materializado por mes (YYYY-MM) de las asignaciones lead-cuenta.
+    # Se construye con una consulta filtrada por mes y luego se mantiene con cada alta/edición/baja.
+    def __init__(self, rebuild_seconds=REBUILD_SECONDS, max_months=MAX_MONTHS):
+        self.rebuild_seconds = rebuild_seconds
+        self.max_months = max_months
+        self.months = {}
+        self.row_months = {}
+        self.writes = 0
+        self.lock = threading.Lock()
+
+    def rows(self, month):
+        with self.lock:
+            entry = self.months.get(month)
+            if entry is not None and entry["built_at"] is not None \
+                    and time.monotonic() - entry["built_at"] < self.rebuild_seconds:
+                return self._sorted(entry["rows"])
+        return self._build(month)
+
+    def _build(self, month):
+        with self.lock:
+            writes_before = self.writes
+
+        items = get_all(COLLECTION, {"filter": month_filter(month), "expand": EXPAND})
+        rows = {item["id"]: summarize(item) for item in items}
+
+        with self.lock:
+            # Si hubo escrituras mientras se consultaba, el resultado puede no reflejarlas:
+            # se responde con él pero se marca para reconstruir en la siguiente lectura
+            built_at = time.monotonic() if self.writes == writes_before else None
+            self._drop_month(month)
+            self.months[month] = {"built_at": built_at, "rows": rows}
+            for relation_id in rows:
+                self.row_months[relation_id] = month
+
+            while len(self.months) > self.max_months:
+                self._drop_month(min(self.months))
+            return self._sorted(rows)
+
+    def apply(self, item):
+        # item debe venir con expand=EXPAND (se pide en la misma escritura)
+        month = month_of(item.get("start_date"))
+        with self.lock:
+            self.writes += 1
+            self._discard(item["id"])
+            entry = self.months.get(month)
+            # Los meses que aún no se han construido se calcularán completos al pedirse
+            if entry is not None:
+                entry["rows"][item["id"]] = summarize(item)
+                self.row_months[item["id"]] = month
+
+    def discard(self, relation_id):
+        with self.lock:
+            self.writes += 1
+            self._discard(relation_id)
+
+    def clear(self):
+        with self.lock:
+            self.writes += 1
+            self.months.clear()
+            self.row_months.clear()
+
+    def _discard(self, relation_id):
+        month = self.row_months.pop(relation_id, None)
+        if month in self.months:
+            self.months[month]["rows"].pop(relation_id, None)
+
+    def _drop_month(self, month):
+        entry = self.months.pop(month, None)
+        if entry is not None:
+            for relation_id in entry["rows"]:
+                self.row_months.pop(relation_id, None)
+
+    @staticmethod
+    def _sorted(rows):
+        return sorted(rows.values(), key=lambda row: row.get("start_date") or "", reverse=True)
+
+
+monthly_leads = MonthlyLeadsSummary()
+# Renombrar o borrar cuentas y tipos deja nombres viejos en el resumen
+on_invalidate("accounts", monthly_leads.clear)
+on_invalidate("types", monthly_leads.clear)
@@ -0,0 +1,246 @@
+import bisect
+import logging
+import re
+import threading
+import time
+import unicodedata
+from services.pocketbase_client import iter_records
+
+logger = logging.getLogger(__name__)
+
+# Campos indexados por colección; el resto del registro no se guarda en memoria
+SEARCH_FIELDS = {
+    "leads": ["name", "last_name", "personal_email", "work_email", "phone"],
+    "accounts": ["name", "website", "tax_id"],
+}
+# Las escrituras hechas fuera de este backend se recogen con una reconstrucción en segundo plano
+REBUILD_SECONDS = 900
+MAX_RESULTS = 50
+
+_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    # "José Pérez" -> "jose perez"
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return text.lower()
+
+
+def tokenize(text):
+    return [token for token in _SPLIT.split(normalize(text)) if token]
+
+
+def record_tokens(collection_name, record):
+    tokens = set()
+    for field in SEARCH_FIELDS[collection_name]:
+        value = record.get(field)
+        if not value:
+            continue
+        tokens.update(tokenize(value))
+        if field == "phone":
+            # "+52 (55) 1234-5678" también se encuentra escribiendo los dígitos seguidos
+            digits = re.sub(r"\D", "", str(value))
+            if digits:
+                tokens.add(digits)
+        elif "@" in str(value) or field == "website":
+            tokens.add(normalize(value).strip())
+    return tokens
+
+
+class IndexWarming(Exception):
+    pass
+
+
+class _IndexData:
+    # Índice invertido token -> claves, con los tokens ordenados para buscar por prefijo con bisect
+    def __init__(self):
+        self.postings = {}
+        self.sorted_tokens = []
+        self.documents = {}
+        self.document_tokens = {}
+        self.sort_names = {}
+        self.ordered_postings = {}
+
+    def add(self, collection_name, record, keep_sorted=True):
+        key = (collection_name, record["id"])
+        self.remove(key)
+        tokens = record_tokens(collection_name, record)
+        self.documents[key] = {field: record.get(field) for field in ["id", *SEARCH_FIELDS[collection_name]]}
+        self.document_tokens[key] = tokens
+        self.sort_names[key] = normalize(record.get("name") or "")
+        for token in tokens:
+            self.ordered_postings.pop(token, None)
+            keys = self.postings.get(token)
+            if keys is None:
+                keys = self.postings[token] = set()
+                if keep_sorted:
+                    bisect.insort(self.sorted_tokens, token)
+            keys.add(key)
+
+    def remove(self, key):
+        for token in self.document_tokens.pop(key, ()):
+            self.ordered_postings.pop(token, None)
+            keys = self.postings[token]
+            keys.discard(key)
+            if not keys:
+                del self.postings[token]
+                del self.sorted_tokens[bisect.bisect_left(self.sorted_tokens, token)]
+        self.documents.pop(key, None)
+        self.sort_names.pop(key, None)
+
+    def ordered(self, token):
+        # Documentos del token ordenados por nombre; se calcula al consultarse y se descarta al cambiar
+        keys = self.ordered_postings.get(token)
+        if keys is None:
+            keys = self.ordered_postings[token] = sorted(self.postings[token], key=lambda k: (self.sort_names[k], k[1]))
+        return keys
+
+    def token_range(self, prefix):
+        # Posiciones [inicio, fin) de los tokens que empiezan por prefix
+        return (bisect.bisect_left(self.sorted_tokens, prefix),
+                bisect.bisect_left(self.sorted_tokens, prefix + "\x7f"))
+
+    def estimate(self, prefix, cap):
+        # Número de documentos (con repeticiones) que coinciden con el prefijo, sin pasar de cap
+        start, end = self.token_range(prefix)
+        total = 0
+        for position in range(start, end):
+            total += len(self.postings[self.sorted_tokens[position]])
+            if total > cap:
+                break
+        return total
+
+    def has_prefix(self, key, prefix):
+        return any(token.startswith(prefix) for token in self.document_tokens[key])
+
+
+class SearchIndex:
+    def __init__(self, rebuild_seconds=REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self.data = None
+        self.built_at = None
+        self.rebuilding = False
+        self.pending = []
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+
+    def _load(self):
+        data = _IndexData()
+        for collection_name, fields in SEARCH_FIELDS.items():
+            for record in iter_records(collection_name, {"fields": ",".join(["id", *fields])}):
+                data.add(collection_name, record, keep_sorted=False)
+        # En la carga inicial se ordena una sola vez al final
+        data.sorted_tokens = sorted(data.postings)
+        return data
+
+    def _rebuild(self):
+        # Las escrituras que llegan durante la carga se guardan y se aplican al índice nuevo
+        with self.lock:
+            self.pending = []
+            self.rebuilding = True
+        try:
+            data = self._load()
+        except Exception:
+            with self.lock:
+                self.rebuilding = False
+            raise
+
+        with self.lock:
+            for operation, collection_name, value in self.pending:
+                if operation == "add":
+                    data.add(collection_name, value)
+                else:
+                    data.remove((collection_name, value))
+            self.pending = []
+            self.data = data
+            self.built_at = time.monotonic()
+            self.rebuilding = False
+
+    def warm(self):
+        # Construye el índice en segundo plano (al arrancar la app): ninguna petición espera la carga completa
+        with self.lock:
+            if self.rebuilding:
+                return
+            self.rebuilding = True
+        threading.Thread(target=self._background_rebuild, name="search-index-rebuild", daemon=True).start()
+
+    def _ensure_ready(self):
+        if self.data is None:
+            # Primera construcción en curso (o falló y se reintenta): la ruta responde 503 con Retry-After
+            self.warm()
+            raise IndexWarming("El índice de búsqueda se está construyendo, inténtalo en unos segundos")
+        if time.monotonic() - self.built_at >= self.rebuild_seconds and not self.rebuilding:
+            # Mientras se reconstruye se sigue respondiendo con el índice actual
+            self.warm()
+
+    def _background_rebuild(self):
+        with self.build_lock:
+            try:
+                self._rebuild()
+            except Exception:
+                # El índice anterior (si hay) sigue en uso; la siguiente búsqueda vuelve a intentarlo
+                logger.exception("Error reconstruyendo el índice de búsqueda")
+
+    def index_record(self, collection_name, record):
+        with self.lock:
+            if self.rebuilding:
+                self.pending.append(("add", collection_name, record))
+            if self.data is not None:
+                self.data.add(collection_name, record)
+
+    def remove_record(self, collection_name, record_id):
+        with self.lock:
+            if self.rebuilding:
+                self.pending.append(("remove", collection_name, record_id))
+            if self.data is not None:
+                self.data.remove((collection_name, record_id))
+
+    def search(self, query, collections=None, limit=20):
+        self._ensure_ready()
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+        limit = min(limit, MAX_RESULTS)
+
+        with self.lock:
+            data = self.data
+            # Cada palabra de la consulta es un prefijo y un resultado debe cumplirlas todas.
+            # Se recorre el prefijo más selectivo y el resto se comprueba contra los tokens del documento.
+            seed, best = query_tokens[0], None
+            for token in query_tokens if len(query_tokens) > 1 else ():
+                size = data.estimate(token, best if best is not None else float("inf"))
+                if best is None or size < best:
+                    seed, best = token, size
+            others = [token for token in query_tokens if token != seed]
+
+            def accepted(key):
+                return (not collections or key[0] in collections) and all(data.has_prefix(key, t) for t in others)
+
+            # Los tokens ordenados dan primero la palabra exacta y luego las más cortas; dentro de cada
+            # token se ordena por nombre. Se para en cuanto hay suficientes resultados.
+            results, seen = [], set()
+            start, end = data.token_range(seed)
+            for position in range(start, end):
+                for key in data.ordered(data.sorted_tokens[position]):
+                    if key in seen or not accepted(key):
+                        continue
+                    seen.add(key)
+                    results.append({"collection": key[0], **data.documents[key]})
+                    if len(results) >= limit:
+                        return results
+            return results
+
+    def stats(self):
+        with self.lock:
+            if self.data is None:
+                return {"ready": False, "building": self.rebuilding}
+            return {
+                "ready": True,
+                "documents": len(self.data.documents),
+                "tokens": len(self.data.sorted_tokens),
+                "age_seconds": round(time.monotonic() - self.built_at, 1),
+                "rebuilding": self.rebuilding
+            }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,25 @@
+from flask import Response, stream_with_context
+from services.json_response import encode
+
+STREAM_FORMATS = ("json", "ndjson")
+
+
+def _json_array(records):
+    yield b"["
+    first = True
+    for record in records:
+        yield (b"" if first else b",") + encode(record)
+        first = False
+    yield b"]"
+
+
+def _ndjson(records):
+    for record in records:
+        yield encode(record) + b"\n"
+
+
+def stream_records(records, fmt="json"):
+    # Respuesta chunked: los bytes salen en cuanto llega la primera página de PocketBase
+    if fmt == "ndjson":
+        return Response(stream_with_context(_ndjson(records)), mimetype="application/x-ndjson")
+    return Response(stream_with_context(_json_array(records)), mimetype="application/json")
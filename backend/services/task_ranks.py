@@ -0,0 +1,146 @@
+from decimal import Decimal
+import requests
+from services.board_columns import board_lock
+from services.pocketbase_client import client, gather, get_all, quote
+from services.write_behind import write_behind
+
+COLLECTION = "project_tasks"
+FIELDS = "id,board_id,column_id,order"
+# Separación entre tareas al agregarlas al final o al renumerar una columna
+RANK_STEP = 1024.0
+
+# El campo order es un rango fraccionario: mover una tarea le asigna un valor entre el de sus
+# vecinas y solo se reescribe ese registro. Si dos vecinas empatan o ya no hay decimales entre
+# ellas, se renumera la columna una vez y se vuelve a calcular.
+
+
+class TaskNotFound(Exception):
+    pass
+
+
+class MoveConflict(Exception):
+    pass
+
+
+def rank_between(lower, upper):
+    # None si no cabe ningún valor entre lower y upper
+    if lower is None and upper is None:
+        return RANK_STEP
+    if lower is None:
+        return upper - RANK_STEP
+    if upper is None:
+        return lower + RANK_STEP
+    middle = (lower + upper) / 2
+    return middle if lower < middle < upper else None
+
+
+def _order(task):
+    return float(task.get("order") or 0)
+
+
+def _number(value):
+    # Literal para el filtro sin notación científica (1e-05)
+    text = repr(value)
+    return text if "e" not in text else format(Decimal(value), "f")
+
+
+def _column_filter(board_id, column_id, exclude=()):
+    filter_str = f"board_id = {quote(board_id)} && column_id = {quote(column_id)}"
+    for task_id in exclude:
+        filter_str += f" && id != {quote(task_id)}"
+    return filter_str
+
+
+def fetch_task(task_id):
+    try:
+        return write_behind.overlay(COLLECTION, client.get(COLLECTION, task_id, params={"fields": FIELDS}).json())
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            raise TaskNotFound(f"La tarea {task_id} no existe")
+        raise
+
+
+def _first(board_id, column_id, exclude, condition, sort):
+    items = client.get(COLLECTION, params={
+        "filter": _column_filter(board_id, column_id, exclude) + condition,
+        "sort": sort,
+        "perPage": 1,
+        "skipTotal": 1,
+        "fields": FIELDS
+    }).json().get("items", [])
+    return items[0] if items else None
+
+
+def last_rank(board_id, column_id):
+    # Rango para agregar una tarea al final de la columna
+    write_behind.flush(COLLECTION, scope=board_id)
+    last = _first(board_id, column_id, (), "", "-order,-created")
+    return rank_between(_order(last) if last else None, None)
+
+
+def rebalance_column(board_id, column_id, exclude=()):
+    # Renumera la columna con RANK_STEP de separación, conservando el orden actual.
+    # Solo se escriben las tareas cuyo valor cambia
+    tasks = get_all(COLLECTION, {
+        "filter": _column_filter(board_id, column_id, exclude),
+        "sort": "order,created",
+        "fields": "id,order"
+    })
+    changed = [(task["id"], (n + 1) * RANK_STEP) for n, task in enumerate(tasks) if _order(task) != (n + 1) * RANK_STEP]
+    gather(*[
+        (lambda task_id=task_id, order=order: client.patch(COLLECTION, task_id, json={"order": order}))
+        for task_id, order in changed
+    ])
+    return len(changed)
+
+
+def position_for(board_id, column_id, task_id, after_id=None, before_id=None, rebalanced=False):
+    # order para dejar la tarea justo debajo de after_id y/o justo encima de before_id;
+    # sin ninguna de las dos, al final de la columna
+    if not (after_id and before_id):
+        # Buscar la vecina que falta es una consulta a PocketBase: antes tiene que ver las ediciones diferidas
+        write_behind.flush(COLLECTION, scope=board_id)
+    after, before = gather(
+        lambda: fetch_task(after_id) if after_id else None,
+        lambda: fetch_task(before_id) if before_id else None
+    )
+    for neighbour in (after, before):
+        if neighbour and (neighbour.get("board_id") != board_id or (neighbour.get("column_id") or "") != column_id):
+            raise MoveConflict("La tarea de referencia ya no está en esa columna; recarga el tablero")
+
+    exclude = [task_id, *(neighbour["id"] for neighbour in (after, before) if neighbour)]
+    if after and not before:
+        before = _first(board_id, column_id, exclude, f" && order >= {_number(_order(after))}", "order,created")
+    elif before and not after:
+        after = _first(board_id, column_id, exclude, f" && order <= {_number(_order(before))}", "-order,-created")
+    elif not after:
+        after = _first(board_id, column_id, exclude, "", "-order,-created")
+
+    lower = _order(after) if after else None
+    upper = _order(before) if before else None
+    if lower is not None and upper is not None and lower > upper:
+        raise MoveConflict("Las tareas de referencia no están en ese orden; recarga el tablero")
+
+    rank = rank_between(lower, upper)
+    if rank is None:
+        if rebalanced:
+            raise MoveConflict("No se pudo calcular la posición de la tarea; inténtalo de nuevo")
+        write_behind.flush(COLLECTION, scope=board_id)
+        rebalance_column(board_id, column_id, exclude=[task_id])
+        return position_for(board_id, column_id, task_id, after_id, before_id, rebalanced=True)
+    return rank
+
+
+def move_task(board_id, task_id, column_id, after_id=None, before_id=None):
+    # Una escritura por movimiento (más la renumeración ocasional de la columna)
+    with board_lock(board_id):
+        # La tarea se valida antes de calcular la posición: position_for puede renumerar la columna
+        task = fetch_task(task_id)
+        if task.get("board_id") != board_id:
+            raise TaskNotFound(f"La tarea {task_id} no pertenece a este tablero")
+        order = position_for(board_id, column_id, task_id, after_id, before_id)
+        data = {"column_id": column_id, "order": order}
+        if write_behind.enabled:
+            write_behind.patch(COLLECTION, task_id, data, scope=board_id)
+            return {**task, **data}
+        return client.patch(COLLECTION, task_id, json=data).json()
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import Counter
+from services.pocketbase_client import iter_records
+
+# Cuentas modificadas fuera de este backend se corrigen con una reconstrucción periódica
+REBUILD_SECONDS = 600
+
+
+class AccountTypeCounter:
+    # Número de cuentas por type_id ("" = sin tipo). Se construye una vez leyendo solo id,type_id
+    # y después se mantiene con cada alta, edición y baja de cuentas hecha por el backend.
+    def __init__(self, rebuild_seconds=REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self.account_types = None
+        self.counts = Counter()
+        self.built_at = None
+        self.writes = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            if self.built_at is not None and time.monotonic() - self.built_at < self.rebuild_seconds:
+                return dict(self.counts)
+        return self._build()
+
+    def _build(self):
+        with self.lock:
+            writes_before = self.writes
+
+        account_types = {
+            record["id"]: record.get("type_id") or ""
+            for record in iter_records("accounts", {"fields": "id,type_id"})
+        }
+
+        with self.lock:
+            self.account_types = account_types
+            self.counts = Counter(account_types.values())
+            # Si hubo escrituras durante la lectura se vuelve a construir en la siguiente consulta
+            self.built_at = time.monotonic() if self.writes == writes_before else None
+            return dict(self.counts)
+
+    def set_type(self, account_id, type_id):
+        with self.lock:
+            self.writes += 1
+            if self.account_types is None:
+                return
+            self._remove(account_id)
+            self.account_types[account_id] = type_id or ""
+            self.counts[type_id or ""] += 1
+
+    def remove(self, account_id):
+        with self.lock:
+            self.writes += 1
+            if self.account_types is not None:
+                self._remove(account_id)
+
+    def clear(self):
+        with self.lock:
+            self.writes += 1
+            self.account_types = None
+            self.counts = Counter()
+            self.built_at = None
+
+    def _remove(self, account_id):
+        previous = self.account_types.pop(account_id, None)
+        if previous is not None:
+            self.counts[previous] -= 1
+            if self.counts[previous] <= 0:
+                del self.counts[previous]
+
+
+account_type_counts = AccountTypeCounter()
@@ -0,0 +1,337 @@
+import copy
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from services.board_columns import ColumnNotFound, apply_op, board_lock, fetch_board, known_boards, mutate_columns
+from services.pocketbase_client import client
+
+# Modo opcional: las ediciones de tareas y columnas se confirman al cliente en cuanto quedan en el
+# diario local y se escriben en PocketBase después, agrupadas y con concurrencia acotada
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_JOURNAL = os.environ.get("WRITE_BEHIND_JOURNAL", "write_behind.journal")
+# Tiempo que una edición espera en la cola para combinarse con las siguientes del mismo registro
+WRITE_BEHIND_DELAY_MS = float(os.environ.get("WRITE_BEHIND_DELAY_MS", "250"))
+WRITE_BEHIND_BATCH = int(os.environ.get("WRITE_BEHIND_BATCH", "50"))
+WRITE_BEHIND_CONCURRENCY = int(os.environ.get("WRITE_BEHIND_CONCURRENCY", "4"))
+MAX_RETRY_SECONDS = 30
+
+
+def merge_parts(kind, parts):
+    # patch: los campos se combinan y gana el más reciente; ops: las operaciones de columnas se encadenan
+    if kind == "patch":
+        merged = {}
+        for _, data in parts:
+            merged.update(data)
+        return merged
+    return [op for _, ops in parts for op in ops]
+
+
+class WriteBehindQueue:
+    def __init__(self, journal_path, delay=0.25, batch_size=50, concurrency=4, enabled=True):
+        self.enabled = enabled
+        self.journal_path = journal_path
+        self.delay = delay
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        # (colección, id) -> {"kind", "scope", "parts": [(seq, datos)], "since", "retry_at", "attempts"}
+        self.pending = {}
+        self.inflight = {}
+        self.seq = 0
+        self.stats_counters = {"enqueued": 0, "coalesced": 0, "flushed": 0, "writes": 0, "retries": 0, "dropped": 0}
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.journal = None
+        self.flusher = None
+        self.executor = None
+        if enabled:
+            self._replay()
+
+    # ---- diario ----
+
+    def _replay(self):
+        # Al arrancar se recuperan las ediciones confirmadas al cliente que no llegaron a PocketBase
+        entries = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # última línea a medio escribir
+                    key = (record["collection"], record["id"])
+                    self.seq = max(self.seq, record["seq"])
+                    if record.get("done"):
+                        entry = entries.get(key)
+                        if entry:
+                            entry["parts"] = [part for part in entry["parts"] if part[0] > record["seq"]]
+                            if not entry["parts"]:
+                                del entries[key]
+                        continue
+                    entry = entries.setdefault(key, {"kind": record["kind"], "scope": record.get("scope"), "parts": []})
+                    entry["parts"].append((record["seq"], record["data"]))
+
+        for entry in entries.values():
+            entry.update({"since": 0.0, "retry_at": 0.0, "attempts": 0})
+        self.pending = entries
+        # Se reescribe el diario solo con lo pendiente
+        with open(self.journal_path, "w", encoding="utf-8") as journal:
+            for (collection_name, record_id), entry in entries.items():
+                for seq, data in entry["parts"]:
+                    journal.write(self._journal_line(collection_name, record_id, entry, seq, data))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+        if entries:
+            print(f"Escritura diferida: {len(entries)} registros pendientes recuperados del diario")
+            self._start_flusher()
+
+    def _journal_line(self, collection_name, record_id, entry, seq, data):
+        return json.dumps({"seq": seq, "collection": collection_name, "id": record_id,
+                           "kind": entry["kind"], "scope": entry["scope"], "data": data}, separators=(",", ":")) + "\n"
+
+    def _done_line(self, key, entry):
+        # Todo lo de este registro hasta este seq ya está en PocketBase (o se descartó)
+        return json.dumps({"seq": entry["parts"][-1][0], "collection": key[0], "id": key[1], "done": True},
+                          separators=(",", ":")) + "\n"
+
+    def _append(self, lines):
+        # Se llama con self.lock tomado; la edición se confirma al cliente después del fsync
+        self.journal.write("".join(lines))
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def _compact(self):
+        # Con la cola vacía el diario ya no tiene nada que recuperar
+        if not self.pending and not self.inflight and self.journal.tell() > 0:
+            self.journal.truncate(0)
+            self.journal.seek(0)
+
+    # ---- encolado ----
+
+    def _start_flusher(self):
+        if self.flusher is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="write-behind")
+            self.flusher = threading.Thread(target=self._run, name="write-behind-flusher", daemon=True)
+            self.flusher.start()
+
+    def _enqueue(self, collection_name, record_id, kind, scope, data):
+        key = (collection_name, record_id)
+        with self.lock:
+            self.seq += 1
+            entry = self.pending.get(key)
+            if entry is None:
+                entry = self.pending[key] = {"kind": kind, "scope": scope, "parts": [],
+                                             "since": time.monotonic(), "retry_at": 0.0, "attempts": 0}
+            else:
+                self.stats_counters["coalesced"] += 1
+            entry["parts"].append((self.seq, data))
+            self._append([self._journal_line(collection_name, record_id, entry, self.seq, data)])
+            self.stats_counters["enqueued"] += 1
+            self._start_flusher()
+            self.changed.notify_all()
+
+    def patch(self, collection_name, record_id, data, scope=None):
+        self._enqueue(collection_name, record_id, "patch", scope, data)
+
+    def column_ops(self, board_id, ops):
+        # Aplica las operaciones sobre el tablero con lo ya encolado, para validarlas y responder,
+        # y las encola. Devuelve el tablero resultante y el resultado de cada operación
+        with board_lock(board_id):
+            state = known_boards.get(board_id)
+            if state is None:
+                board = fetch_board(board_id)
+                state = (board.get("version") or 0, board.get("columns") or [])
+            version, columns = state
+            board = self.overlay("project_boards", {"id": board_id, "version": version, "columns": columns})
+            columns = copy.deepcopy(board["columns"])
+            results = [apply_op(columns, op) for op in ops]
+            # El id generado para una columna nueva se guarda para que el diario sea reproducible
+            ops = [{**op, "id": result["id"]} if op.get("op") == "add" else op for op, result in zip(ops, results)]
+            self._enqueue("project_boards", board_id, "ops", board_id, ops)
+            return {**board, "columns": columns}, results
+
+    def discard(self, collection_name, record_id):
+        # El registro se borró: sus ediciones pendientes ya no se escriben
+        key = (collection_name, record_id)
+        with self.lock:
+            entry = self.pending.pop(key, None)
+            if entry:
+                self._append([self._done_line(key, entry)])
+                self._compact()
+
+    # ---- lectura de lo propio ----
+
+    def has_pending(self, collection_name, scope=None):
+        with self.lock:
+            return any(key[0] == collection_name and (scope is None or entry["scope"] == scope)
+                       for entries in (self.inflight, self.pending) for key, entry in entries.items())
+
+    def _parts(self, key):
+        # Lo que está escribiéndose va antes que lo encolado después
+        kind, parts = None, []
+        for entries in (self.inflight, self.pending):
+            entry = entries.get(key)
+            if entry:
+                kind = entry["kind"]
+                parts.extend(entry["parts"])
+        return kind, parts
+
+    def overlay(self, collection_name, record):
+        # Devuelve el registro con las ediciones aún no escritas en PocketBase. Aplicar de nuevo algo
+        # que ya se escribió no cambia el resultado (los campos se sobrescriben, las columnas tienen id)
+        if not record or not record.get("id"):
+            return record
+        with self.lock:
+            kind, parts = self._parts((collection_name, record["id"]))
+        if not parts:
+            return record
+        record = dict(record)
+        if kind == "patch":
+            record.update(merge_parts(kind, parts))
+        elif "columns" in record:
+            columns = copy.deepcopy(record.get("columns") or [])
+            for op in merge_parts(kind, parts):
+                try:
+                    apply_op(columns, op)
+                except (ColumnNotFound, ValueError):
+                    pass
+            record["columns"] = columns
+        return record
+
+    def overlay_items(self, collection_name, items):
+        if not self.has_pending(collection_name):
+            return items
+        return [self.overlay(collection_name, item) for item in items]
+
+    # ---- escritura en PocketBase ----
+
+    def _take(self, keys):
+        # Se llama con self.lock tomado: pasa las entradas de pending a inflight
+        batch = []
+        for key in keys:
+            entry = self.pending.pop(key)
+            self.inflight[key] = entry
+            batch.append((key, entry))
+        return batch
+
+    def _due_keys(self):
+        now = time.monotonic()
+        keys = [key for key, entry in self.pending.items()
+                if key not in self.inflight and now - entry["since"] >= self.delay and entry["retry_at"] <= now]
+        return keys[:self.batch_size]
+
+    def _run(self):
+        while True:
+            with self.lock:
+                keys = self._due_keys()
+                while not keys:
+                    self.changed.wait(timeout=self.delay / 2 if self.pending else None)
+                    keys = self._due_keys()
+                batch = self._take(keys)
+            for future in [self.executor.submit(self._write, key, entry) for key, entry in batch]:
+                future.result()
+
+    def _write(self, key, entry):
+        collection_name, record_id = key
+        data = merge_parts(entry["kind"], entry["parts"])
+        try:
+            if entry["kind"] == "patch":
+                client.patch(collection_name, record_id, json=data)
+            else:
+                self._write_column_ops(record_id, data)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and 400 <= status < 500 and status != 429:
+                # El registro ya no existe o la edición no es válida: reintentar no lo arregla
+                print(f"Escritura diferida descartada {collection_name}/{record_id}: {e}")
+                self._finish(key, entry, dropped=True)
+            else:
+                self._retry(key, entry, e)
+            return
+        except Exception as e:
+            self._retry(key, entry, e)
+            return
+        self._finish(key, entry)
+
+    def _write_column_ops(self, board_id, ops):
+        # Todas las operaciones acumuladas van en una sola escritura condicional; si alguna ya no
+        # aplica (columna borrada por otra persona) se escriben una a una y se descarta esa.
+        # Sin el lock del tablero: una petición que lo tiene puede estar esperando este flush
+        try:
+            mutate_columns(board_id, ops, lock=False)
+        except (ColumnNotFound, ValueError):
+            for op in ops:
+                try:
+                    mutate_columns(board_id, [op], lock=False)
+                except (ColumnNotFound, ValueError) as e:
+                    print(f"Operación de columna diferida descartada en {board_id}: {op} ({e})")
+
+    def _finish(self, key, entry, dropped=False):
+        with self.lock:
+            self.inflight.pop(key, None)
+            self._append([self._done_line(key, entry)])
+            self.stats_counters["dropped" if dropped else "flushed"] += len(entry["parts"])
+            self.stats_counters["writes"] += 0 if dropped else 1
+            self._compact()
+            self.changed.notify_all()
+
+    def _retry(self, key, entry, error):
+        # PocketBase no disponible: la entrada vuelve a la cola, por delante de lo encolado después
+        with self.lock:
+            self.inflight.pop(key, None)
+            newer = self.pending.get(key)
+            entry["attempts"] += 1
+            entry["retry_at"] = time.monotonic() + min(MAX_RETRY_SECONDS, 0.5 * 2 ** entry["attempts"])
+            if newer:
+                entry["parts"].extend(newer["parts"])
+            self.pending[key] = entry
+            self.stats_counters["retries"] += 1
+            self.changed.notify_all()
+        print(f"Escritura diferida de {key[0]}/{key[1]} falló (intento {entry['attempts']}): {error}")
+
+    def flush(self, collection_name, record_id=None, scope=None, timeout=10):
+        # Escribe ya lo pendiente del registro (o de todo el scope) y espera a que termine.
+        # Se usa antes de una escritura síncrona o de una lectura que PocketBase debe ver al día
+        if not self.enabled:
+            return
+
+        def matches(key, entry):
+            return key[0] == collection_name and (record_id is None or key[1] == record_id) and \
+                (scope is None or entry["scope"] == scope)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                while any(matches(key, entry) for key, entry in self.inflight.items()):
+                    if not self.changed.wait(timeout=max(0.0, deadline - time.monotonic())):
+                        raise TimeoutError("Las escrituras diferidas no terminaron a tiempo")
+                batch = self._take([key for key, entry in self.pending.items() if matches(key, entry)])
+            if not batch:
+                return
+            for key, entry in batch:
+                self._write(key, entry)
+            with self.lock:
+                failed = any(matches(key, entry) and entry["attempts"] for key, entry in self.pending.items())
+            if failed:
+                raise ConnectionError("No se pudieron escribir las ediciones pendientes en PocketBase")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "pending": len(self.pending),
+                "inflight": len(self.inflight),
+                **self.stats_counters
+            }
+
+
+write_behind = WriteBehindQueue(
+    WRITE_BEHIND_JOURNAL,
+    delay=WRITE_BEHIND_DELAY_MS / 1000,
+    batch_size=WRITE_BEHIND_BATCH,
+    concurrency=WRITE_BEHIND_CONCURRENCY,
+    enabled=WRITE_BEHIND
+)
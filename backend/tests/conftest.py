@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from services.pocketbase_client import client
+
+
+@pytest.fixture
+def pocketbase():
+    # PocketBase falso en memoria; el cliente compartido apunta a él durante la prueba
+    server, base_url = start_fake_pocketbase()
+    previous, client.base_url = client.base_url, base_url
+    try:
+        yield server
+    finally:
+        client.base_url = previous
+        server.shutdown()
+
+
+@pytest.fixture
+def api(pocketbase):
+    from app import app
+    return app.test_client()
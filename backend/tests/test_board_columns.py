@@ -0,0 +1,66 @@
+import requests
+
+from services import board_columns
+
+
+def make_board(pocketbase, version=1):
+    return pocketbase.store.create("project_boards", {
+        "title": "Tablero",
+        "columns": [{"id": "todo", "name": "Por hacer", "order": 1}, {"id": "done", "name": "Hecho", "order": 2}],
+        "version": version
+    })
+
+
+def test_if_match_current_version_writes_and_returns_new_etag(api, pocketbase):
+    board = make_board(pocketbase)
+    etag = api.get(f"/boards/{board['id']}/columns").headers["ETag"]
+    assert etag == '"1"'
+
+    response = api.put(f"/boards/{board['id']}/columns/todo", json={"name": "Pendiente"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    assert pocketbase.store.get("project_boards", board["id"])["columns"][0]["name"] == "Pendiente"
+
+
+def test_if_match_stale_version_answers_412_with_current_etag(api, pocketbase):
+    board = make_board(pocketbase, version=3)
+
+    response = api.put(f"/boards/{board['id']}/columns/todo", json={"name": "Pendiente"}, headers={"If-Match": '"2"'})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"3"'
+    assert response.get_json()["version"] == 3
+    assert pocketbase.store.get("project_boards", board["id"])["columns"][0]["name"] == "Por hacer"
+
+
+def test_without_if_match_a_concurrent_write_is_retried(api, pocketbase):
+    board = make_board(pocketbase)
+    api.get(f"/boards/{board['id']}/columns")
+    # Otra instancia escribe después de que esta guardó la versión 1
+    pocketbase.store.update("project_boards", board["id"], {"version": 2})
+
+    response = api.post(f"/boards/{board['id']}/columns", json={"id": "review", "name": "Revisión"})
+    assert response.status_code == 201
+    assert response.headers["ETag"] == '"3"'
+
+
+def test_persistent_conflict_answers_409(api, pocketbase, monkeypatch):
+    board = make_board(pocketbase)
+
+    def rejected_patch(*args, **kwargs):
+        # La regla base_version de PocketBase rechaza el PATCH con 404
+        response = requests.Response()
+        response.status_code = 404
+        raise requests.exceptions.HTTPError(response=response)
+
+    monkeypatch.setattr(board_columns.client, "patch", rejected_patch)
+    monkeypatch.setattr(board_columns.time, "sleep", lambda seconds: None)
+
+    response = api.post(f"/boards/{board['id']}/columns", json={"id": "review", "name": "Revisión"})
+    assert response.status_code == 409
+
+
+def test_batch_rejects_malformed_ops_before_writing(api, pocketbase):
+    board = make_board(pocketbase)
+    for ops in (["add"], [1], [{"op": "rename"}], [{"op": "reorder", "order": "done"}]):
+        assert api.post(f"/boards/{board['id']}/columns/batch", json={"ops": ops}).status_code == 400
+    assert pocketbase.store.get("project_boards", board["id"])["version"] == 1
@@ -0,0 +1,97 @@
+import io
+import time
+
+import pytest
+import requests
+
+from services import bulk_import
+from services.bulk_import import LeadImporter
+
+
+def run_import(tmp_path, text, create_accounts=False):
+    importer = LeadImporter(batch_size=3, directory=str(tmp_path))
+    job_id = importer.submit(io.BytesIO(text.encode()), "csv", create_accounts=create_accounts)["id"]
+    for _ in range(500):
+        job = importer.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job, list(importer.errors(job_id))
+        time.sleep(0.01)
+    raise AssertionError("La importación no terminó")
+
+
+def test_dedup_by_work_email(pocketbase, tmp_path):
+    pocketbase.store.create("leads", {"name": "Ana", "work_email": "ana@corp.com"})
+    job, errors = run_import(tmp_path, (
+        "name,work_email\n"
+        "Ana,ANA@corp.com\n"        # ya existe en PocketBase
+        "Beto,beto@corp.com\n"
+        "Beto bis,beto@corp.com\n"  # repetido en el mismo bloque
+        "Beto tris,beto@corp.com\n"  # repetido en otro bloque
+        ",sin-nombre@corp.com\n"
+    ))
+    assert job["status"] == "done"
+    assert (job["rows"], job["leads_created"], job["leads_matched"], job["rejected"]) == (5, 1, 3, 1)
+    assert [error["line"] for error in errors] == [6]
+    assert pocketbase.store.list("leads", per_page=10)["totalItems"] == 2
+
+
+def test_failed_create_rejects_rows_without_counting_them_matched(pocketbase, tmp_path, monkeypatch):
+    post = bulk_import.client.post
+
+    def failing_post(collection_name, json=None, params=None):
+        if collection_name == "leads" and json.get("work_email") == "caido@corp.com":
+            raise requests.exceptions.ConnectionError("PocketBase no responde")
+        return post(collection_name, json=json, params=params)
+
+    monkeypatch.setattr(bulk_import.client, "post", failing_post)
+    job, errors = run_import(tmp_path, (
+        "name,work_email\n"
+        "Caído,caido@corp.com\n"
+        "Caído bis,caido@corp.com\n"
+        "Bien,bien@corp.com\n"
+    ))
+    assert (job["leads_created"], job["leads_matched"], job["rejected"]) == (1, 0, 2)
+    assert sorted(error["line"] for error in errors) == [2, 3]
+
+
+def test_assignments_skip_open_duplicates_and_unknown_accounts(pocketbase, tmp_path):
+    account = pocketbase.store.create("accounts", {"name": "Acme"})
+    lead = pocketbase.store.create("leads", {"name": "Ana", "work_email": "ana@corp.com"})
+    pocketbase.store.create("account_leads", {
+        "account_id": account["id"], "lead_id": lead["id"], "start_date": "2024-01-01", "end_date": "0001-01-01 00:00:00Z"
+    })
+    job, errors = run_import(tmp_path, (
+        "name,work_email,account,start_date\n"
+        "Ana,ana@corp.com,acme,2025-01-01\n"    # ya tiene una asignación abierta (fecha cero heredada)
+        "Beto,beto@corp.com,Acme,2025-01-01\n"
+        "Caro,caro@corp.com,Nadie SA,2025-01-01\n"
+    ))
+    assert (job["assignments_created"], job["assignments_skipped"], job["rejected"]) == (1, 1, 1)
+    assert "Nadie SA" in errors[0]["error"]
+    # La fila rechazada no deja un lead a medias
+    assert job["leads_created"] == 1
+
+
+def test_create_accounts_with_details_and_account_only_rows(pocketbase, tmp_path):
+    kind = pocketbase.store.create("types", {"name": "Cliente"})
+    job, errors = run_import(tmp_path, (
+        "name,work_email,account,account_website,account_type\n"
+        ",,Nueva SA,https://nueva.example,cliente\n"
+        "Ana,ana@corp.com,Nueva SA,,\n"
+        ",,Mala SA,,Inexistente\n"
+    ), create_accounts=True)
+    assert (job["accounts_created"], job["leads_created"], job["assignments_created"], job["rejected"]) == (1, 1, 1, 1)
+    assert "Inexistente" in errors[0]["error"]
+    created = pocketbase.store.list("accounts", per_page=10)["items"]
+    assert [(a["name"], a["website"], a["type_id"]) for a in created] == [("Nueva SA", "https://nueva.example", kind["id"])]
+
+
+def test_failed_upload_leaves_no_temp_file(tmp_path):
+    class BrokenStream(io.RawIOBase):
+        def readinto(self, buffer):
+            raise OSError("Conexión cortada")
+
+    importer = LeadImporter(directory=str(tmp_path))
+    with pytest.raises(OSError):
+        importer.submit(BrokenStream(), "csv")
+    assert list(tmp_path.iterdir()) == []
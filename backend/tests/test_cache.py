@@ -0,0 +1,74 @@
+from flask import Flask, jsonify
+
+from services.cache import TTLCache, cached, caches, invalidate, invalidates
+
+
+def test_set_skips_fill_started_before_clear():
+    cache = TTLCache(ttl=60, max_entries=10)
+    generation = cache.generation
+    cache.clear()
+    cache.set("key", "old", generation)
+    assert cache.get("key") is None
+
+    cache.set("key", "new", cache.generation)
+    assert cache.get("key") == "new"
+
+
+def test_lru_drops_oldest_entry():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def make_app(view_calls, invalidate_during_view=False):
+    app = Flask(__name__)
+
+    @app.route("/items")
+    @cached("types")
+    def items():
+        view_calls.append(True)
+        if invalidate_during_view:
+            # Una escritura termina mientras la vista aún consulta PocketBase
+            invalidate("types")
+        return jsonify({"calls": len(view_calls)})
+
+    @app.route("/items", methods=["POST"])
+    @invalidates("types")
+    def create_item():
+        return jsonify({}), 201
+
+    @app.route("/items/fail", methods=["POST"])
+    @invalidates("types")
+    def fail_item():
+        return jsonify({"error": "no"}), 500
+
+    return app.test_client()
+
+
+def test_cached_hit_and_invalidation_on_successful_write():
+    caches["types"].clear()
+    calls = []
+    api = make_app(calls)
+
+    assert api.get("/items").headers["X-Cache"] == "MISS"
+    assert api.get("/items").headers["X-Cache"] == "HIT"
+    api.post("/items/fail")
+    assert api.get("/items").headers["X-Cache"] == "HIT"
+    api.post("/items")
+    assert api.get("/items").headers["X-Cache"] == "MISS"
+    assert len(calls) == 2
+
+
+def test_cached_does_not_store_response_invalidated_mid_fetch():
+    caches["types"].clear()
+    calls = []
+    api = make_app(calls, invalidate_during_view=True)
+
+    api.get("/items")
+    response = api.get("/items")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.get_json() == {"calls": 2}
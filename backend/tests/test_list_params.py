@@ -0,0 +1,45 @@
+import pytest
+
+from services.pocketbase_client import MAX_FILTER_LENGTH, MAX_PER_PAGE, list_params
+
+
+def test_translates_and_combines_with_route_filter():
+    params = list_params({
+        "page": "2", "perPage": "50", "sort": "-created, name", "expand": "account_id.type_id",
+        "fields": "id,name", "filter": "name ~ 'a'", "skipTotal": "true"
+    }, base_filter="type_id = 'x'")
+    assert params == {
+        "page": 2, "perPage": 50, "sort": "-created,name", "expand": "account_id.type_id",
+        "fields": "id,name", "filter": "(type_id = 'x') && (name ~ 'a')", "skipTotal": 1
+    }
+
+
+def test_defaults_and_per_page_limit():
+    params = list_params({"perPage": str(MAX_PER_PAGE * 10)}, default_sort="order,created", default_expand="lead_id")
+    assert params == {"perPage": MAX_PER_PAGE, "sort": "order,created", "expand": "lead_id"}
+    assert list_params({}, base_filter="a = 'b'") == {"filter": "a = 'b'"}
+
+
+@pytest.mark.parametrize("args", [
+    {"page": "0"},
+    {"perPage": "abc"},
+    {"sort": "name;drop"},
+    {"expand": "lead_id)"},
+    {"fields": "id name"},
+    {"filter": "(name = 'a'"},
+    {"filter": "name = 'a') || (id != ''"},
+    {"filter": "name = 'a"},
+    {"filter": "x" * (MAX_FILTER_LENGTH + 1)},
+])
+def test_rejects_invalid_values(args):
+    with pytest.raises(ValueError):
+        list_params(args, base_filter="account_id = 'x'")
+
+
+def test_account_leads_route_answers_400(api):
+    assert api.get("/account-leads?perPage=0").status_code == 400
+    assert api.get("/account-leads?expand=lead_id)").status_code == 400
+    assert api.get("/account-leads/all?expand=lead_id)").status_code == 400
+    # Filtro bien formado que PocketBase rechaza: 400, como en /accounts
+    assert api.get("/account-leads?filter=bogus = 'x'").status_code == 400
+    assert api.get("/account-leads?filter=bogus = 'x'&cursor=").status_code == 400
@@ -0,0 +1,24 @@
+from services import metrics
+
+
+def test_counter_renders_mixed_status_labels():
+    counter = metrics.Counter("test_requests_total", "Prueba", ("collection", "method", "status"))
+    counter.inc("leads", "GET", 200)
+    counter.inc("leads", "GET", "error")
+    counter.inc("leads", "GET", 200)
+
+    lines = counter.render()
+
+    assert 'test_requests_total{collection="leads",method="GET",status="200"} 2' in lines
+    assert 'test_requests_total{collection="leads",method="GET",status="error"} 1' in lines
+
+
+def test_render_after_upstream_connection_error():
+    metrics.record_upstream("leads", "GET", 200, 0.01, 512)
+    metrics.record_upstream("leads", "GET", "error", 0.5, None)
+
+    text = metrics.render(extra=[("test_pool", "gauge", "Prueba", ("state",), {("busy",): 1, (2,): 3})])
+
+    assert 'pocketbase_requests_total{collection="leads",method="GET",status="error"}' in text
+    assert 'pocketbase_errors_total{collection="leads",method="GET"}' in text
+    assert 'test_pool{state="busy"} 1' in text
@@ -0,0 +1,46 @@
+import threading
+
+from benchmarks.fake_pocketbase import start_fake_pocketbase
+from services.pocketbase_client import PocketBaseClient
+
+
+def test_get_after_write_does_not_join_older_flight():
+    server, base_url = start_fake_pocketbase()
+    try:
+        record = server.store.create("types", {"name": "old", "description": ""})
+        pb = PocketBaseClient(base_url=base_url, single_flight=True)
+
+        # La primera lectura se queda en vuelo (ya leyó "old") hasta que se suelte
+        read_done, release = threading.Event(), threading.Event()
+        send = pb.session.request
+        first = []
+
+        def slow_first_get(method, url, **kwargs):
+            response = send(method, url, **kwargs)
+            if method == "GET" and not first:
+                first.append(True)
+                read_done.set()
+                release.wait(5)
+            return response
+
+        pb.session.request = slow_first_get
+        results = {}
+        before = threading.Thread(target=lambda: results.setdefault("before", pb.get("types", record["id"]).json()))
+        before.start()
+        assert read_done.wait(5)
+
+        pb.patch("types", record["id"], json={"name": "new"})
+        after = threading.Thread(target=lambda: results.setdefault("after", pb.get("types", record["id"]).json()))
+        after.start()
+        after.join(2)
+        finished_alone = not after.is_alive()
+        release.set()
+        before.join(5)
+        after.join(5)
+
+        assert finished_alone
+        assert results["before"]["name"] == "old"
+        assert results["after"]["name"] == "new"
+        assert pb.single_flight_stats()["coalesced_reads"] == 0
+    finally:
+        server.shutdown()
@@ -0,0 +1,65 @@
+from services.task_ranks import RANK_STEP, position_for, rank_between, rebalance_column
+
+
+def make_tasks(pocketbase, board_id, column_id, orders):
+    return [
+        pocketbase.store.create("project_tasks", {"title": f"t{n}", "board_id": board_id, "column_id": column_id, "order": order})
+        for n, order in enumerate(orders)
+    ]
+
+
+def orders(pocketbase, tasks):
+    return [pocketbase.store.get("project_tasks", task["id"])["order"] for task in tasks]
+
+
+def test_rank_between():
+    assert rank_between(None, None) == RANK_STEP
+    assert rank_between(None, 100.0) == 100.0 - RANK_STEP
+    assert rank_between(100.0, None) == 100.0 + RANK_STEP
+    assert rank_between(1.0, 2.0) == 1.5
+    assert rank_between(5.0, 5.0) is None
+    assert rank_between(1.0, 1.0 + 2 ** -52) is None
+
+
+def test_rebalance_keeps_order_and_only_writes_changed_tasks(pocketbase):
+    tasks = make_tasks(pocketbase, "b1", "todo", [RANK_STEP, 7.0, 7.0, 9.0])
+    other = make_tasks(pocketbase, "b1", "done", [7.0])
+
+    # La primera ya está en su lugar (RANK_STEP) pero la renumeración la deja después de las de 7
+    assert rebalance_column("b1", "todo") == 4
+    assert orders(pocketbase, tasks) == [4 * RANK_STEP, RANK_STEP, 2 * RANK_STEP, 3 * RANK_STEP]
+    assert rebalance_column("b1", "todo") == 0
+    assert orders(pocketbase, other) == [7.0]
+
+
+def test_position_between_tied_neighbours_rebalances_column(pocketbase):
+    first, second, third = make_tasks(pocketbase, "b1", "todo", [5.0, 5.0, 5.0])
+    moved = make_tasks(pocketbase, "b1", "done", [1.0])[0]
+
+    rank = position_for("b1", "todo", moved["id"], after_id=first["id"], before_id=second["id"])
+    first_order, second_order, third_order = orders(pocketbase, [first, second, third])
+    assert first_order < rank < second_order < third_order
+
+
+def test_move_with_task_from_another_board_changes_nothing(api, pocketbase):
+    tasks = make_tasks(pocketbase, "b1", "todo", [5.0, 5.0])
+    foreign = make_tasks(pocketbase, "b2", "todo", [1.0])[0]
+
+    response = api.post("/boards/b1/tasks/moves", json={"moves": [
+        {"task_id": foreign["id"], "column_id": "todo", "after_id": tasks[0]["id"], "before_id": tasks[1]["id"]}
+    ]})
+    assert response.status_code == 404
+    assert orders(pocketbase, tasks) == [5.0, 5.0]
+
+
+def test_moving_to_another_column_without_neighbours_appends(api, pocketbase):
+    source = make_tasks(pocketbase, "b1", "todo", [RANK_STEP, 2 * RANK_STEP])
+    target = make_tasks(pocketbase, "b1", "done", [3 * RANK_STEP])
+
+    response = api.put(f"/tasks/{source[0]['id']}", json={"column_id": "empty", "after_id": None, "before_id": None})
+    assert response.get_json()["order"] == RANK_STEP
+    response = api.put(f"/tasks/{source[1]['id']}", json={"column_id": "done"})
+    assert response.get_json()["order"] == 4 * RANK_STEP
+    # Sin cambiar de columna el rango se conserva
+    response = api.put(f"/tasks/{target[0]['id']}", json={"column_id": "done", "title": "Otro título"})
+    assert response.get_json()["order"] == 3 * RANK_STEP
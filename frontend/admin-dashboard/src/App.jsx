@@ -6,6 +6,7 @@ import Leads from './pages/Leads';
 import AccountLeads from "./pages/AccountLeads";
 import AccountForm from "./pages/account/AccountForm"; 
 import LeadForm from "./pages/LeadForm"; 
+import LeadImport from "./pages/LeadImport";
 import AccountLeadsForm from "./pages/AccountLeadsForm";
 import AccountView from "./pages/account/AccountView";
 import LeadDetail from "./pages/LeadDetail";
@@ -48,6 +49,7 @@ function App() {
         <Route path="/account-leads" element={<AccountLeads />} />
         <Route path="/leads/create" element={<LeadForm />} />
         <Route path="/leads/edit/:id" element={<LeadForm />} />
+        <Route path="/leads/import" element={<LeadImport />} />
         <Route path="/account-leads/create" element={<AccountLeadsForm />} />
         <Route path="/account-leads/edit/:id" element={<AccountLeadsForm />} />
         <Route path="/types" element={<TypesView />} />
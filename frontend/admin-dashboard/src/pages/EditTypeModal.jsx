@@ -34,31 +34,19 @@ const EditTypeModal = ({
         description: typeData.description,
       });
 
-      const updates = accounts.map(async (acc) => {
-        const shouldBeAssigned = selectedAccountIds.includes(acc.id);
-        const isCurrentlyAssigned = acc.type_id === typeData.id;
+      const add = accounts
+        .filter(acc => selectedAccountIds.includes(acc.id) && acc.type_id !== typeData.id)
+        .map(acc => acc.id);
+      const remove = accounts
+        .filter(acc => !selectedAccountIds.includes(acc.id) && acc.type_id === typeData.id)
+        .map(acc => acc.id);
 
-        if (shouldBeAssigned && !isCurrentlyAssigned) {
-          return api.patch(`/accounts/${acc.id}`, {
-            type_id: typeData.id,
-            name: acc.name,
-            website: acc.website,
-            phone: acc.phone,
-            tax_id: acc.tax_id,
-          });
-        } else if (!shouldBeAssigned && isCurrentlyAssigned) {
-          return api.patch(`/accounts/${acc.id}`, {
-            type_id: "",
-            name: acc.name,
-            website: acc.website,
-            phone: acc.phone,
-            tax_id: acc.tax_id,
-          });
+      if (add.length || remove.length) {
+        const res = await api.post(`/types/${typeData.id}/accounts`, { add, remove });
+        if (res.data.failed) {
+          console.error("Cuentas no actualizadas:", res.data.results.filter(r => !r.ok));
         }
-        return null;
-      });
-
-      await Promise.all(updates);
+      }
       fetchAccounts();
       onSave();
     } catch (err) {
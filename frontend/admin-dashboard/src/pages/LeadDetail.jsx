@@ -34,13 +34,15 @@ const LeadsDetails = () => {
       .then(res => setLead(res.data))
       .catch(err => console.error("Error al obtener lead:", err));
 
-    api.get(`/account-leads?expand=account_id`)
+    api.get(`/account-leads/all`, { params: { lead_id: id, expand: 'account_id' } })
       .then(res => {
-        const relacionados = (res.data.items || []).filter(rel => String(rel.lead_id) === String(id));
+        const relacionados = res.data || [];
         setRelations(relacionados);
 
-        const actuales = relacionados.filter(rel => !rel.end_date || new Date(rel.end_date) > new Date());
-        const pasadas = relacionados.filter(rel => rel.end_date && new Date(rel.end_date) <= new Date());
+        // Sin fecha de fin: vacía o la fecha cero que guardaban versiones anteriores de PocketBase
+        const abierta = rel => !rel.end_date || rel.end_date.startsWith('0001-01-01');
+        const actuales = relacionados.filter(rel => abierta(rel) || new Date(rel.end_date) > new Date());
+        const pasadas = relacionados.filter(rel => !abierta(rel) && new Date(rel.end_date) <= new Date());
 
         setCurrentRelations(actuales);
         setPastRelations(pasadas);
@@ -0,0 +1,123 @@
+import React, { useEffect, useState } from 'react';
+import { useNavigate } from 'react-router-dom';
+import api from '../api/axiosConfig';
+
+// Cada cuánto se consulta el avance de la importación
+const POLL_MS = 2000;
+
+const LeadImport = () => {
+  const [file, setFile] = useState(null);
+  const [createAccounts, setCreateAccounts] = useState(false);
+  const [job, setJob] = useState(null);
+  const [error, setError] = useState(null);
+  const navigate = useNavigate();
+
+  const running = job && (job.status === 'queued' || job.status === 'running');
+
+  useEffect(() => {
+    if (!running) return;
+    const timer = setTimeout(() => {
+      api.get(`/leads/imports/${job.id}`)
+        .then(res => setJob(res.data))
+        .catch(() => setError('No se pudo consultar el avance de la importación'));
+    }, POLL_MS);
+    return () => clearTimeout(timer);
+  }, [job, running]);
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    if (!file) return;
+    setError(null);
+    const data = new FormData();
+    data.append('file', file);
+    try {
+      const res = await api.post('/leads/import', data, {
+        params: createAccounts ? { create_accounts: 'true' } : {},
+      });
+      setJob(res.data);
+    } catch (err) {
+      setError(err.response?.data?.error || 'No se pudo subir el archivo');
+    }
+  };
+
+  return (
+    <div>
+      <h1 className="text-2xl font-bold text-gray-800 mb-4">Importar leads</h1>
+
+      <form onSubmit={handleSubmit} className="bg-white p-6 shadow rounded-lg space-y-4">
+        <p className="text-sm text-gray-600">
+          Archivo CSV (con cabecera) o NDJSON con las columnas name, last_name, phone, personal_email y work_email;
+          opcionalmente account (nombre de la empresa), start_date, end_date y notes para asignarlo a una cuenta.
+          Al crear empresas se usan también account_website, account_address, account_phone, account_tax_id y
+          account_type (nombre del tipo); una fila sin datos del lead solo da de alta la empresa.
+          Los leads con un correo laboral que ya existe no se duplican.
+        </p>
+        <input
+          type="file"
+          accept=".csv,.ndjson,.jsonl"
+          onChange={(e) => setFile(e.target.files[0] || null)}
+          className="block"
+          required
+        />
+        <label className="flex items-center gap-2 text-sm">
+          <input type="checkbox" checked={createAccounts} onChange={(e) => setCreateAccounts(e.target.checked)} />
+          Crear las empresas que no existan
+        </label>
+
+        <div className="flex gap-4">
+          <button type="submit" disabled={running} className="bg-green-600 text-white px-4 py-2 rounded hover:bg-green-700 disabled:opacity-50">
+            Importar
+          </button>
+          <button type="button" onClick={() => navigate('/leads')} className="bg-gray-400 text-white px-4 py-2 rounded hover:bg-gray-500">
+            Volver
+          </button>
+        </div>
+      </form>
+
+      {error && <p className="text-red-600 mt-4">{error}</p>}
+
+      {job && (
+        <div className="bg-white p-6 shadow rounded-lg mt-6 space-y-3">
+          <div className="w-full bg-gray-200 rounded h-3">
+            <div className="bg-green-600 h-3 rounded" style={{ width: `${Math.round(job.progress * 100)}%` }} />
+          </div>
+          <p className="text-sm text-gray-700">
+            {job.status === 'failed' ? `La importación falló: ${job.error}` : `Estado: ${job.status}`}
+            {' · '}{job.rows} filas · {job.leads_created} leads nuevos · {job.leads_matched} ya existían
+            {' · '}{job.assignments_created} asignaciones · {job.rejected} rechazadas
+          </p>
+          {job.errors.length > 0 && (
+            <div>
+              <table className="w-full text-sm">
+                <thead>
+                  <tr className="text-left text-gray-600">
+                    <th className="pr-4">Línea</th>
+                    <th>Motivo</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {job.errors.map(rowError => (
+                    <tr key={rowError.line}>
+                      <td className="pr-4">{rowError.line}</td>
+                      <td>{rowError.error}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+              {!running && job.rejected > job.errors.length && (
+                <a
+                  href={`${api.defaults.baseURL}/leads/imports/${job.id}/errors?format=ndjson`}
+                  className="text-blue-600 text-sm underline"
+                >
+                  Descargar todas las filas rechazadas
+                </a>
+              )}
+            </div>
+          )}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default LeadImport;
@@ -96,13 +96,21 @@ const Leads = () => {
     <div>
       <div className="flex justify-between items-center mb-6">
         <h1 className="text-2xl font-bold text-gray-800">Historial de Leads</h1>
-        <button
-          onClick={() => navigate('/leads/create')}
-          className="px-4 py-2 border-2 border-green-600 text-green-600 rounded hover:bg-green-600 hover:text-white transition-colors"
-        >
-          <FaPlus className="mr-2" />
-          Nuevo Lead
-        </button>
+        <div className="flex gap-2">
+          <button
+            onClick={() => navigate('/leads/import')}
+            className="px-4 py-2 border-2 border-blue-600 text-blue-600 rounded hover:bg-blue-600 hover:text-white transition-colors"
+          >
+            Importar
+          </button>
+          <button
+            onClick={() => navigate('/leads/create')}
+            className="px-4 py-2 border-2 border-green-600 text-green-600 rounded hover:bg-green-600 hover:text-white transition-colors"
+          >
+            <FaPlus className="mr-2" />
+            Nuevo Lead
+          </button>
+        </div>
       </div>
 
       <UtcClock />
@@ -9,6 +9,7 @@ import {
   useSensors,
   DragOverlay,
 } from '@dnd-kit/core';
+import { SortableContext, verticalListSortingStrategy } from '@dnd-kit/sortable';
 import DroppableColumn from './DroppableColumn';
 import { SortableTask } from './SortableTask';
 
@@ -37,25 +38,15 @@ const TaskView = () => {
       setLoading(true);
       setError(null);
       try {
-        const [colsRes, tasksRes] = await Promise.all([
-          api.get(`/boards/${boardId}/columns`),
-          api.get(`/boards/${boardId}/tasks`)
-        ]);
+        const { data } = await api.get(`/boards/${boardId}/snapshot`);
 
-        const boardColumns = colsRes.data || [];
         const tempColumns = Object.fromEntries(
-          boardColumns
-            .sort((a, b) => (a.order ?? 0) - (b.order ?? 0))
-            .map(c => [c.id, { name: c.name, tasks: [] }])
+          (data.columns || []).map(c => [
+            c.id,
+            { name: c.name, tasks: data.tasks_by_column?.[c.id] || [] }
+          ])
         );
 
-        const taskList = tasksRes.data.items || [];
-        taskList.forEach(task => {
-          if (tempColumns[task.column_id]) {
-            tempColumns[task.column_id].tasks.push(task);
-          }
-        });
-
         setColumns(tempColumns);
       } catch (err) {
         setError('Error al obtener datos del tablero');
@@ -69,21 +60,28 @@ const TaskView = () => {
 
   const handleDragEnd = async (event) => {
     const { active, over } = event;
+    setActiveTask(null);
     if (!over || active.id === over.id) return;
 
-    const sourceColId = Object.keys(columns).find(columnId =>
-      columns[columnId].tasks.some(task => task.id === active.id)
-    );
-    const destinationColId = over?.id;
-    if (!sourceColId || !destinationColId || sourceColId === destinationColId) return;
+    // over puede ser una columna (se suelta en el hueco) o una tarea
+    const findColumnId = (id) => (columns[id] ? id : Object.keys(columns).find(columnId =>
+      columns[columnId].tasks.some(task => task.id === id)
+    ));
+    const sourceColId = findColumnId(active.id);
+    const destinationColId = findColumnId(over.id);
+    if (!sourceColId || !destinationColId) return;
 
+    const sameColumn = sourceColId === destinationColId;
     const sourceTasks = [...columns[sourceColId].tasks];
-    const destinationTasks = [...columns[destinationColId].tasks];
+    const overIndex = (sameColumn ? sourceTasks : columns[destinationColId].tasks).findIndex(task => task.id === over.id);
+    const [movedTask] = sourceTasks.splice(sourceTasks.findIndex(task => task.id === active.id), 1);
+    const destinationTasks = sameColumn ? sourceTasks : [...columns[destinationColId].tasks];
 
-    const taskIndex = sourceTasks.findIndex(task => task.id === active.id);
-    const [movedTask] = sourceTasks.splice(taskIndex, 1);
-    movedTask.column_id = destinationColId;
-    destinationTasks.push(movedTask);
+    // Sobre una tarea ocupa su lugar; sobre la columna, queda al final
+    const insertAt = overIndex === -1 ? destinationTasks.length : overIndex;
+    destinationTasks.splice(insertAt, 0, { ...movedTask, column_id: destinationColId });
+    const after = destinationTasks[insertAt - 1];
+    const before = destinationTasks[insertAt + 1];
 
     setColumns(prev => ({
       ...prev,
@@ -92,13 +90,18 @@ const TaskView = () => {
     }));
 
     try {
-      await api.put(`/tasks/${active.id}`, { column_id: destinationColId });
+      // Solo se envían las vecinas: el backend calcula la posición y reescribe únicamente esta tarea
+      await api.put(`/tasks/${active.id}`, {
+        column_id: destinationColId,
+        after_id: after?.id ?? null,
+        before_id: before?.id ?? null,
+      });
     } catch (error) {
       console.error('Error al actualizar tarea:', error);
-      setError('No se pudo mover la tarea');
+      setError(error.response?.status === 409
+        ? 'El tablero cambió mientras movías la tarea; recarga la página'
+        : 'No se pudo mover la tarea');
     }
-
-    setActiveTask(null);
   };
 
   const openTaskModal = (colId) => {
@@ -277,9 +280,11 @@ const TaskView = () => {
                   </div>
 
                   <DroppableColumn id={columnId} tasks={column.tasks}>
-                    {column.tasks.map(task => (
-                      <SortableTask key={task.id} task={task} />
-                    ))}
+                    <SortableContext items={column.tasks.map(task => task.id)} strategy={verticalListSortingStrategy}>
+                      {column.tasks.map(task => (
+                        <SortableTask key={task.id} task={task} />
+                      ))}
+                    </SortableContext>
                   </DroppableColumn>
                 </div>
               ))}
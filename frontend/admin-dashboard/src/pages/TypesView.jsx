@@ -8,6 +8,7 @@ import { useNavigate } from 'react-router-dom';
 const TypesView = () => {
   const [types, setTypes] = useState([]);
   const [accounts, setAccounts] = useState([]);
+  const [typeCounts, setTypeCounts] = useState({});
   const [searchTerm, setSearchTerm] = useState('');
   const [showModal, setShowModal] = useState(false);
   const [newType, setNewType] = useState({ name: '', description: '' });
@@ -21,7 +22,7 @@ const TypesView = () => {
 
   useEffect(() => {
     fetchTypes();
-    fetchAccounts();
+    fetchTypeCounts();
   }, [page, perPage, sortOrder]);
 
   const fetchTypes = async () => {
@@ -29,17 +30,19 @@ const TypesView = () => {
     setTypes(res.data.items || []);
   };
 
+  // Solo el modal de edición necesita la lista de cuentas
   const fetchAccounts = async () => {
-    const res = await api.get('/accounts?expand=type_id');
+    const res = await api.get('/accounts');
     setAccounts(res.data.items || []);
   };
 
-  const getCountByType = (typeId) => {
-    return accounts.filter(acc =>
-      acc.type_id === typeId || acc.expand?.type_id?.id === typeId
-    ).length;
+  const fetchTypeCounts = async () => {
+    const res = await api.get('/types/counts');
+    setTypeCounts(res.data.counts || {});
   };
 
+  const getCountByType = (typeId) => typeCounts[typeId] || 0;
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     if (!newType.name || !newType.description) {
@@ -67,6 +70,7 @@ const TypesView = () => {
     try {
       await api.delete(`/types/${typeId}`);
       fetchTypes();
+      fetchTypeCounts();
     } catch (err) {
       console.error("Error al eliminar tipo:", err);
       alert("No se pudo eliminar el tipo. Asegúrate de que no esté asignado a ninguna cuenta.");
@@ -74,6 +78,7 @@ const TypesView = () => {
   };
 
   const openEditModal = (type) => {
+    fetchAccounts();
     setEditType(type);
     setShowEditModal(true);
   };
@@ -294,7 +299,7 @@ const TypesView = () => {
           onClose={() => setShowEditModal(false)}
           onSave={() => {
             fetchTypes();
-            fetchAccounts();
+            fetchTypeCounts();
             setShowEditModal(false);
           }}
         />
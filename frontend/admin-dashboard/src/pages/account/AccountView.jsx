@@ -35,11 +35,7 @@ const AccountView = () => {
   });
 
   useEffect(() => {
-    api.get(`/accounts/${id}`)
-      .then(res => setAccount(res.data))
-      .catch(err => console.error("Error al cargar la cuenta:", err));
-    fetchRelations();
-    fetchLeads();
+    fetchOverview();
   }, [id]);
 
   useEffect(() => {
@@ -52,40 +48,20 @@ const AccountView = () => {
     setDisplayedCurrentLeads(leadsAMostrar);
   }, [currentLeads, currentPageCurrentLeads, showAllRecordsCurrentLeads]);
 
-  const fetchRelations = async () => {
+  // Cuenta, leads actuales y anteriores en una sola petición (el backend los pide en paralelo)
+  const fetchOverview = async () => {
     try {
-      const res = await api.get(`/account-leads/all`);
-      const relaciones = res.data || [];
-      const relacionesConCuenta = relaciones.filter(
-        (r) => String(r.account_id) === String(id)
-      );
-      const relacionesConExpand = relacionesConCuenta.map((r) => ({
-        ...r,
-        lead: r.expand?.lead_id || null,
-      }));
-      const relacionesValidas = relacionesConExpand.filter((r) => r.lead !== null);
-      const actuales = relacionesValidas.filter(
-        (r) =>
-          !r.end_date ||
-          r.end_date === "" ||
-          r.end_date === null ||
-          r.end_date === "0001-01-01 00:00:00Z"
-      );
-      const anteriores = relacionesValidas.filter(
-        (r) =>
-          r.end_date &&
-          r.end_date !== "" &&
-          r.end_date !== null &&
-          r.end_date !== "0001-01-01 00:00:00Z"
-      );
-      setCurrentLeads(actuales);
-      setDisplayedCurrentLeads(actuales);
-      setPreviousLeads(anteriores);
+      const { data } = await api.get(`/accounts/${id}/overview`);
+      setAccount(data.account);
+      setCurrentLeads(data.current_leads || []);
+      setDisplayedCurrentLeads(data.current_leads || []);
+      setPreviousLeads(data.previous_leads || []);
     } catch (err) {
-      console.error("❌ Error al cargar relaciones:", err);
+      console.error("❌ Error al cargar la cuenta:", err);
     }
   };
 
+  // La lista de leads solo hace falta para asignar uno: AddLeadForm la pide al abrir el selector
   const fetchLeads = () => {
     api.get('/leads')
       .then(res => setLeads(res.data.items || []))
@@ -111,7 +87,7 @@ const AccountView = () => {
       });
       setShowModal(false);
       setQuickLead({ name: '', last_name: '', work_email: '' });
-      fetchRelations();
+      fetchOverview();
       fetchLeads();
     } catch (err) {
       console.error("Error al crear y asignar lead:", err);
@@ -128,7 +104,7 @@ const AccountView = () => {
     };
     api.post('/account-leads', payload)
       .then(() => {
-        fetchRelations();
+        fetchOverview();
       })
       .catch(err => {
         if (err.response && err.response.status === 409) {
@@ -161,7 +137,7 @@ const AccountView = () => {
     if (window.confirm("¿Deseas marcar este lead como finalizado en esta cuenta?")) {
       const today = new Date().toISOString().split("T")[0];
       api.patch(`/account-leads/${relationId}`, { end_date: today })
-        .then(() => fetchRelations())
+        .then(() => fetchOverview())
         .catch(err => console.error("Error al finalizar la relación:", err));
     }
   };
@@ -205,7 +181,6 @@ const AccountView = () => {
       />
 
       <PreviousLeadsTable
-        leads={leads}
         previousLeads={previousLeads}
         orderByPreviousLeads={orderByPreviousLeads}
         setOrderByPreviousLeads={setOrderByPreviousLeads}
@@ -226,6 +201,7 @@ const AccountView = () => {
 
       <AddLeadForm
         leads={leads}
+        onOpen={fetchLeads}
         currentLeads={currentLeads}
         selectedLead={selectedLead}
         setSelectedLead={setSelectedLead}
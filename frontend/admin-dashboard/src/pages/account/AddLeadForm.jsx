@@ -2,11 +2,13 @@ import React, { useState, useEffect } from "react";
 
 const AddLeadForm = ({
   leads,
+  onOpen,
   currentLeads,
   handleAssignLead
 }) => {
   const [selectedLead, setSelectedLead] = useState('');
   const [startDate, setStartDate] = useState('');
+  const [requested, setRequested] = useState(false);
 
   useEffect(() => {
     const today = new Date().toISOString().split("T")[0];
@@ -17,6 +19,13 @@ const AddLeadForm = ({
     (lead) => !currentLeads.some((rel) => rel.lead_id === lead.id)
   );
 
+  // Los leads se piden la primera vez que se abre el selector, no al cargar la cuenta
+  const requestLeads = () => {
+    if (requested) return;
+    setRequested(true);
+    onOpen?.();
+  };
+
   const onSubmit = (e) => {
     e.preventDefault();
     if (!selectedLead || !startDate) return;
@@ -31,13 +40,15 @@ const AddLeadForm = ({
     <div className="bg-white shadow rounded-lg p-6 mt-6">
       <h2 className="text-xl font-semibold text-gray-800 mb-4">Asignar Lead a esta Cuenta</h2>
 
-      {availableLeads.length === 0 ? (
+      {requested && leads.length > 0 && availableLeads.length === 0 ? (
         <p className="text-gray-600">Todos los leads ya están asignados a esta cuenta.</p>
       ) : (
         <form onSubmit={onSubmit} className="flex flex-col md:flex-row gap-4 items-start md:items-center">
           <select
             value={selectedLead}
             onChange={(e) => setSelectedLead(e.target.value)}
+            onFocus={requestLeads}
+            onMouseDown={requestLeads}
             className="border border-gray-300 px-4 py-2 rounded w-full md:max-w-xs"
             required
           >
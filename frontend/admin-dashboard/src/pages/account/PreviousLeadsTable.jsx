@@ -11,7 +11,6 @@ import {
 } from "react-icons/fa";
 
 const PreviousLeadsTable = ({
-  leads,
   previousLeads,
   orderByPreviousLeads,
   setOrderByPreviousLeads,
@@ -32,12 +31,12 @@ const PreviousLeadsTable = ({
     });
 
     return sorted.filter(rel => {
-      const name = `${leads.find(l => l.id === rel.lead_id)?.name || ""} ${leads.find(l => l.id === rel.lead_id)?.last_name || ""}`.toLowerCase();
-      const email = `${leads.find(l => l.id === rel.lead_id)?.work_email || ""} ${leads.find(l => l.id === rel.lead_id)?.personal_email || ""}`.toLowerCase();
+      const name = `${rel.lead?.name || ""} ${rel.lead?.last_name || ""}`.toLowerCase();
+      const email = `${rel.lead?.work_email || ""} ${rel.lead?.personal_email || ""}`.toLowerCase();
       const query = searchTerm.toLowerCase();
       return query ? name.includes(query) || email.includes(query) : true;
     });
-  }, [previousLeads, orderByPreviousLeads, searchTerm, leads]);
+  }, [previousLeads, orderByPreviousLeads, searchTerm]);
 
   const startIndex = (currentPage - 1) * leadsPerPage;
   const displayedLeads = showAllRecordsPreviousLeads
@@ -144,7 +143,7 @@ const PreviousLeadsTable = ({
           </thead>
           <tbody>
             {displayedLeads.map((rel) => {
-              const lead = leads.find((l) => l.id === rel.lead_id);
+              const lead = rel.lead;
               return (
                 <tr key={rel.id} className="border-b">
                   <td className="py-2 px-4">
@@ -0,0 +1,24 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3358302546")
+
+  // update collection data
+  // Índice para la comprobación de asignaciones abiertas en create_account_lead:
+  // account_id = X && lead_id = Y && end_date = ''
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_account_leads_open_assignment` ON `account_leads` (\n  `account_id`,\n  `lead_id`,\n  `end_date`\n)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3358302546")
+
+  // update collection data
+  unmarshal({
+    "indexes": []
+  }, collection)
+
+  return app.save(collection)
+})
@@ -0,0 +1,39 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3282162638")
+
+  // update collection data
+  // Escritura condicional: si el cuerpo trae base_version debe coincidir con la versión guardada,
+  // así dos ediciones concurrentes de columnas no se pisan (la segunda recibe 404 y reintenta)
+  unmarshal({
+    "updateRule": "@request.body.base_version:isset = false || @request.body.base_version = version"
+  }, collection)
+
+  // add field
+  collection.fields.addAt(5, new Field({
+    "hidden": false,
+    "id": "number2093472300",
+    "max": null,
+    "min": 0,
+    "name": "version",
+    "onlyInt": true,
+    "presentable": false,
+    "required": false,
+    "system": false,
+    "type": "number"
+  }))
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3282162638")
+
+  // update collection data
+  unmarshal({
+    "updateRule": ""
+  }, collection)
+
+  // remove field
+  collection.fields.removeById("number2093472300")
+
+  return app.save(collection)
+})
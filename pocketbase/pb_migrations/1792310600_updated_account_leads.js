@@ -0,0 +1,27 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3358302546")
+
+  // update collection data
+  // Índice por fecha de inicio para el resumen mensual de /account-leads/recent:
+  // start_date >= inicio_mes && start_date < inicio_mes_siguiente
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_account_leads_open_assignment` ON `account_leads` (\n  `account_id`,\n  `lead_id`,\n  `end_date`\n)",
+      "CREATE INDEX `idx_account_leads_start_date` ON `account_leads` (`start_date`)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3358302546")
+
+  // update collection data
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_account_leads_open_assignment` ON `account_leads` (\n  `account_id`,\n  `lead_id`,\n  `end_date`\n)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+})
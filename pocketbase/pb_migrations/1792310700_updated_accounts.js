@@ -0,0 +1,23 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2324088501")
+
+  // update collection data
+  // Índice para GET /accounts?type_id=... (type_id = X)
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_accounts_type_id` ON `accounts` (`type_id`)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2324088501")
+
+  // update collection data
+  unmarshal({
+    "indexes": []
+  }, collection)
+
+  return app.save(collection)
+})
@@ -0,0 +1,23 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3705076665")
+
+  // update collection data
+  // Índice para la paginación por cursor (keyset): ORDER BY created, id con created > X
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_leads_created_id` ON `leads` (\n  `created`,\n  `id`\n)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_3705076665")
+
+  // update collection data
+  unmarshal({
+    "indexes": []
+  }, collection)
+
+  return app.save(collection)
+})
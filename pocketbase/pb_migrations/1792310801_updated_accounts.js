@@ -0,0 +1,26 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2324088501")
+
+  // update collection data
+  // Índice para la paginación por cursor (keyset): ORDER BY created, id con created > X
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_accounts_type_id` ON `accounts` (`type_id`)",
+      "CREATE INDEX `idx_accounts_created_id` ON `accounts` (\n  `created`,\n  `id`\n)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2324088501")
+
+  // update collection data
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_accounts_type_id` ON `accounts` (`type_id`)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+})
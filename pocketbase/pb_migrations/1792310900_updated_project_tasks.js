@@ -0,0 +1,24 @@
+/// <reference path="../pb_data/types.d.ts" />
+migrate((app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2855883128")
+
+  // update collection data
+  // Índice para las tareas de un tablero ordenadas (snapshot) y para buscar las vecinas de una
+  // tarea dentro de su columna al moverla (order es un rango fraccionario)
+  unmarshal({
+    "indexes": [
+      "CREATE INDEX `idx_project_tasks_board_column_order` ON `project_tasks` (\n  `board_id`,\n  `column_id`,\n  `order`\n)"
+    ]
+  }, collection)
+
+  return app.save(collection)
+}, (app) => {
+  const collection = app.findCollectionByNameOrId("pbc_2855883128")
+
+  // update collection data
+  unmarshal({
+    "indexes": []
+  }, collection)
+
+  return app.save(collection)
+})